@@ -176,4 +176,8 @@ sed -i "s/A1B2C3D4E5F60718293A4B61 \/\* FamilyTodoTests \*\/,/A1B2C3D4E5F6071829
 
 rm -f "$PROJECT_FILE.backup"
 
+# 13. Re-point shared schemes at the targets' current IDs (exit 3: schemes rewritten)
+python3 scripts/pbxtool schemes fix || [ $? -eq 3 ]
+
 echo "✓ Added FamilyTodoUITests target to project"
+echo "  Run 'scripts/pbxtool schemes add-tests FamilyTodoUITests' to run it with the HousePulse scheme"
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""Benchmark pbxtool on synthetic projects and check for regressions.
+
+For each size (file references) a project is generated with
+``pbxtool.synth`` and these stages are timed (median of ``--repeat`` runs) and
+their peak traced memory recorded:
+
+    parse        Project.parse, eager
+    parse_lazy   Project.parse(lazy=True)
+    load_cached  Project.load on a parse-cache hit
+    index        path -> file reference map and group trie (project_tree, group_tree)
+    add          batch add of 1% of the files (10..200) in one transaction, written
+    remove       batch removal of as many files, written
+    move         batch move (with rename) of as many files into one group, written
+    serialize    serialize() after an edit
+    sync         sync() with that many new files on disk, cold caches
+    sync_cached  sync() again with nothing changed
+    check        pbxtool.check on a lazily parsed project, without disk checks
+    query        pbxtool.reader: the targets building one file, from a fresh
+                 ProjectReader (memory-mapped, so the file itself is not traced)
+    legacy_add   the way the old add_*_files.py scripts added files: regex
+                 searches and string splices on the raw text. Each file costs
+                 a few passes over the whole text, so it runs on the first
+                 LEGACY_BATCH files only and the report extrapolates.
+
+Times are also stored divided by a fixed pure-Python calibration loop, so a
+baseline recorded on one machine is usable on another. ``--save`` writes the
+baseline (for the sizes run); ``--check`` compares against it and exits 1 when a stage got slower
+(or used more memory) than the tolerance allows. Stages faster than
+``--floor-ms`` are never flagged for time: at a few milliseconds, scheduler
+and cache noise is larger than any tolerance.
+
+    python3 scripts/xcode/benchmark.py                        # 1k, 10k, 100k
+    python3 scripts/xcode/benchmark.py --sizes 1000,10000 --check
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from pbxtool.check import check
+from pbxtool.project import Project
+from pbxtool.reader import ProjectReader
+from pbxtool.sync import project_tree, sync
+from pbxtool.synth import generate, write_tree
+
+BASELINE = Path(__file__).resolve().parent / "benchmark-baseline.json"
+LEGACY_BATCH = 10
+STAGES = (
+    "parse",
+    "parse_lazy",
+    "load_cached",
+    "index",
+    "add",
+    "remove",
+    "move",
+    "serialize",
+    "sync",
+    "sync_cached",
+    "check",
+    "query",
+    "legacy_add",
+)
+
+
+def calibrate():
+    """Seconds for a fixed mix of dict, string and list work (median of 7)."""
+    times = []
+    for _ in range(7):
+        start = time.perf_counter()
+        index = {}
+        for i in range(50_000):
+            key = f"{i:024X}"
+            index[key] = key.lower()
+        " ".join(sorted(index.values())).split()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def measure(run, setup=lambda: None, repeat=5, trace=True):
+    """``(median seconds, peak traced bytes)`` of ``run(setup())``; only ``run`` is measured.
+
+    With ``trace=False`` the extra run under tracemalloc is skipped and the peak is None.
+    """
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+    median = statistics.median(times)
+    if not trace:
+        return median, None
+    state = setup()
+    tracemalloc.start()
+    try:
+        run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return median, peak
+
+
+def _legacy_id():
+    return os.urandom(12).hex().upper()
+
+
+def legacy_add(text, batch):
+    """Add ``batch`` ([(file name, group path)]) like the old add_*_files.py scripts."""
+    entries = [(name, group.rsplit("/", 1)[-1], _legacy_id(), _legacy_id()) for name, group in batch]
+
+    # 1. PBXBuildFile entries
+    end = text.find("/* End PBXBuildFile section */")
+    added = "".join(
+        f"\t\t{build} /* {name} in Sources */ = {{isa = PBXBuildFile; fileRef = {ref} /* {name} */; }};\n"
+        for name, _, ref, build in entries
+    )
+    text = text[:end] + added + text[end:]
+
+    # 2. PBXFileReference entries
+    end = text.find("/* End PBXFileReference section */")
+    added = "".join(
+        f"\t\t{ref} /* {name} */ = {{isa = PBXFileReference; lastKnownFileType = sourcecode.swift; "
+        f'path = {name}; sourceTree = "<group>"; }};\n'
+        for name, _, ref, _ in entries
+    )
+    text = text[:end] + added + text[end:]
+
+    # 3-5. One group lookup and splice per file
+    for name, group, ref, _ in entries:
+        group_id = re.search(rf"(\w+) /\* {re.escape(group)} \*/ = \{{", text).group(1)
+        match = re.search(rf"({group_id} /\* {re.escape(group)} \*/ = \{{\s*isa = PBXGroup;\s*children = \()", text)
+        if match:
+            text = text[: match.end()] + f"\n\t\t\t\t{ref} /* {name} */," + text[match.end() :]
+
+    # 6. First PBXSourcesBuildPhase
+    match = re.search(r"(isa = PBXSourcesBuildPhase;[^}]+files = \()", text)
+    if match:
+        added = "".join(f"\n\t\t\t\t{build} /* {name} in Sources */," for name, _, _, build in entries)
+        text = text[: match.end()] + added + text[match.end() :]
+    return text
+
+
+def bench_size(size, workdir, repeat):
+    unit = calibrate()  # per size, so it tracks the machine's load during the run
+    synth = generate(size)
+    text = synth.text
+    batch_size = max(10, min(size // 100, 200))
+    app_groups = [g for g in synth.groups if g.split("/", 1)[0] == "App"]
+    batch = [(f"Bench{i}.swift", app_groups[i % len(app_groups)]) for i in range(batch_size)]
+
+    source_root = workdir / f"synth-{size}"
+    project_path = source_root / "Synth.xcodeproj" / "project.pbxproj"
+    project_path.parent.mkdir(parents=True)
+    project_path.write_text(text, encoding="utf-8")
+    write_tree(source_root, synth.files)
+    os.environ["PBXTOOL_CACHE_DIR"] = str(workdir / f"cache-{size}")
+
+    def fresh():
+        return Project.parse(text, lazy=True)
+
+    def loaded():
+        project_path.write_text(text, encoding="utf-8")
+        return Project.load(project_path, cache=False)
+
+    def add(project):
+        tx = project.transaction()
+        phase = project.build_phase("App")
+        for name, group in batch:
+            tx.add_file(name, tx.groups[group].id, phase)
+        tx.commit()
+
+    def edited():
+        project = fresh()
+        tx = project.transaction()
+        for name, group in batch:
+            tx.add_file(name, tx.groups[group].id)
+        for op in tx.operations:
+            op.apply(project)
+        return project
+
+    def remove(project):
+        files, _ = project_tree(project)
+        tx = project.transaction()
+        tx.remove_file_refs(files[path] for path in synth.files[:: max(1, size // batch_size)][:batch_size])
+        tx.commit()
+
+    def move(project):
+        files, _ = project_tree(project)
+        tx = project.transaction()
+        target = tx.groups[app_groups[0]].id
+        for i, path in enumerate(synth.files[1 :: max(1, size // batch_size)][:batch_size]):
+            tx.move_file_ref(files[path], target, f"Moved{i}.swift")
+        tx.commit()
+
+    def query(path):
+        with ProjectReader(project_path) as reader:
+            ref = reader.file_ref(path)
+            reader.membership([ref.id])
+
+    def cold_sync():
+        project_path.write_text(text, encoding="utf-8")
+        shutil.rmtree(os.environ["PBXTOOL_CACHE_DIR"], ignore_errors=True)
+        write_tree(source_root, [f"{group}/{name}" for name, group in batch])
+
+    def warm_sync():
+        cold_sync()
+        sync(project_path, synth.roots)
+
+    results = {}
+    results["parse"] = measure(lambda _: Project.parse(text), repeat=repeat)
+    results["parse_lazy"] = measure(lambda _: Project.parse(text, lazy=True), repeat=repeat)
+    Project.load(project_path)  # stores the parse cache entry
+    results["load_cached"] = measure(lambda _: Project.load(project_path), repeat=repeat)
+    results["index"] = measure(lambda p: (project_tree(p), p.group_tree()), fresh, repeat)
+    results["add"] = measure(add, loaded, repeat)
+    results["remove"] = measure(remove, loaded, repeat)
+    results["move"] = measure(move, loaded, repeat)
+    results["serialize"] = measure(lambda p: p.serialize(), edited, repeat)
+    results["sync"] = measure(lambda _: sync(project_path, synth.roots), cold_sync, repeat)
+    results["sync_cached"] = measure(lambda _: sync(project_path, synth.roots), warm_sync, repeat)
+    results["check"] = measure(check, fresh, repeat)
+    project_path.write_text(text, encoding="utf-8")
+    results["query"] = measure(query, lambda: synth.files[len(synth.files) // 2], repeat)
+    results["legacy_add"] = measure(lambda _: legacy_add(text, batch[:LEGACY_BATCH]), repeat=1, trace=False)
+    return {"objects": len(fresh()), "batch": batch_size, "calibration": unit, "stages": results}
+
+
+def report(size, result, baseline, time_tolerance, memory_tolerance, floor):
+    """Print one size's table; return the regressions found against ``baseline``."""
+    regressions = []
+    unit = result["calibration"]
+    print(f"\n{size} file references ({result['objects']} objects, batches of {result['batch']})")
+    print(f"  calibration: {unit * 1000:.1f}ms")
+    print(f"  {'stage':<12} {'time':>10} {'peak':>10} {'vs baseline':>12}")
+    for stage in STAGES:
+        seconds, peak = result["stages"][stage]
+        memory = f"{peak / 2**20:>8.1f}MB" if peak is not None else f"{'-':>10}"
+        line = f"  {stage:<12} {seconds * 1000:>8.1f}ms {memory}"
+        base = baseline.get(str(size), {}).get(stage)
+        if base:
+            ratio = seconds / unit / base["score"]
+            line += f" {ratio:>11.2f}x"
+            if ratio > time_tolerance and seconds > floor:
+                regressions.append(f"{size}/{stage}: {ratio:.2f}x the baseline time")
+            if peak is not None and base["peak"] and peak > base["peak"] * memory_tolerance:
+                regressions.append(f"{size}/{stage}: peak {peak / base['peak']:.2f}x the baseline")
+        print(line)
+    batch = result["batch"]
+    add = result["stages"]["add"][0]
+    legacy = result["stages"]["legacy_add"][0] * batch / min(batch, LEGACY_BATCH)
+    print(f"  add: {batch} files in {add * 1000:.1f}ms; legacy approach ~{legacy * 1000:.0f}ms ({legacy / add:.0f}x)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated file reference counts")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per stage, the median counts (sizes over 50k: 1)")
+    parser.add_argument("--check", action="store_true", help="exit 1 on regressions against the baseline")
+    parser.add_argument("--save", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--time-tolerance", type=float, default=1.5, help="allowed slowdown factor")
+    parser.add_argument("--memory-tolerance", type=float, default=1.25, help="allowed peak memory factor")
+    parser.add_argument("--floor-ms", type=float, default=50.0, help="stages faster than this are not checked for time")
+    parser.add_argument("--json", type=Path, help="also write the raw results here")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.check:
+        try:
+            baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["sizes"]
+        except (OSError, ValueError, KeyError) as error:
+            print(f"❌ cannot read baseline {args.baseline}: {error}", file=sys.stderr)
+            return 1
+
+    results = {}
+    regressions = []
+    workdir = Path(tempfile.mkdtemp(prefix="pbxtool-bench-"))
+    saved_cache_dir = os.environ.get("PBXTOOL_CACHE_DIR")
+    try:
+        for size in (int(s) for s in args.sizes.split(",") if s):
+            repeat = 1 if size > 50_000 else args.repeat
+            result = results[size] = bench_size(size, workdir, repeat)
+            regressions += report(
+                size, result, baseline, args.time_tolerance, args.memory_tolerance, args.floor_ms / 1000
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        if saved_cache_dir is None:
+            os.environ.pop("PBXTOOL_CACHE_DIR", None)
+        else:
+            os.environ["PBXTOOL_CACHE_DIR"] = saved_cache_dir
+
+    payload = {
+        "sizes": {
+            str(size): {
+                stage: {"seconds": seconds, "score": seconds / result["calibration"], "peak": peak}
+                for stage, (seconds, peak) in result["stages"].items()
+            }
+            for size, result in results.items()
+        },
+    }
+    if args.json:
+        args.json.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    if args.save:
+        # Sizes not run this time keep their stored numbers.
+        try:
+            stored = json.loads(args.baseline.read_text(encoding="utf-8"))["sizes"]
+        except (OSError, ValueError, KeyError):
+            stored = {}
+        stored.update(payload["sizes"])
+        payload["sizes"] = stored
+        args.baseline.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\n✅ Baseline saved to {args.baseline}")
+    if regressions:
+        print("\n❌ Regressions:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    if args.check:
+        print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
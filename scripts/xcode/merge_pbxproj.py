@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Git merge driver for project.pbxproj.
+
+Merges the three versions object by object instead of line by line, so
+branches that add files to the same groups and build phases merge cleanly.
+Enable it once per clone (.gitattributes already routes *.pbxproj to it):
+
+    git config merge.pbxproj.name "structural project.pbxproj merge"
+    git config merge.pbxproj.driver "python3 scripts/xcode/merge_pbxproj.py %O %A %B %P"
+
+Git calls it with the base, ours and theirs files; the result is written to
+the "ours" file. On real clashes nothing merged is written: they are listed on
+stderr and the file gets ``git merge-file``'s conflict markers instead (as do
+files that cannot be parsed), and the exit status is 1 so git marks it as
+conflicted.
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+from pbxtool.fileio import write_atomic
+from pbxtool.merge import merge_text
+from pbxtool.parser import ParseError
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", type=Path, help="common ancestor (%%O)")
+    parser.add_argument("ours", type=Path, help="current version, receives the result (%%A)")
+    parser.add_argument("theirs", type=Path, help="other branch's version (%%B)")
+    parser.add_argument("path", nargs="?", default="project.pbxproj", help="path in the repository (%%P)")
+    args = parser.parse_args(argv)
+
+    texts = [p.read_text(encoding="utf-8") for p in (args.base, args.ours, args.theirs)]
+    try:
+        result = merge_text(*texts)
+    except ParseError as error:
+        print(f"⚠️  {args.path}: {error}; falling back to a line merge", file=sys.stderr)
+        return line_merge(args)
+
+    if result.conflicts:
+        print(f"❌ {args.path}: {len(result.conflicts)} conflict(s), falling back to a line merge:", file=sys.stderr)
+        for conflict in result.conflicts:
+            print(f"  - {conflict}", file=sys.stderr)
+        return line_merge(args) or 1  # conflicted even if the lines happen to merge
+    write_atomic(args.ours, result.project.serialize())
+    return 0
+
+
+def line_merge(args):
+    """``git merge-file`` into the ours file; non-zero (the number of conflicts) if it left markers."""
+    labels = ["-L", "ours", "-L", "base", "-L", "theirs"]
+    return subprocess.call(["git", "merge-file", *labels, str(args.ours), str(args.base), str(args.theirs)])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Shared helpers for reading and editing FamilyTodo.xcodeproj/project.pbxproj.
+
+``Project.load()`` parses the file once into a typed object graph with an
+O(1) ID -> object index; ``Project.serialize()`` writes it back, reproducing
+the original bytes for every object that was not modified. Edits are queued on
+a ``Transaction`` and written in one pass. ``pbxtool.cli`` is the command line
+(``scripts/pbxtool``); ``pbxtool.cli.main([...])`` runs it in-process.
+
+Names exported here are imported from their submodules on first use, so
+``import pbxtool`` stays cheap for tools that only need part of it.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+# Exported name -> submodule that defines it.
+_EXPORTS = {
+    "PBXBuildFile": "objects",
+    "PBXBuildPhase": "objects",
+    "PBXFileReference": "objects",
+    "PBXFrameworksBuildPhase": "objects",
+    "PBXGroup": "objects",
+    "PBXNativeTarget": "objects",
+    "PBXObject": "objects",
+    "PBXProject": "objects",
+    "PBXResourcesBuildPhase": "objects",
+    "PBXSourcesBuildPhase": "objects",
+    "PBXTarget": "objects",
+    "XCBuildConfiguration": "objects",
+    "XCConfigurationList": "objects",
+    "FileLock": "fileio",
+    "WriteConflict": "fileio",
+    "content_digest": "fileio",
+    "write_atomic": "fileio",
+    "write_if_changed": "fileio",
+    "GroupTree": "groups",
+    "IdAllocator": "ids",
+    "ParseError": "parser",
+    "parse": "parser",
+    "Preview": "preview",
+    "Snapshot": "preview",
+    "Project": "project",
+    "ProjectReader": "reader",
+    "Section": "project",
+    "BuildSettings": "settings",
+    "Transaction": "transaction",
+}
+
+__all__ = sorted(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .fileio import FileLock, WriteConflict, content_digest, write_atomic, write_if_changed
+    from .groups import GroupTree
+    from .ids import IdAllocator
+    from .objects import (
+        PBXBuildFile,
+        PBXBuildPhase,
+        PBXFileReference,
+        PBXFrameworksBuildPhase,
+        PBXGroup,
+        PBXNativeTarget,
+        PBXObject,
+        PBXProject,
+        PBXResourcesBuildPhase,
+        PBXSourcesBuildPhase,
+        PBXTarget,
+        XCBuildConfiguration,
+        XCConfigurationList,
+    )
+    from .parser import ParseError, parse
+    from .preview import Preview, Snapshot
+    from .project import Project, Section
+    from .reader import ProjectReader
+    from .settings import BuildSettings
+    from .transaction import Transaction
+
+del TYPE_CHECKING  # not an export
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,7 @@
+"""``python3 -m pbxtool``: see ``pbxtool.cli``."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
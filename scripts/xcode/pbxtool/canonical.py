@@ -0,0 +1,138 @@
+"""Canonical object order for project.pbxproj, so diffs only show real changes.
+
+``canonicalize()`` makes one pass over the sections and groups of a parsed
+project and puts them in the order Xcode would produce from scratch:
+
+* objects in each section sorted by ID (what Xcode writes itself);
+* the children of every group below the main group sorted by name,
+  case-insensitively, with folders before files. The main group and the
+  products group keep their order, as Xcode's templates lay them out;
+* the files of Sources and Resources phases sorted by name. Frameworks and
+  other phases are left alone, since link and copy order can matter.
+
+Names come from object comments, so lazily read file references and build
+files are never decoded. Objects already in order keep their original text,
+and a project that is already canonical is not modified at all.
+
+``place()`` keeps a canonical project canonical as it is edited: a
+transaction hands it the objects and list entries it added, and each is
+moved to its sorted position in every section or list that was in order
+without it. Sections and lists that were not sorted keep the new entries
+at the end, as before.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Set, Tuple
+
+from . import timings
+from .objects import PBXBuildPhase, PBXGroup
+from .parser import field_scanner
+
+if TYPE_CHECKING:
+    from .project import Project
+
+SORTED_PHASES = frozenset({"PBXSourcesBuildPhase", "PBXResourcesBuildPhase"})
+# Shown as folders in the navigator; variant groups (localized files) and
+# version groups (Core Data models) look like files and sort with them.
+FOLDER_ISAS = frozenset({"PBXGroup", "PBXFileSystemSynchronizedRootGroup"})
+
+
+SortKey = Tuple[bool, str, str, str]
+
+
+def _name_key(project: "Project") -> Callable[[str], SortKey]:
+    """Sort key for group children and phase files: folders first, then by name."""
+    objects = project.objects
+
+    def sort_key(object_id: str) -> SortKey:
+        obj = objects.get(object_id)
+        if obj is None:
+            return (True, object_id.lower(), object_id, object_id)
+        name = obj.comment or obj.display_name
+        return (obj.isa not in FOLDER_ISAS, name.lower(), name, object_id)
+
+    return sort_key
+
+
+def _kept(project: "Project") -> Set[str]:
+    """Groups whose children keep their order: the main group and the products group."""
+    root = project.root
+    return {root.main_group, root.get("productRefGroup")}
+
+
+def _sorted_list_key(obj: object, kept: Set[str]) -> str:
+    """``"children"`` or ``"files"`` if ``canonicalize()`` sorts that list of ``obj``, else ``""``."""
+    if isinstance(obj, PBXGroup):
+        return "" if obj.id in kept else "children"
+    if isinstance(obj, PBXBuildPhase) and obj.isa in SORTED_PHASES:
+        return "files"
+    return ""
+
+
+def _in_order(keys: List[Any]) -> bool:
+    return all(a <= b for a, b in zip(keys, keys[1:]))
+
+
+@timings.timed("canonicalize")
+def canonicalize(project: "Project", write: bool = True) -> List[str]:
+    """Describe (and with ``write``, fix) everything out of canonical order."""
+    changes: List[str] = []
+    objects = project.objects
+
+    for section in project.sections:
+        ids = list(section.ids)
+        ordered = sorted(ids)
+        if ids != ordered:
+            changes.append(f"{section.isa or 'loose'} section is not sorted by ID")
+            if write:
+                section.ids = dict.fromkeys(ordered)
+
+    sort_key = _name_key(project)
+    scan = field_scanner({"children", "files"})
+    kept = _kept(project)
+    for obj in objects.values():
+        key = _sorted_list_key(obj, kept)
+        if not key:
+            continue
+        # Read the list from the object's text when it is unmodified, without decoding it.
+        items = obj.get(key) if obj.raw is None else scan(obj.raw).get(key)
+        if not isinstance(items, list) or len(items) < 2:
+            continue
+        ordered = sorted(items, key=sort_key)
+        if items != ordered:
+            changes.append(f"{obj.isa} {obj.id} ({obj.display_name}) {key} are not sorted by name")
+            if write:
+                obj.set(key, ordered)
+    return changes
+
+
+@timings.timed("place")
+def place(project: "Project", added: Iterable[str], lists: Dict[str, Set[str]]) -> None:
+    """Move what a transaction added to its canonical position wherever the rest is in order.
+
+    ``added`` are new object IDs; ``lists`` maps a group or build phase ID to
+    the entries added to (or renamed in) its list.
+    """
+    new = {object_id for object_id in added if object_id in project.objects}
+    sections = {id(section): section for section in map(project.section_of, new)}
+    for section in sections.values():
+        ids = list(section.ids)
+        if _in_order([i for i in ids if i not in new]):
+            ordered = sorted(ids)
+            if ids != ordered:
+                section.ids = dict.fromkeys(ordered)
+    if not lists:
+        return
+    sort_key = _name_key(project)
+    kept = _kept(project)
+    for container_id, entries in lists.items():
+        obj = project.get(container_id)
+        key = _sorted_list_key(obj, kept)
+        items = obj.get(key) if key else None  # type: ignore[union-attr]
+        if not isinstance(items, list) or len(items) < 2:
+            continue
+        if _in_order([sort_key(i) for i in items if i not in entries]):
+            ordered = sorted(items, key=sort_key)
+            if items != ordered:
+                obj.set(key, ordered)  # type: ignore[union-attr]
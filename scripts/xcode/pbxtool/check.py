@@ -0,0 +1,208 @@
+"""Integrity checks for a parsed project.
+
+``check()`` makes one pass over the objects, following only the keys that
+hold object IDs (``REFERENCE_KEYS``), and records who refers to what.
+Unmodified objects are scanned from their source text rather than decoded
+(file references, which hold no IDs, are skipped), so a lazily loaded project
+stays undecoded. From that it reports:
+
+* ``dangling``: a reference to an ID that is not in the project;
+* ``orphan``: a PBXBuildFile no build phase lists, or a PBXFileReference
+  nothing refers to;
+* ``duplicate``: an ID listed twice in one list, a file or group in more than
+  one group, a build file in more than one phase, or a phase building the
+  same file twice;
+* ``misplaced``: a file under one of the ``roots`` folders (``roots`` maps
+  root folders to targets, like ``sync.DEFAULT_ROOTS``) that another root's
+  target builds while its own does not, or a test file that a non-test target
+  builds at all. Test code that ``imports.assign_targets`` sends to a test
+  target from another root (a unit test under ``FamilyTodo/``) is where
+  ``sync`` and ``add`` put it, so it is not reported; without ``source_root``
+  the imports cannot be read and any such test-target placement is accepted;
+* ``missing``: a file reference whose file does not exist under the source
+  root, and ``untracked``: a source file under one of ``roots`` that no file
+  reference points at.
+
+``scheme`` problems (shared schemes referring to targets that no longer
+exist, or by stale names) come from ``pbxtool.schemes.check_schemes``;
+``pbxtool check`` reports both.
+
+Everything is linear in the number of objects (plus one stat per file for the
+disk checks).
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+from . import timings
+from .objects import PBXBuildFile, PBXBuildPhase, PBXFileReference, PBXGroup, PBXNativeTarget, PBXObject
+from .parser import field_scanner
+from .project import Project
+from .refs import REFERENCE_KEYS, reference_fields
+from .sync import SOURCE_EXTENSIONS, project_tree, scan_tree
+
+KINDS = ("dangling", "orphan", "duplicate", "misplaced", "missing", "untracked", "scheme")
+
+
+@dataclass
+class Problem:
+    kind: str
+    object_id: Optional[str]
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.kind}: {self.object_id} {self.message}" if self.object_id else f"{self.kind}: {self.message}"
+
+
+def _label(obj: PBXObject) -> str:
+    return f"{obj.id} ({obj.comment})" if obj.comment else obj.id
+
+
+def _misplaced(
+    project: Project,
+    files: Dict[str, str],
+    roots: Mapping[str, Optional[str]],
+    phase_of: Dict[str, str],
+    file_ref_of: Dict[str, str],
+    source_root: Optional[Path],
+) -> List[Problem]:
+    """Files built by another root's target instead of (or, for test files, as well as) their own."""
+    from .imports import APP, UI_TEST, UNIT_TEST, assign_targets, target_kinds
+
+    path_of = {ref: path for path, ref in files.items()}
+    target_of = {phase: target.name for target in project.targets() for phase in target.build_phases}
+    tests = {target.name for target in project.targets() if isinstance(target, PBXNativeTarget) and target.is_test}
+    owners = {target for target in roots.values() if target is not None}
+    built_by: Dict[str, Set[str]] = {}
+    for build_file, phase in phase_of.items():
+        ref = file_ref_of.get(build_file)
+        target = target_of.get(phase)
+        if ref is not None and target is not None:
+            built_by.setdefault(ref, set()).add(target)
+    kinds = target_kinds(project)
+    problems = []
+    # (path, file reference, own target, test target) where test code may have been sent on purpose.
+    moved: List[Tuple[str, str, str, str]] = []
+    for ref, targets in built_by.items():
+        path = path_of.get(ref)
+        own = roots.get(path.split("/", 1)[0]) if path is not None else None
+        if own is None:
+            continue
+        for target in sorted(targets & owners):
+            if target == own or (own in targets and (own not in tests or target in tests)):
+                continue
+            own_kind, kind = kinds.get(own, APP), kinds.get(target)
+            if own not in targets and path is not None:
+                # The moves assign_targets makes: unit tests out of app targets, UI tests into UI-test targets.
+                if (kind == UNIT_TEST and own_kind == APP) or (kind == UI_TEST and own_kind != UI_TEST):
+                    moved.append((path, ref, own, target))
+                    continue
+            problems.append(Problem("misplaced", ref, f"{path} belongs to {own} but is built by {target}"))
+    if moved and source_root is not None:
+        # Accept exactly what assign_targets (sync, add, watch) would do with these files.
+        owned = {root: target for root, target in roots.items() if target is not None}
+        expected = assign_targets(project, source_root, [path for path, _, _, _ in moved], owned)
+        for path, ref, own, target in moved:
+            if expected.get(path) != target:
+                problems.append(Problem("misplaced", ref, f"{path} belongs to {own} but is built by {target}"))
+    return problems
+
+
+@timings.timed("check")
+def check(
+    project: Project,
+    source_root: Optional[Path] = None,
+    roots: Union[Iterable[str], Mapping[str, str]] = (),
+    extensions: Set[str] = SOURCE_EXTENSIONS,
+) -> List[Problem]:
+    """Problems found in ``project``.
+
+    Disk checks only run when ``source_root`` is given, and target membership is
+    only checked when ``roots`` maps folders to targets.
+    """
+    problems: List[Problem] = []
+    objects = project.objects
+    scan = field_scanner(REFERENCE_KEYS)
+    referenced: Set[str] = set()
+    group_of: Dict[str, str] = {}
+    phase_of: Dict[str, str] = {}
+    file_ref_of: Dict[str, str] = {}
+    phase_files: Dict[str, List[str]] = {}
+
+    for obj in objects.values():
+        fields = reference_fields(obj, scan)
+        for key, value in fields.items():
+            if key == "remoteGlobalIDString" and fields.get("containerPortal") != project.root_id:
+                continue  # an ID inside another project
+            ids = value if isinstance(value, list) else [value]
+            for ref in ids:
+                if not isinstance(ref, str):
+                    continue
+                if ref not in objects:
+                    problems.append(Problem("dangling", obj.id, f"{key} refers to missing object {ref}"))
+                    continue
+                referenced.add(ref)
+            if isinstance(value, list) and len(set(value)) != len(value):
+                seen: Set[str] = set()
+                for ref in value:
+                    if ref in seen:
+                        problems.append(Problem("duplicate", obj.id, f"lists {ref} more than once in {key}"))
+                    seen.add(ref)
+            if key == "fileRef" and isinstance(obj, PBXBuildFile):
+                file_ref_of[obj.id] = value  # type: ignore[assignment]
+                continue
+            if key == "children" and isinstance(obj, PBXGroup):
+                owners = group_of
+            elif key == "files" and isinstance(obj, PBXBuildPhase):
+                owners = phase_of
+                phase_files[obj.id] = ids  # type: ignore[assignment]
+            else:
+                continue
+            for ref in set(ids):
+                owner = owners.setdefault(ref, obj.id)
+                if owner != obj.id:
+                    where = "group" if owners is group_of else "build phase"
+                    problems.append(
+                        Problem("duplicate", ref, f"is in {where} {_label(objects[owner])} and {_label(obj)}")
+                    )
+
+    for obj in objects.values():
+        if isinstance(obj, PBXBuildFile):
+            if obj.id not in phase_of:
+                problems.append(Problem("orphan", obj.id, f"build file ({obj.comment}) is in no build phase"))
+        elif isinstance(obj, PBXFileReference) and obj.id not in referenced:
+            problems.append(Problem("orphan", obj.id, f"file reference ({obj.comment}) is in no group"))
+    for phase_id, build_files in phase_files.items():
+        built: Dict[str, str] = {}
+        for build_file_id in build_files:
+            file_ref = file_ref_of.get(build_file_id)
+            if file_ref is not None:
+                first = built.setdefault(file_ref, build_file_id)
+                if first != build_file_id:
+                    message = f"builds {file_ref} twice ({first}, {build_file_id})"
+                    problems.append(Problem("duplicate", phase_id, message))
+
+    roots = dict.fromkeys(roots) if not isinstance(roots, Mapping) else roots
+    files: Optional[Dict[str, str]] = None
+    if any(target is not None for target in roots.values()):
+        files, _ = project_tree(project)
+        problems += _misplaced(project, files, roots, phase_of, file_ref_of, source_root)
+
+    if source_root is not None:
+        if files is None:
+            files, _ = project_tree(project)
+        base = str(source_root)
+        for path, ref in files.items():
+            if not os.path.exists(os.path.join(base, path)):
+                problems.append(Problem("missing", ref, f"points at {path}, which does not exist"))
+        if roots:
+            on_disk, _ = scan_tree(source_root, list(roots), extensions)
+            for path in sorted(on_disk.difference(files)):
+                problems.append(Problem("untracked", None, f"{path} is not in the project"))
+
+    problems.sort(key=lambda problem: KINDS.index(problem.kind))
+    return problems
@@ -0,0 +1,803 @@
+"""``pbxtool`` command line: add, remove, move, sync, check, format, watch, query, settings, schemes, export, workspace.
+
+Every command works on FamilyTodo.xcodeproj (or ``--project``) and applies its
+edits in a single transaction. Exit status: 0 when the project was already up
+to date, ``EXIT_CHANGED`` (3) when it was written, 1 on errors (``check``: 1
+when it found problems; ``sync --check`` and ``format --check``: 1 when the
+project is out of sync or out of order).
+
+``--dry-run`` (add, remove, move, sync, format, settings set/unset, schemes) prints the unified diff of what
+would be written instead of writing it; ``--plan json`` prints the objects that
+would be added, removed or modified. Either way the project is serialized once,
+messages go to stderr so stdout holds only the diff or plan, and the exit
+status is ``EXIT_CHANGED`` when the project would change.
+
+``--timings`` (or ``$PBXTOOL_TIMINGS``) reports per-phase times as JSON on
+stderr, ``--profile FILE`` dumps cProfile stats; see ``pbxtool.timings``.
+
+Commands import only the modules they need, so a no-op run costs little more
+than interpreter startup. Python tools can call ``main([...])`` in-process
+instead of spawning one interpreter per task; ``workspace`` does that for
+every project under a directory, on a process pool.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import posixpath
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .fileio import WriteConflict
+from .paths import find_repo_root, project_file
+
+if TYPE_CHECKING:
+    from .preview import Preview
+    from .project import Project
+    from .reader import ProjectReader
+    from .transaction import Transaction
+
+
+class CommandError(Exception):
+    """A user-facing error: printed without a traceback, exit status 1."""
+
+
+@contextlib.contextmanager
+def _lookup() -> Iterator[None]:
+    """Report a target, group or configuration the user named that does not exist as a ``CommandError``."""
+    try:
+        yield
+    except KeyError as error:
+        raise CommandError(error.args[0] if error.args else str(error)) from None
+
+
+def _project_path(args: argparse.Namespace) -> Path:
+    if args.project:
+        return Path(args.project).resolve()
+    try:
+        root = find_repo_root()
+    except FileNotFoundError:
+        root = find_repo_root(Path(__file__).resolve().parent)
+    return project_file(root)
+
+
+def _source_root(project_path: Path) -> Path:
+    return project_path.parent.parent
+
+
+def _repo_relative(source_root: Path, path: str) -> str:
+    """``path`` (absolute, cwd-relative or already source-root-relative) relative to the source root."""
+    candidate = Path(path)
+    if not candidate.is_absolute() and not candidate.exists():
+        return Path(os.path.normpath(path)).as_posix()
+    try:
+        return candidate.resolve().relative_to(source_root.resolve()).as_posix()
+    except ValueError:
+        raise CommandError(f"{path} is outside {source_root}") from None
+
+
+def _load(project_path: Path) -> "Project":
+    from .project import Project
+
+    return Project.load(project_path)
+
+
+def _previewing(args: argparse.Namespace) -> bool:
+    return bool(getattr(args, "dry_run", False) or getattr(args, "plan", None))
+
+
+def _commit(tx: "Transaction", args: argparse.Namespace) -> int:
+    from .transaction import EXIT_CHANGED
+
+    if _previewing(args):
+        return _show_preview(tx.preview(), args)
+    return EXIT_CHANGED if tx.commit() else 0
+
+
+def _show_preview(preview: "Preview", args: argparse.Namespace) -> int:
+    """Print the diff and/or plan of ``preview`` to the real stdout; nothing is written."""
+    import json
+
+    from . import timings
+    from .transaction import EXIT_CHANGED
+
+    try:
+        name = preview.path.resolve().relative_to(_source_root(preview.path.resolve())).as_posix()
+    except ValueError:
+        name = preview.path.as_posix()
+    diff = preview.diff(f"a/{name}", f"b/{name}")
+    with timings.phase("diff"):
+        if args.plan == "json":
+            plan = preview.plan()
+            if args.dry_run:
+                plan["diff"] = "".join(diff)
+            json.dump(plan, args.out, indent=2)
+            args.out.write("\n")
+        else:
+            args.out.writelines(diff)
+    return EXIT_CHANGED if preview.changed else 0
+
+
+# Commands ------------------------------------------------------------------
+
+
+def cmd_add(args: argparse.Namespace) -> int:
+    from .filetypes import build_phase_for
+    from .imports import assign_targets
+    from .sync import ensure_group, project_tree, roots_for
+
+    project_path = _project_path(args)
+    source_root = _source_root(project_path)
+    project = _load(project_path)
+    files, groups = project_tree(project)
+    tx = project.transaction()
+    paths = [_repo_relative(source_root, path) for path in args.files]
+    roots = roots_for(project_path)
+    inferred = {} if args.target or args.no_build else assign_targets(project, source_root, paths, roots)
+    for rel in paths:
+        if args.group is not None:
+            group = tx.ensure_group_path(args.group)
+            group_dir = tx.groups.nodes[group].dir
+            # Relative to the folder the group resolves to, so the reference points at ``rel``.
+            name = posixpath.relpath(rel, group_dir or ".") if group_dir is not None else rel.rsplit("/", 1)[-1]
+        else:
+            folder, _, name = rel.rpartition("/")
+            group = ensure_group(tx, groups, folder)
+        if args.no_build:
+            targets: List[str] = []
+        elif args.target:
+            targets = args.target
+        else:
+            targets = [inferred[rel]] if rel in inferred else []
+        if build_phase_for(rel) is None:
+            targets = []  # headers, Info.plist and the like are only referenced
+        with _lookup():
+            tx.add_files([(name, group)], targets)
+        verb = "Already in" if rel in files else "Adding to"
+        print(f"{verb} project: {rel}" + (f" ({', '.join(targets)})" if targets else ""))
+    return _commit(tx, args)
+
+
+def cmd_remove(args: argparse.Namespace) -> int:
+    from .sync import project_tree
+
+    project_path = _project_path(args)
+    source_root = _source_root(project_path)
+    project = _load(project_path)
+    files, _ = project_tree(project)
+    tx = project.transaction()
+    on_disk = not args.no_disk
+    removed = []
+    for path in args.files:
+        rel = _repo_relative(source_root, path)
+        ref = files.get(rel)
+        if ref is None:
+            print(f"Not in project: {rel}")
+            continue
+        print(f"Removing: {rel}" if on_disk else f"Removing from project: {rel}")
+        removed.append(rel)
+    if removed:
+        tx.remove_file_refs([files[rel] for rel in removed])
+    status = _commit(tx, args)
+    if on_disk and not _previewing(args):
+        # Like ``git rm``: otherwise the next ``sync`` adds the files straight back.
+        import shutil
+
+        for rel in removed:
+            path = source_root / rel
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path)  # bundles such as .xcassets are one file to the project
+            elif os.path.lexists(path):
+                os.unlink(path)
+    return status
+
+
+def cmd_move(args: argparse.Namespace) -> int:
+    from .sync import ensure_group, project_tree
+
+    project_path = _project_path(args)
+    source_root = _source_root(project_path)
+    project = _load(project_path)
+    files, groups = project_tree(project)
+    if len(args.paths) < 2:
+        raise CommandError("needs a source and a destination")
+    *sources, destination = args.paths
+    dst = _repo_relative(source_root, destination)
+    into = destination.endswith("/") or dst in groups
+    if len(sources) > 1 and not into:
+        raise CommandError(f"moving several files needs a folder destination, not {dst}")
+    moves: List[Tuple[str, str]] = []
+    for source in sources:
+        src = _repo_relative(source_root, source)
+        if src not in files:
+            raise CommandError(f"not in project: {src}")
+        moves.append((src, f"{dst}/{src.rsplit('/', 1)[-1]}" if into else dst))
+    on_disk = not args.no_disk
+    if on_disk:
+        # Like ``git mv``: check every file before touching anything. A file
+        # already at its destination (moved by hand) only needs the project.
+        for src, new in moves:
+            old_file, new_file = source_root / src, source_root / new
+            if not old_file.exists():
+                if not new_file.exists():
+                    raise CommandError(f"{src} is not on disk (--no-disk moves only the reference)")
+            elif new_file.exists() and not os.path.samefile(old_file, new_file):
+                raise CommandError(f"{new} already exists")
+    tx = project.transaction()
+    for src, new in moves:
+        folder, _, name = new.rpartition("/")
+        tx.move_file_ref(files[src], ensure_group(tx, groups, folder), name)
+        print(f"Moving: {src} -> {new}" if on_disk else f"Moving in project: {src} -> {new}")
+    status = _commit(tx, args)
+    if on_disk and not _previewing(args):
+        for src, new in moves:
+            old_file, new_file = source_root / src, source_root / new
+            if old_file.exists():
+                new_file.parent.mkdir(parents=True, exist_ok=True)
+                os.rename(old_file, new_file)
+    return status
+
+
+def cmd_sync(args: argparse.Namespace) -> int:
+    from .sync import roots_for, sync
+
+    project_path = _project_path(args)
+    result = sync(
+        project_path,
+        roots_for(project_path),
+        prune=args.prune,
+        write=not args.check,
+        use_cache=not args.no_cache,
+        preview=_previewing(args),
+    )
+    if result.cached:
+        print("✅ Xcode project is in sync (cached)")
+        return 0
+    previewing = result.preview is not None
+    if result.added:
+        if args.check:
+            print("❌ Missing from Xcode project:")
+        else:
+            print("Would add to Xcode project:" if previewing else "✅ Added to Xcode project:")
+        for path in result.added:
+            print(f"  - {path}")
+    if result.removed:
+        print("Would remove from Xcode project:" if previewing else "🗑  Removed from Xcode project:")
+        for path in result.removed:
+            print(f"  - {path}")
+    if result.stale:
+        print("⚠️  Referenced by Xcode project but missing on disk (use --prune to remove):")
+        for path in result.stale:
+            print(f"  - {path}")
+    if not (result.added or result.removed or result.stale):
+        print("✅ Xcode project is in sync")
+    if result.preview is not None:
+        return _show_preview(result.preview, args)
+    if args.check:
+        return 1 if result.added or result.stale else 0
+    from .transaction import EXIT_CHANGED
+
+    return EXIT_CHANGED if result.changed else 0
+
+
+def cmd_watch(args: argparse.Namespace) -> int:
+    from .sync import roots_for
+    from .watch import watch
+
+    project_path = _project_path(args)
+    roots = roots_for(project_path)
+
+    def report(result) -> None:
+        stamp = time.strftime("%H:%M:%S")
+        for path in result.added:
+            print(f"{stamp} ✅ added {path}")
+        for path in result.removed:
+            print(f"{stamp} 🗑  removed {path}")
+        for old, new in result.moved:
+            print(f"{stamp} ➡️  moved {old} -> {new}")
+        if result.written:
+            print(f"{stamp} wrote {project_path.name}", flush=True)
+
+    print(f"👀 Watching {', '.join(sorted(roots))} (Ctrl-C to stop)", flush=True)
+    try:
+        watch(project_path, roots, debounce=args.debounce, poll=args.poll, interval=args.interval, on_batch=report)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_format(args: argparse.Namespace) -> int:
+    from .canonical import canonicalize
+    from .preview import Snapshot
+    from .transaction import EXIT_CHANGED
+
+    project_path = _project_path(args)
+    project = _load(project_path)
+    if _previewing(args):
+        snapshot = Snapshot(project)
+        changes = canonicalize(project, write=True)
+        for change in changes:
+            print(f"Reordering: {change}")
+        return _show_preview(snapshot.preview(), args)
+    changes = canonicalize(project, write=not args.check)
+    if not changes:
+        print(f"✅ {project_path.name} is in canonical order")
+        return 0
+    if args.check:
+        for change in changes:
+            print(f"❌ {change}")
+        print("Run `scripts/pbxtool format` to fix.")
+        return 1
+    project.save()
+    print(f"✅ Sorted {project_path.name} ({len(changes)} sections, groups or phases reordered)")
+    return EXIT_CHANGED
+
+
+def cmd_check(args: argparse.Namespace) -> int:
+    from .check import check
+    from .schemes import check_schemes, container_for, load_schemes, scheme_targets
+    from .sync import roots_for
+
+    project_path = _project_path(args)
+    project = _load(project_path)
+    source_root = None if args.no_disk else _source_root(project_path)
+    problems = check(project, source_root, roots_for(project_path))
+    xcodeproj = project_path.parent
+    problems += check_schemes(load_schemes(xcodeproj), scheme_targets(project), container_for(xcodeproj))
+    if not problems:
+        print(f"✅ {project_path.name} is consistent ({len(project)} objects)")
+        return 0
+    for problem in problems:
+        print(f"❌ {problem}")
+    return 1
+
+
+def _setting(item: str) -> Tuple[str, Union[str, List[str]]]:
+    """``KEY=VALUE`` -> ``(key, value)``; a value in brackets is a JSON list (``KEY=["a", "b"]``)."""
+    import json
+
+    key, sep, value = item.partition("=")
+    if not sep or not key:
+        raise CommandError(f"expected KEY=VALUE, got {item!r}")
+    if value.startswith("["):
+        try:
+            items = json.loads(value)
+        except ValueError:
+            items = None
+        if not isinstance(items, list) or not all(isinstance(v, str) for v in items):
+            raise CommandError(f"{key}: a list value must be a JSON list of strings")
+        return key, items
+    return key, value
+
+
+def cmd_settings(args: argparse.Namespace) -> int:
+    import json
+
+    project_path = _project_path(args)
+    project = _load(project_path)
+    if args.action == "get":
+        if _previewing(args):
+            raise CommandError("--dry-run and --plan apply to set and unset")
+        settings = project.build_settings()
+        rows = [
+            row
+            for pattern in args.items or ["*"]
+            for row in settings.query(pattern, args.target, args.config, effective=args.effective)
+        ]
+        if not rows:
+            raise CommandError("no matching build settings")
+        if args.json:
+            keys = ("target", "configuration", "key", "value")
+            json.dump([dict(zip(keys, row)) for row in rows], sys.stdout, indent=2)
+            print()
+        else:
+            for target, configuration, key, value in rows:
+                print(f"{target}\t{configuration}\t{key}\t{' '.join(value) if isinstance(value, list) else value}")
+        return 0
+    if not args.items:
+        raise CommandError(f"settings {args.action} needs at least one key")
+    tx = project.transaction()
+    if args.action == "set":
+        values = dict(_setting(item) for item in args.items)
+        with _lookup():
+            matched = tx.set_build_settings(values, args.target, args.config)
+        shown = {key: json.dumps(value) if isinstance(value, list) else value for key, value in values.items()}
+        keys = ", ".join(f"{key}={value}" for key, value in shown.items())
+        for target, configuration in matched:
+            print(f"Setting {keys} in {target} ({configuration})")
+    else:
+        from .settings import matching_keys
+
+        with _lookup():
+            matched = tx.unset_build_settings(args.items, args.target, args.config)
+        for target, configuration in matched:
+            removed = matching_keys(tx.build_settings.settings(target, configuration), args.items)
+            print(f"Unsetting {', '.join(sorted(removed))} in {target} ({configuration})")
+    return _commit(tx, args)
+
+
+def cmd_schemes(args: argparse.Namespace) -> int:
+    from .parser import ParseError
+    from .preview import unified_diff
+    from .reader import ProjectReader
+    from .schemes import check_schemes, container_for, fix_schemes, load_schemes, scheme_dir, scheme_targets, untested
+    from .transaction import EXIT_CHANGED
+
+    project_path = _project_path(args)
+    xcodeproj = project_path.parent
+    try:
+        with ProjectReader(project_path) as reader:
+            targets = scheme_targets(reader)
+    except ParseError:
+        targets = scheme_targets(_load(project_path))
+    schemes = load_schemes(xcodeproj, args.scheme)
+    if not schemes:
+        raise CommandError(f"no shared scheme matching {args.scheme!r} in {scheme_dir(xcodeproj)}")
+    container = container_for(xcodeproj)
+
+    if args.action == "check":
+        problems = check_schemes(schemes, targets, container)
+        for problem in problems:
+            print(f"❌ {problem}")
+        for target in untested(schemes, targets):
+            print(f"⚠️  {target.name} is a test target no scheme runs (pbxtool schemes add-tests {target.name})")
+        if not problems:
+            print(f"✅ {len(schemes)} scheme(s) match the project's targets")
+        return 1 if problems else 0
+
+    if args.action == "fix":
+        for line in fix_schemes(schemes, targets, container):
+            print(line)
+    else:
+        if not args.targets:
+            raise CommandError(f"schemes {args.action} needs at least one target")
+        by_name = {target.name: target for target in targets.values()}
+        chosen = []
+        for name in args.targets:
+            target = by_name.get(name) or targets.get(name)
+            if target is None:
+                raise CommandError(f"no target named {name!r}")
+            chosen.append(target)
+        for scheme in schemes:
+            if args.action == "add-tests":
+                for target in chosen:
+                    if scheme.add_testable(target, container):
+                        print(f"Adding {target.name} to the tests of {scheme.name}")
+            else:
+                for name in scheme.remove_testables({target.id for target in chosen}):
+                    print(f"Removing {name} from the tests of {scheme.name}")
+
+    changed = False
+    source_root = _source_root(project_path)
+    for scheme in schemes:
+        if not scheme.modified:
+            continue
+        if args.dry_run:
+            name = scheme.path.relative_to(source_root).as_posix()
+            before, after = scheme.data.decode("utf-8"), scheme.render().decode("utf-8")
+            args.out.writelines(unified_diff(before, after, f"a/{name}", f"b/{name}"))
+            changed = changed or before != after
+        else:
+            changed = scheme.save() or changed
+    return EXIT_CHANGED if changed else 0
+
+
+def _query_files(
+    source: Union["Project", "ProjectReader"], folder: str
+) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+    """``(path -> file reference ID, file reference ID -> target names)`` under ``folder``."""
+    from .objects import PBXBuildFile
+    from .reader import ProjectReader
+    from .sync import project_tree
+
+    if isinstance(source, ProjectReader):
+        files = source.files(folder)
+        return files, source.membership(files.values())
+    files, _ = project_tree(source)
+    if folder:
+        files = {path: ref for path, ref in files.items() if path == folder or path.startswith(folder + "/")}
+    membership: Dict[str, List[str]] = {}
+    for target in source.targets():
+        for phase_id in target.build_phases:
+            for build_file_id in source[phase_id].get("files", ()):
+                build_file = source.get(build_file_id)
+                if isinstance(build_file, PBXBuildFile) and build_file.file_ref:
+                    membership.setdefault(build_file.file_ref, []).append(target.name)
+    return files, membership
+
+
+def _query_rows(args: argparse.Namespace, project: Union["Project", "ProjectReader"]) -> List[Dict[str, object]]:
+    """Rows for ``query`` from a ``ProjectReader`` or, for other layouts, a ``Project``."""
+    rows: List[Dict[str, object]] = []
+    if args.what == "targets":
+        for target in project.targets():
+            rows.append({"id": target.id, "name": target.name, "isa": target.isa})
+    elif args.what in ("files", "file"):
+        if args.what == "file":
+            if not args.id:
+                raise CommandError("query file needs a path")
+            path = _repo_relative(_source_root(_project_path(args)), args.id)
+            folder = posixpath.dirname(path)
+        else:
+            path = None
+            folder = args.group.strip("/") if args.group else ""
+        files, membership = _query_files(project, folder)
+        if path is not None:
+            if path not in files:
+                raise CommandError(f"{path} is not in the project")
+            files = {path: files[path]}
+        for path, ref in sorted(files.items()):
+            targets = membership.get(ref, [])
+            if args.target and args.target not in targets:
+                continue
+            rows.append({"id": ref, "path": path, "targets": targets})
+    else:
+        if not args.id:
+            raise CommandError("query object needs an object ID")
+        obj = project.get(args.id)
+        if obj is None:
+            raise CommandError(f"no object {args.id}")
+        rows.append({"id": obj.id, "isa": obj.isa, "comment": obj.comment, "fields": obj.fields})
+    return rows
+
+
+def cmd_query(args: argparse.Namespace) -> int:
+    import json
+
+    from .parser import ParseError
+    from .reader import ProjectReader
+
+    project_path = _project_path(args)
+    if args.what == "groups":
+        rows: List[Dict[str, object]] = []
+        for group_id, path in sorted(_load(project_path).group_paths().items(), key=lambda item: item[1]):
+            rows.append({"id": group_id, "path": path})
+    else:
+        # Read only the objects the query touches; fall back to the whole graph
+        # for files that are not in Xcode's layout.
+        try:
+            with ProjectReader(project_path) as reader:
+                rows = _query_rows(args, reader)
+        except ParseError:
+            rows = _query_rows(args, _load(project_path))
+
+    if args.json:
+        json.dump(rows, sys.stdout, indent=2)
+        print()
+    elif args.what == "object":
+        for key, value in rows[0]["fields"].items():  # type: ignore[union-attr]
+            print(f"{key} = {value}")
+    else:
+        for row in rows:
+            print("\t".join(", ".join(v) if isinstance(v, list) else str(v) for v in row.values()))
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    from .export import export_jsonl, export_sqlite
+
+    project_path = _project_path(args)
+    if args.jsonl is not None:
+        if args.db or args.full:
+            raise CommandError("--jsonl writes a stream; --db and --full are for the SQLite index")
+        if args.jsonl == "-":
+            export_jsonl(project_path, sys.stdout)
+            return 0
+        with open(args.jsonl, "w", encoding="utf-8") as out:
+            count = export_jsonl(project_path, out)
+        print(f"✅ Wrote {count} objects to {args.jsonl}")
+        return 0
+    result = export_sqlite(project_path, Path(args.db) if args.db else None, full=args.full)
+    if result.unchanged:
+        print(f"✅ {result.path} is up to date ({result.total} objects)")
+    else:
+        print(
+            f"✅ Exported {result.total} objects to {result.path} "
+            f"({result.written} written, {result.removed} removed)"
+        )
+    return 0
+
+
+def cmd_workspace(args: argparse.Namespace) -> int:
+    import json
+
+    from .workspace import discover, overall_status, run
+
+    argv = args.args[1:] if args.args[:1] == ["--"] else args.args
+    if not argv:
+        raise CommandError("give the pbxtool command to run, e.g. `workspace check`")
+    if argv[0] in ("watch", "workspace"):
+        raise CommandError(f"{argv[0]} cannot run over a workspace")
+    if args.project:
+        raise CommandError("--project and workspace do not mix; use --root")
+    root = Path(args.root).resolve()
+    projects = discover(root)
+    if not projects:
+        raise CommandError(f"no .xcodeproj under {root}")
+
+    start = time.perf_counter()
+    results = run(projects, argv, args.jobs)
+    elapsed = time.perf_counter() - start
+    status = overall_status(results)
+    if args.json:
+        json.dump([result.as_dict() for result in results], sys.stdout, indent=2)
+        print()
+        return status
+
+    from .transaction import EXIT_CHANGED
+
+    for result in results:
+        if args.quiet and result.status == 0:
+            continue
+        name = result.project.parent.relative_to(root).as_posix()
+        print(f"== {name} (exit {result.status}, {result.seconds:.2f}s)")
+        print(result.output, end="" if result.output.endswith("\n") or not result.output else "\n")
+    failed = sum(1 for result in results if result.status not in (0, EXIT_CHANGED))
+    changed = sum(1 for result in results if result.status == EXIT_CHANGED)
+    marker = "❌" if failed else "✅"
+    print(
+        f"{marker} {len(results)} projects in {elapsed:.2f}s: "
+        f"{len(results) - failed - changed} unchanged, {changed} changed, {failed} failed"
+    )
+    return status
+
+
+# Entry point -------------------------------------------------------------------
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="pbxtool", description="Edit and inspect FamilyTodo.xcodeproj.")
+    parser.add_argument("--project", help="project.pbxproj to work on (default: the repo's)")
+    parser.add_argument(
+        "--timings",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="print per-phase times as JSON to stderr, or append them to FILE",
+    )
+    parser.add_argument("--timings-memory", action="store_true", help="with --timings: trace peak memory (slower)")
+    parser.add_argument("--profile", metavar="FILE", help="write cProfile stats of the run to FILE")
+    commands = parser.add_subparsers(dest="command", required=True)
+    # Shared by the commands that edit the project (not ``watch``, which runs until stopped).
+    preview = argparse.ArgumentParser(add_help=False)
+    preview.add_argument("--dry-run", action="store_true", help="print the diff that would be written; write nothing")
+    preview.add_argument("--plan", choices=["json"], help="print the objects that would be added, removed or modified")
+
+    add = commands.add_parser("add", parents=[preview], help="add files to the project (and their targets)")
+    add.add_argument("files", nargs="+", help="paths relative to the repo root")
+    add.add_argument(
+        "--group", help='group to add to ("FamilyTodo/Stores", created if missing); default: the file\'s folder'
+    )
+    add.add_argument("--target", action="append", help="target to build the files in (repeatable); sources and resources go to the matching phase")
+    add.add_argument("--no-build", action="store_true", help="only add file references")
+    add.set_defaults(func=cmd_add)
+
+    remove = commands.add_parser(
+        "remove", parents=[preview], help="delete files along with their references, build files and memberships"
+    )
+    remove.add_argument("files", nargs="+")
+    remove.add_argument("--no-disk", action="store_true", help="only remove the references; keep the files")
+    remove.set_defaults(func=cmd_remove)
+
+    move = commands.add_parser(
+        "move", parents=[preview], help="move files and their references to another folder, or rename one"
+    )
+    move.add_argument("paths", nargs="+", metavar="path", help="sources, then the new path or a folder (ending in /)")
+    move.add_argument("--no-disk", action="store_true", help="only move the references; leave the files where they are")
+    move.set_defaults(func=cmd_move)
+
+    sync = commands.add_parser(
+        "sync", parents=[preview], help="add files found on disk, report (or --prune) missing ones"
+    )
+    sync.add_argument("--prune", action="store_true", help="remove references to missing files")
+    sync.add_argument("--check", action="store_true", help="only report; exit 1 if out of sync")
+    sync.add_argument("--no-cache", action="store_true", help="ignore the stat cache")
+    sync.set_defaults(func=cmd_sync)
+
+    check = commands.add_parser("check", help="verify references, membership and files; exit 1 on problems")
+    check.add_argument("--no-disk", action="store_true", help="skip the checks against files on disk")
+    check.set_defaults(func=cmd_check)
+
+    fmt = commands.add_parser(
+        "format", parents=[preview], help="sort sections by ID and group children by name (folders first)"
+    )
+    mode = fmt.add_mutually_exclusive_group()
+    mode.add_argument("--check", action="store_true", help="only report; exit 1 if anything is out of order")
+    mode.add_argument("--fix", action="store_true", help="rewrite the project if needed (the default)")
+    fmt.set_defaults(func=cmd_format)
+
+    watch = commands.add_parser("watch", help="keep the project in sync while files change")
+    watch.add_argument("--debounce", type=float, default=0.3, help="seconds of quiet before writing (default 0.3)")
+    watch.add_argument("--poll", action="store_true", help="poll directories instead of using inotify")
+    watch.add_argument("--interval", type=float, default=1.0, help="polling interval in seconds (default 1)")
+    watch.set_defaults(func=cmd_watch)
+
+    query = commands.add_parser("query", help="list targets, groups or files, or show a file or an object")
+    query.add_argument("what", choices=["targets", "groups", "files", "file", "object"])
+    query.add_argument("id", nargs="?", metavar="ID|PATH", help="object ID for `query object`, path for `query file`")
+    query.add_argument("--group", help="files: only those under this folder (FamilyTodo/Stores)")
+    query.add_argument("--target", help="files: only those built by this target")
+    query.add_argument("--json", action="store_true", help="print JSON")
+    query.set_defaults(func=cmd_query)
+
+    settings = commands.add_parser(
+        "settings", parents=[preview], help="get, set or unset build settings by target and configuration"
+    )
+    settings.add_argument("action", choices=["get", "set", "unset"])
+    settings.add_argument("items", nargs="*", metavar="KEY|KEY=VALUE", help="keys (globs for get and unset)")
+    settings.add_argument("--target", default="*", help='target glob; the project is "<project>" (default: all)')
+    settings.add_argument("--config", default="*", help="configuration glob (Debug, Release; default: all)")
+    settings.add_argument("--effective", action="store_true", help="get: resolve project -> target inheritance")
+    settings.add_argument("--json", action="store_true", help="get: print JSON")
+    settings.set_defaults(func=cmd_settings)
+
+    schemes = commands.add_parser("schemes", help="check shared schemes against the targets, fix them, edit tests")
+    schemes.add_argument("action", choices=["check", "fix", "add-tests", "remove-tests"])
+    schemes.add_argument("targets", nargs="*", metavar="target", help="add-tests / remove-tests: target names")
+    schemes.add_argument("--scheme", default="*", help="scheme name glob (default: all shared schemes)")
+    schemes.add_argument("--dry-run", action="store_true", help="print the diff that would be written; write nothing")
+    schemes.set_defaults(func=cmd_schemes)
+
+    export = commands.add_parser("export", help="write the object graph to an SQLite index (incremental) or JSON lines")
+    export.add_argument("--db", help="SQLite database (default: build/pbxtool/index.sqlite)")
+    export.add_argument("--full", action="store_true", help="rewrite every row, not only those of changed objects")
+    export.add_argument(
+        "--jsonl", nargs="?", const="-", metavar="FILE", help="write one JSON object per line instead (default: stdout)"
+    )
+    export.set_defaults(func=cmd_export)
+
+    workspace = commands.add_parser(
+        "workspace", help="run a command on every .xcodeproj under a directory, in parallel"
+    )
+    workspace.add_argument("--root", default=".", help="directory to search (default: the current one)")
+    workspace.add_argument("-j", "--jobs", type=int, help="worker processes (default: one per CPU)")
+    workspace.add_argument("-q", "--quiet", action="store_true", help="only show projects that changed or failed")
+    workspace.add_argument("--json", action="store_true", help="print each project's status and output as JSON")
+    workspace.add_argument("args", nargs=argparse.REMAINDER, metavar="command ...", help="pbxtool command and options")
+    workspace.set_defaults(func=cmd_workspace)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    args.out = sys.stdout
+    output = args.timings or os.environ.get("PBXTOOL_TIMINGS") or None
+    if output in ("0", "1"):
+        output = "-" if output == "1" else None
+    memory = args.timings_memory or os.environ.get("PBXTOOL_TIMINGS_MEMORY") == "1"
+    profile = args.profile or os.environ.get("PBXTOOL_PROFILE") or None
+    if output is None and memory:
+        output = "-"
+    if output is None and profile is None:
+        return _run(args)
+
+    from .timings import session
+
+    with session(output, memory, profile, command=args.command, argv=list(argv or sys.argv[1:])) as report:
+        report["status"] = _run(args)
+    return report["status"]
+
+
+def _run(args: argparse.Namespace) -> int:
+    try:
+        if _previewing(args):
+            # stdout carries only the diff or plan; progress messages go to stderr.
+            with contextlib.redirect_stdout(sys.stderr):
+                return args.func(args)
+        return args.func(args)
+    except (CommandError, WriteConflict) as error:
+        message = error.args[0] if error.args else error
+        print(f"pbxtool {args.command}: {message}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # The reader went away (``pbxtool export --jsonl | head``): stop quietly.
+        # Point stdout at /dev/null so flushing it at exit does not fail again.
+        try:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        except (OSError, ValueError):
+            pass
+        return 1
@@ -0,0 +1,364 @@
+"""Export the project graph to SQLite or JSON lines for querying outside pbxtool.
+
+``export_sqlite()`` keeps an indexed database next to the other caches
+(``build/pbxtool/index.sqlite``):
+
+* ``objects``: one row per object (id, isa, name, comment, fields as JSON)
+  and the hash of its text;
+* ``refs``: every field that names another object (``children``, ``files``,
+  ``fileRef``, ``buildPhases``, ...), with its position in a list;
+* ``elements``: the source-root-relative path of each group and file reference
+  reachable from the main group;
+* ``build_settings``: one row per configuration and key;
+
+plus the views ``files``, ``groups``, ``membership`` and ``target_settings``
+that join them the way ``query`` and ``settings`` do.
+
+Updates are incremental. The database records the SHA-1 of the file it was
+built from and of every object's text: an unchanged file costs one hash, and
+after an edit only the objects whose text changed are deleted and inserted
+again, in one SQLite transaction (readers see the old or the new graph,
+never half of each). Element paths are rebuilt when a group or file
+reference changed. Objects are sliced and hashed through ``ProjectReader``,
+so only changed ones are parsed.
+
+``export_jsonl()`` streams the same objects, one JSON document per line, in
+file order.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from . import timings
+from .groups import resolve_dir
+from .objects import PBXFileElement, PBXGroup, PBXObject, PBXProject, XCBuildConfiguration, object_class
+from .parser import parse_object
+from .paths import cache_dir
+from .project import Project
+
+if TYPE_CHECKING:
+    from .reader import ProjectReader
+
+    Source = Union[Project, ProjectReader]
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS objects (
+    id TEXT PRIMARY KEY, isa TEXT NOT NULL, name TEXT, comment TEXT, hash TEXT NOT NULL, fields TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (source TEXT NOT NULL, key TEXT NOT NULL, target TEXT NOT NULL, position INTEGER);
+CREATE TABLE IF NOT EXISTS elements (id TEXT PRIMARY KEY, parent TEXT, path TEXT);
+CREATE TABLE IF NOT EXISTS build_settings (
+    config TEXT NOT NULL, key TEXT NOT NULL, value TEXT, list INTEGER NOT NULL, PRIMARY KEY (config, key)
+);
+
+CREATE VIEW IF NOT EXISTS files AS
+    SELECT e.id, e.path, e.parent AS group_id, json_extract(o.fields, '$.lastKnownFileType') AS file_type
+    FROM elements e JOIN objects o ON o.id = e.id WHERE o.isa = 'PBXFileReference';
+CREATE VIEW IF NOT EXISTS groups AS
+    SELECT e.id, e.path, e.parent AS group_id, o.name,
+        (SELECT COUNT(*) FROM refs r WHERE r.source = e.id AND r.key = 'children') AS children
+    FROM elements e JOIN objects o ON o.id = e.id WHERE o.isa IN ('PBXGroup', 'PBXVariantGroup', 'XCVersionGroup');
+CREATE VIEW IF NOT EXISTS membership AS
+    SELECT bf.target AS file, bf.source AS build_file, phase.source AS phase, p.isa AS phase_isa,
+        target.source AS target, t.name AS target_name
+    FROM refs bf
+    JOIN refs phase ON phase.target = bf.source AND phase.key = 'files'
+    JOIN refs target ON target.target = phase.source AND target.key = 'buildPhases'
+    JOIN objects p ON p.id = phase.source
+    JOIN objects t ON t.id = target.source
+    WHERE bf.key = 'fileRef';
+CREATE VIEW IF NOT EXISTS target_settings AS
+    SELECT COALESCE(owner.name, '<project>') AS target, config.name AS configuration, s.key, s.value, s.list
+    FROM build_settings s
+    JOIN objects config ON config.id = s.config
+    JOIN refs list ON list.target = s.config AND list.key = 'buildConfigurations'
+    JOIN refs ref ON ref.target = list.source AND ref.key = 'buildConfigurationList'
+    JOIN objects owner ON owner.id = ref.source;
+"""
+
+# Dropped during a full rebuild and created again afterwards: sorting once is
+# much faster than inserting a few hundred thousand random IDs into a b-tree.
+_INDEXES = {
+    "objects_isa": "objects (isa, name)",
+    "refs_source": "refs (source, key)",
+    "refs_target": "refs (target, key)",
+    "elements_path": "elements (path)",
+    "build_settings_key": "build_settings (key)",
+}
+
+_TABLES = ("objects", "refs", "elements", "build_settings", "meta")
+_VIEWS = ("files", "groups", "membership", "target_settings")
+
+
+def index_path(project_path: Path) -> Path:
+    """Default database for ``project_path``: ``index.sqlite`` in the pbxtool cache directory."""
+    return cache_dir(project_path.parent.parent) / "index.sqlite"
+
+
+class ExportResult:
+    """What an export did: objects written and removed, out of ``total``."""
+
+    __slots__ = ("path", "digest", "total", "written", "removed", "unchanged")
+
+    def __init__(self, path: Path, digest: str, total: int, written: int, removed: int, unchanged: bool) -> None:
+        self.path = path
+        self.digest = digest
+        self.total = total
+        self.written = written
+        self.removed = removed
+        self.unchanged = unchanged
+
+    def __repr__(self) -> str:
+        return f"ExportResult({self.path}, total={self.total}, written={self.written}, removed={self.removed})"
+
+
+# Reading the project -----------------------------------------------------------
+
+
+def _texts(source: "Source") -> Iterator[Tuple[str, str]]:
+    """``(id, text)`` of every object, in file order."""
+    from .reader import ProjectReader
+
+    if isinstance(source, ProjectReader):
+        for object_id in source:
+            yield object_id, source.raw(object_id)
+        return
+    from .serializer import render_object
+
+    for object_id, obj in source.objects.items():
+        yield object_id, obj.raw if obj.raw is not None else render_object(source, obj)
+
+
+def _parsed(source: "Source", object_id: str, text: str) -> PBXObject:
+    """The object from ``source`` if it is a ``Project``; from a reader, parsed from ``text`` and not kept."""
+    return source[object_id] if isinstance(source, Project) else parse_object(text)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+@timings.timed("paths")
+def element_paths(source: "Source") -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """Group or file reference ID -> ``(parent group ID, source-root-relative path or None)``."""
+    found: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    root = source.get(source.root.main_group)
+    if not isinstance(root, PBXGroup):
+        return found
+    found[root.id] = (None, "")
+    stack: List[Tuple[PBXGroup, Optional[str]]] = [(root, "")]
+    while stack:
+        group, group_dir = stack.pop()
+        for child_id in group.children:
+            child = source.get(child_id)
+            if not isinstance(child, PBXFileElement) or child_id in found:
+                continue
+            path = resolve_dir(child.source_tree, child.path, group_dir)
+            found[child_id] = (group.id, path)
+            if isinstance(child, PBXGroup):
+                stack.append((child, path))
+    return found
+
+
+def _refs(source: "Source", object_id: str, fields: Dict[str, Any]) -> Iterator[Tuple[str, str, str, Optional[int]]]:
+    for key, value in fields.items():
+        if key == "isa":
+            continue
+        if isinstance(value, list):
+            for position, item in enumerate(value):
+                if isinstance(item, str) and item in source:
+                    yield object_id, key, item, position
+        elif isinstance(value, str) and value in source:
+            yield object_id, key, value, None
+
+
+def _structural(isa: str) -> bool:
+    """Whether removing an object of this class can move element paths."""
+    return issubclass(object_class(isa), (PBXFileElement, PBXProject))
+
+
+# SQLite --------------------------------------------------------------------------
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    """Open (creating if needed) an export database with the current schema."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(db_path)
+    db.execute("PRAGMA journal_mode = WAL")  # queries keep running during an update
+    version = db.execute("PRAGMA user_version").fetchone()[0]
+    if version != SCHEMA_VERSION:
+        with db:
+            for view in _VIEWS:
+                db.execute(f"DROP VIEW IF EXISTS {view}")
+            for table in _TABLES:
+                db.execute(f"DROP TABLE IF EXISTS {table}")
+            db.executescript(_SCHEMA)
+            _create_indexes(db)
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return db
+
+
+def export_sqlite(project_path: Path, db_path: Optional[Path] = None, full: bool = False) -> ExportResult:
+    """Bring the database at ``db_path`` (default: ``index_path()``) up to date with the project.
+
+    ``full`` rewrites every row instead of only those of changed objects.
+    """
+    from .parser import ParseError
+    from .reader import ProjectReader
+
+    project_path = Path(project_path)
+    db_path = Path(db_path) if db_path is not None else index_path(project_path)
+    digest = hashlib.sha1(project_path.read_bytes()).hexdigest()
+    db = connect(db_path)
+    try:
+        meta = dict(db.execute("SELECT key, value FROM meta"))
+        incremental = not full and meta.get("project") == str(project_path)
+        if incremental and meta.get("sha1") == digest:
+            total = db.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+            return ExportResult(db_path, digest, total, 0, 0, True)
+        stored: Dict[str, Tuple[str, str]] = {}
+        if incremental:
+            stored = {row[0]: (row[1], row[2]) for row in db.execute("SELECT id, hash, isa FROM objects")}
+        # Objects are checked against Xcode's layout as the reader reaches them;
+        # a file that does not fit is read whole instead (nothing was written).
+        try:
+            with ProjectReader(project_path) as reader:
+                written, removed, total = _update(db, reader, dict(stored), incremental)
+        except ParseError:
+            written, removed, total = _update(db, Project.load(project_path), stored, incremental)
+        db.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [("project", str(project_path)), ("sha1", digest)]
+        )
+        db.commit()
+        return ExportResult(db_path, digest, total, written, removed, False)
+    finally:
+        db.close()
+
+
+@timings.timed("update")
+def _update(
+    db: sqlite3.Connection, source: "Source", stored: Dict[str, Tuple[str, str]], incremental: bool
+) -> Tuple[int, int, int]:
+    """Write the rows of objects whose hash differs from ``stored``; returns (written, removed, total).
+
+    Leaves the transaction open so the caller commits it with the new file hash.
+    """
+    rows = _Rows(source)
+    total = 0
+    for object_id, text in _texts(source):
+        total += 1
+        text_hash = _digest(text)
+        old = stored.pop(object_id, None)
+        if old is None or old[0] != text_hash:
+            rows.add(object_id, text, text_hash)
+    removed = list(stored)
+    paths = not incremental or rows.structural or any(_structural(isa) for _, isa in stored.values())
+    elements = sorted((object_id, *entry) for object_id, entry in element_paths(source).items()) if paths else None
+    db.execute("BEGIN")
+    try:
+        if not incremental:
+            for name in _INDEXES:
+                db.execute(f"DROP INDEX IF EXISTS {name}")
+            for table in _TABLES:
+                db.execute(f"DELETE FROM {table}")
+        rows.write(db, removed if incremental else None)
+        if elements is not None:
+            db.execute("DELETE FROM elements")
+            db.executemany("INSERT INTO elements VALUES (?, ?, ?)", elements)
+        if not incremental:
+            _create_indexes(db)
+    except BaseException:
+        db.rollback()
+        raise
+    return len(rows.objects), len(removed), total
+
+
+def _create_indexes(db: sqlite3.Connection) -> None:
+    for name, columns in _INDEXES.items():
+        db.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {columns}")
+
+
+class _Rows:
+    """Rows for the objects whose text changed, collected in one pass over the file."""
+
+    def __init__(self, source: "Source") -> None:
+        self.source = source
+        self.objects: List[Tuple[str, str, Optional[str], Optional[str], str, str]] = []
+        self.refs: List[Tuple[str, str, str, Optional[int]]] = []
+        self.settings: List[Tuple[str, str, str, int]] = []
+        self.structural = False
+
+    def add(self, object_id: str, text: str, text_hash: str) -> None:
+        obj = _parsed(self.source, object_id, text)
+        fields = obj.fields
+        name = fields.get("name")
+        self.objects.append(
+            (object_id, obj.isa, name if isinstance(name, str) else None, obj.comment, text_hash, json.dumps(fields))
+        )
+        self.refs.extend(_refs(self.source, object_id, fields))
+        if isinstance(obj, XCBuildConfiguration):
+            for key, value in obj.build_settings.items():
+                is_list = isinstance(value, list)
+                self.settings.append((object_id, key, json.dumps(value) if is_list else str(value), int(is_list)))
+        self.structural = self.structural or isinstance(obj, (PBXFileElement, PBXProject))
+
+    def write(self, db: sqlite3.Connection, removed: Optional[List[str]]) -> None:
+        """Replace the rows of the changed objects and delete those of ``removed`` (None: tables are empty)."""
+        if removed is not None:
+            stale = [(object_id,) for object_id in removed] + [(row[0],) for row in self.objects]
+            db.executemany("DELETE FROM objects WHERE id = ?", stale)
+            db.executemany("DELETE FROM refs WHERE source = ?", stale)
+            db.executemany("DELETE FROM build_settings WHERE config = ?", stale)
+        self.objects.sort()
+        db.executemany("INSERT INTO objects VALUES (?, ?, ?, ?, ?, ?)", self.objects)
+        db.executemany("INSERT INTO refs VALUES (?, ?, ?, ?)", self.refs)
+        db.executemany("INSERT INTO build_settings VALUES (?, ?, ?, ?)", self.settings)
+
+
+# JSON lines ----------------------------------------------------------------------
+
+
+def export_jsonl(project_path: Path, out: IO[str]) -> int:
+    """Write one ``{"id", "isa", "comment", "path", "fields"}`` line per object to ``out``; returns the count.
+
+    ``path`` is the source-root-relative location of groups and file
+    references (null for other objects and for elements outside the source
+    root). Objects are parsed one at a time and dropped; only the groups and
+    file references are kept, for their paths.
+    """
+    from .parser import ParseError
+    from .reader import ProjectReader
+
+    project_path = Path(project_path)
+    count = 0
+    try:
+        with ProjectReader(project_path) as reader:
+            for line in _lines(reader):
+                out.write(line)
+                count += 1
+    except ParseError:
+        # Objects come out in file order either way: carry on after the last one written.
+        for line in _lines(Project.load(project_path), count):
+            out.write(line)
+            count += 1
+    return count
+
+
+def _lines(source: "Source", skip: int = 0) -> Iterator[str]:
+    paths = element_paths(source)
+    for object_id, text in _texts(source):
+        if skip:
+            skip -= 1
+            continue
+        obj = _parsed(source, object_id, text)
+        path = paths.get(object_id, (None, None))[1]
+        record = {"id": object_id, "isa": obj.isa, "comment": obj.comment, "path": path, "fields": obj.fields}
+        yield json.dumps(record, separators=(",", ":")) + "\n"
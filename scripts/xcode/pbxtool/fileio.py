@@ -0,0 +1,128 @@
+"""Atomic file writes for project files, and the lock that orders them.
+
+Writers of one project take ``FileLock(path)`` (an exclusive ``flock`` on the
+directory holding it, the .xcodeproj bundle) only around checking the file
+and renaming the new one into place; loading, editing and serializing run
+unlocked, so writers to one project overlap everything but the rename and
+writers to different projects never wait for each other. ``write_if_changed``
+with ``base`` (the ``content_digest`` of the bytes the new text was derived
+from) raises ``WriteConflict`` instead of overwriting a file someone else
+changed in the meantime; ``Transaction.commit()`` catches it and rebases.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+from . import timings
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock; writes stay atomic, conflicts are still detected
+    fcntl = None  # type: ignore[assignment]
+
+
+class WriteConflict(Exception):
+    """``path`` changed on disk since it was read; ``data`` is what it holds now."""
+
+    def __init__(self, path: Union[str, Path], data: bytes, reason: str = "") -> None:
+        reason = reason or "changed on disk since it was loaded"
+        super().__init__(f"{path} {reason}; nothing was written")
+        self.path = Path(path)
+        self.data = data
+
+
+class FileLock:
+    """Exclusive advisory lock on the directory holding ``path``; ``acquire``/``release`` are idempotent."""
+
+    __slots__ = ("path", "_fd")
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path).parent
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> None:
+        if self._fd is not None or fcntl is None:
+            return
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            with timings.phase("lock"):
+                fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def release(self) -> None:
+        if self._fd is not None:
+            fd, self._fd = self._fd, None
+            os.close(fd)  # drops the flock
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.release()
+
+
+def content_digest(data: bytes) -> str:
+    """Hash identifying one version of a file (also the parse cache key)."""
+    return hashlib.sha1(data).hexdigest()
+
+
+def write_atomic(path: Union[str, Path], text: Union[str, bytes]) -> None:
+    """Write ``text`` to ``path`` via a temp file in the same directory + rename.
+
+    Readers either see the old file or the new one, never a truncated write.
+    ``str`` is written as UTF-8.
+    """
+    import tempfile  # only writers pay for it; read-only runs stay quick to start
+
+    path = Path(path)
+    data = text.encode("utf-8") if isinstance(text, str) else text
+    timings.count("bytes_written", len(data))
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_if_changed(path: Union[str, Path], text: Union[str, bytes], base: Optional[str] = None) -> bool:
+    """``write_atomic`` unless ``path`` already holds exactly ``text``.
+
+    Returns whether the file was written. Skipping identical writes keeps the
+    mtime, so Xcode does not reload the project and builds stay incremental.
+    With ``base``, raises ``WriteConflict`` (writing nothing) if the file no
+    longer has that ``content_digest``; hold ``FileLock(path)`` around the
+    call so nothing can slip in between the check and the rename.
+    """
+    with timings.phase("write"):
+        data = text.encode("utf-8") if isinstance(text, str) else text
+        try:
+            with open(path, "rb") as f:
+                current = f.read()
+        except FileNotFoundError:
+            current = None
+        if current == data:
+            return False
+        if base is not None and current is not None and content_digest(current) != base:
+            raise WriteConflict(path, current)
+        write_atomic(path, data)
+        return True
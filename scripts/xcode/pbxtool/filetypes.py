@@ -0,0 +1,71 @@
+"""File extension -> Xcode ``lastKnownFileType`` and build phase mappings."""
+
+from __future__ import annotations
+
+from pathlib import PurePosixPath
+from typing import Optional
+
+FILE_TYPES = {
+    ".swift": "sourcecode.swift",
+    ".h": "sourcecode.c.h",
+    ".m": "sourcecode.c.objc",
+    ".mm": "sourcecode.cpp.objcpp",
+    ".c": "sourcecode.c.c",
+    ".cpp": "sourcecode.cpp.cpp",
+    ".metal": "sourcecode.metal",
+    ".storyboard": "file.storyboard",
+    ".xib": "file.xib",
+    ".xcassets": "folder.assetcatalog",
+    ".plist": "text.plist.xml",
+    ".strings": "text.plist.strings",
+    ".stringsdict": "text.plist.stringsdict",
+    ".xcstrings": "text.json.xcstrings",
+    ".entitlements": "text.plist.entitlements",
+    ".xcprivacy": "text.xml",
+    ".json": "text.json",
+    ".md": "net.daringfireball.markdown",
+    ".png": "image.png",
+    ".jpg": "image.jpeg",
+    ".xcdatamodeld": "wrapper.xcdatamodeld",
+    ".framework": "wrapper.framework",
+}
+
+
+def file_type_for(path: str) -> str:
+    """Best-guess ``lastKnownFileType`` for ``path`` (``text`` if unknown)."""
+    return FILE_TYPES.get(PurePosixPath(path).suffix.lower(), "text")
+
+
+# Extensions compiled in a target's Sources phase and copied by its Resources
+# phase; anything else (headers, entitlements, docs) is only referenced.
+SOURCE_TYPES = frozenset({".swift", ".m", ".mm", ".c", ".cpp", ".metal", ".xcdatamodeld"})
+RESOURCE_TYPES = frozenset(
+    {
+        ".xcassets",
+        ".storyboard",
+        ".xib",
+        ".plist",
+        ".strings",
+        ".stringsdict",
+        ".xcstrings",
+        ".xcprivacy",
+        ".json",
+        ".png",
+        ".jpg",
+    }
+)
+
+
+def build_phase_for(path: str) -> Optional[str]:
+    """isa of the build phase that should build ``path``, or None if no phase should.
+
+    Info.plist files are read through the INFOPLIST_FILE build setting and must not
+    be copied as resources, so they get None like other unbuilt files.
+    """
+    pure = PurePosixPath(path)
+    suffix = pure.suffix.lower()
+    if suffix in SOURCE_TYPES:
+        return "PBXSourcesBuildPhase"
+    if suffix in RESOURCE_TYPES and not (suffix == ".plist" and pure.name.endswith("Info.plist")):
+        return "PBXResourcesBuildPhase"
+    return None
@@ -0,0 +1,131 @@
+"""Group hierarchy index: display paths to groups, in one pass.
+
+A ``GroupTree`` is a trie over the PBXGroup hierarchy starting at the main
+group. Each node is keyed by the name Xcode shows for the group (its ``name``,
+else the last component of its ``path``) and, when a group has both, also by
+its single-component ``path``, so ``FamilyTodo/Stores`` and
+``FamilyTodoTests/Stores`` are different nodes and a lookup costs one dict hit
+per component. Each node also records the folder the group resolves to on
+disk, following ``path`` and ``sourceTree`` the way Xcode does.
+
+``Transaction.groups`` keeps one tree in step with the groups it creates, and
+``Transaction.ensure_group_path()`` creates missing intermediate groups.
+"""
+
+from __future__ import annotations
+
+import posixpath
+from typing import TYPE_CHECKING, Dict, Iterator, Optional
+
+from .objects import PBXGroup
+
+if TYPE_CHECKING:
+    from .project import Project
+
+
+def resolve_dir(source_tree: Optional[str], path: Optional[str], parent_dir: Optional[str]) -> Optional[str]:
+    """Source-root-relative location of an element with this ``sourceTree`` and ``path``.
+
+    ``<group>`` is relative to the parent's location and ``SOURCE_ROOT`` to the
+    source root; other trees (absolute paths, build products, SDKs) have no
+    location under the source root and give None.
+    """
+    if source_tree == "<group>":
+        base = parent_dir
+    elif source_tree == "SOURCE_ROOT":
+        base = ""
+    else:
+        return None
+    if base is None:
+        return None
+    if not path:
+        return base
+    resolved = posixpath.normpath(posixpath.join(base, path))
+    return "" if resolved == "." else resolved
+
+
+class GroupNode:
+    """One group: its ID, display path from the main group and folder on disk (or None)."""
+
+    __slots__ = ("id", "name", "path", "dir", "children")
+
+    def __init__(self, group_id: str, name: str, path: str, dir: Optional[str]) -> None:
+        self.id = group_id
+        self.name = name
+        self.path = path
+        self.dir = dir
+        self.children: Dict[str, GroupNode] = {}
+
+    def __repr__(self) -> str:
+        return f"GroupNode({self.id}, {self.path!r}, dir={self.dir!r})"
+
+
+class GroupTree:
+    """Trie of the groups reachable from the main group."""
+
+    def __init__(self, project: "Project") -> None:
+        objects = project.objects
+        main = project.main_group
+        self.root = GroupNode(main.id, main.display_name, "", "")
+        self.nodes: Dict[str, GroupNode] = {main.id: self.root}
+        stack = [(main, self.root)]
+        while stack:
+            group, node = stack.pop()
+            for child_id in group.children:
+                child = objects.get(child_id)
+                if isinstance(child, PBXGroup) and child_id not in self.nodes:
+                    stack.append((child, self.add(node, child_id, child.name, child.path, child.source_tree)))
+
+    def add(
+        self,
+        parent: Optional[GroupNode],
+        group_id: str,
+        name: Optional[str],
+        path: Optional[str],
+        source_tree: Optional[str] = "<group>",
+    ) -> GroupNode:
+        """Record a group under ``parent`` (None: not attached to the tree yet)."""
+        display = name or (path.rsplit("/", 1)[-1] if path else group_id)
+        if parent is None:
+            node = GroupNode(group_id, display, display, None)
+        else:
+            full = f"{parent.path}/{display}" if parent.path else display
+            node = GroupNode(group_id, display, full, resolve_dir(source_tree, path, parent.dir))
+            # When two siblings share a name the first one listed wins.
+            parent.children.setdefault(display, node)
+            if path and path != display and "/" not in path:
+                parent.children.setdefault(path, node)
+        self.nodes[group_id] = node
+        return node
+
+    def find(self, path: str) -> Optional[GroupNode]:
+        """Node at display path ``path`` ("FamilyTodo/Stores"), or None."""
+        node: Optional[GroupNode] = self.root
+        for component in filter(None, path.split("/")):
+            node = node.children.get(component)
+            if node is None:
+                return None
+        return node
+
+    def __getitem__(self, path: str) -> GroupNode:
+        node = self.root
+        for component in filter(None, path.split("/")):
+            child = node.children.get(component)
+            if child is None:
+                raise KeyError(f"no group {component!r} under {node.name!r}")
+            node = child
+        return node
+
+    def __contains__(self, path: str) -> bool:
+        return self.find(path) is not None
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __iter__(self) -> Iterator[GroupNode]:
+        return iter(self.nodes.values())
+
+    def path_of(self, group_id: str) -> Optional[str]:
+        """Display path of a group, or None if it is not in the tree."""
+        node = self.nodes.get(group_id)
+        return node.path if node is not None else None
@@ -0,0 +1,179 @@
+"""Classify Swift files as app, unit-test or UI-test code from their imports.
+
+Only the head of each file is read (``HEAD_BYTES``, one read): the leading
+import block gives the imported modules and ``@testable`` imports, and
+``XCUIApplication`` in the same bytes marks UI tests (they set the app up in
+``setUp``, near the top). Files are read on a thread pool, since the work is
+almost all I/O, and results are cached in ``imports.json`` under the pbxtool
+cache directory by (path, mtime, size), so a rescan only reads files that
+changed.
+
+``assign_targets()`` turns the kinds into targets: test code goes to a target
+with the matching product type when its folder's target is not one, and
+everything else stays with the folder's target.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from . import timings
+from .fileio import write_atomic
+from .objects import PBXNativeTarget
+from .paths import cache_dir
+
+if TYPE_CHECKING:
+    from .project import Project
+
+HEAD_BYTES = 8192
+APP, UNIT_TEST, UI_TEST = "app", "unit-test", "ui-test"
+PRODUCT_KINDS = {
+    "com.apple.product-type.bundle.unit-test": UNIT_TEST,
+    "com.apple.product-type.bundle.ui-testing": UI_TEST,
+}
+VERSION = 1
+
+# Everything before the first declaration: whitespace, comments, #if lines and imports.
+_HEAD_RE = re.compile(
+    rb"\A(?:[\s;]+|//[^\n]*|/\*.*?\*/|#(?:if|elseif|else|endif)\b[^\n]*|(?:@\w+(?:\([^)\n]*\))?\s+)*import\s[^\n;]*)*",
+    re.S,
+)
+_IMPORT_RE = re.compile(
+    rb"(?:^|;)[ \t]*(?:@(\w+)(?:\([^)\n]*\))?\s+)*import\s+(?:(?:typealias|struct|class|enum|protocol|let|var|func)\s+)?(\w+)",
+    re.M,
+)
+# Cached per path: [mtime_ns, size, kind, imported modules].
+Entry = List[object]
+
+
+def parse_head(data: bytes) -> Tuple[List[str], bool]:
+    """``(imported modules, has @testable import)`` from the leading import block of ``data``."""
+    block = _HEAD_RE.match(data).group()  # type: ignore[union-attr]
+    modules: List[str] = []
+    testable = False
+    for m in _IMPORT_RE.finditer(block):
+        modules.append(m.group(2).decode("ascii", "replace"))
+        testable = testable or m.group(1) == b"testable"
+    return modules, testable
+
+
+def classify_head(data: bytes) -> Tuple[str, List[str]]:
+    """``(kind, imported modules)`` for the first bytes of a Swift file."""
+    modules, testable = parse_head(data)
+    if "XCTest" in modules and b"XCUIApplication" in data:
+        return UI_TEST, modules
+    if "XCTest" in modules or testable:
+        return UNIT_TEST, modules
+    return APP, modules
+
+
+def _scan(paths: List[str], base: str, cached: Mapping[str, Entry]) -> Dict[str, Entry]:
+    found: Dict[str, Entry] = {}
+    for rel in paths:
+        path = os.path.join(base, rel)
+        try:
+            st = os.stat(path)
+            entry = cached.get(rel)
+            if entry is None or entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+                with open(path, "rb") as f:
+                    kind, modules = classify_head(f.read(HEAD_BYTES))
+                entry = [st.st_mtime_ns, st.st_size, kind, modules]
+        except OSError:
+            continue
+        found[rel] = entry
+    return found
+
+
+class ImportScanner:
+    """Kinds of the Swift files under ``source_root``, cached by (path, mtime, size)."""
+
+    def __init__(self, source_root: Path, cache: bool = True, workers: Optional[int] = None) -> None:
+        self.source_root = source_root
+        self.cache_path = cache_dir(source_root) / "imports.json" if cache else None
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self._entries: Optional[Dict[str, Entry]] = None
+
+    def _load(self) -> Dict[str, Entry]:
+        if self._entries is None:
+            self._entries = {}
+            if self.cache_path is not None:
+                try:
+                    with open(self.cache_path, encoding="utf-8") as f:
+                        data = json.load(f)
+                    if data.get("version") == VERSION:
+                        self._entries = data["entries"]
+                except (OSError, ValueError, KeyError):
+                    pass
+        return self._entries
+
+    def scan(self, paths: Iterable[str]) -> Dict[str, str]:
+        """Source-root-relative path -> kind (``APP``, ``UNIT_TEST`` or ``UI_TEST``).
+
+        Unreadable files are left out. Changed entries are written back to the cache.
+        """
+        paths = list(paths)
+        cached = self._load()
+        base = str(self.source_root)
+        chunks = [paths[i :: self.workers * 4] for i in range(min(len(paths), self.workers * 4))]
+        found: Dict[str, Entry] = {}
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(self.workers) as pool:
+                for part in pool.map(lambda chunk: _scan(chunk, base, cached), chunks):
+                    found.update(part)
+        elif chunks:
+            found = _scan(chunks[0], base, cached)
+        gone = [rel for rel in paths if rel in cached and rel not in found]
+        if self.cache_path is not None and (gone or any(cached.get(rel) != entry for rel, entry in found.items())):
+            for rel in gone:
+                del cached[rel]
+            cached.update(found)
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            payload = {"version": VERSION, "entries": cached}
+            write_atomic(self.cache_path, json.dumps(payload, separators=(",", ":")))
+        return {rel: entry[2] for rel, entry in found.items()}  # type: ignore[misc]
+
+
+def target_kinds(project: "Project") -> Dict[str, str]:
+    """Target name -> the kind of code it builds, from its product type."""
+    return {
+        target.name: PRODUCT_KINDS.get(target.product_type or "", APP)
+        for target in project.targets()
+        if isinstance(target, PBXNativeTarget)
+    }
+
+
+@timings.timed("imports")
+def assign_targets(
+    project: "Project",
+    source_root: Path,
+    paths: Iterable[str],
+    roots: Mapping[str, str],
+    scanner: Optional[ImportScanner] = None,
+) -> Dict[str, str]:
+    """Target for each path: its root folder's target, unless it is test code that target should not build.
+
+    Test code under an app folder, and UI tests under a folder whose target is not
+    a UI-test bundle, go to the first target of their own kind (preferring the
+    targets in ``roots``). Only ``.swift`` files are read; paths outside ``roots``
+    are left out.
+    """
+    paths = [path for path in paths if path.split("/", 1)[0] in roots]
+    kinds = target_kinds(project)
+    candidates = list(dict.fromkeys(list(roots.values()) + list(kinds)))
+    swift = [path for path in paths if path.endswith(".swift")]
+    found = (scanner or ImportScanner(source_root)).scan(swift) if swift else {}
+    targets: Dict[str, str] = {}
+    for path in paths:
+        own = roots[path.split("/", 1)[0]]
+        kind = found.get(path, APP)
+        # A test helper without XCUIApplication can still be UI-test code, so only
+        # test code in an app target and UI tests outside a UI-test target move.
+        if (kind == UNIT_TEST and kinds.get(own, APP) == APP) or (kind == UI_TEST and kinds.get(own) != UI_TEST):
+            own = next((name for name in candidates if kinds.get(name) == kind), own)
+        targets[path] = own
+    return targets
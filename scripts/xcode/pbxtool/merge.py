@@ -0,0 +1,254 @@
+"""Three-way structural merge of project.pbxproj files.
+
+Git's line merge conflicts whenever two branches add files next to each other,
+even though the edits are independent. Here the three versions are split
+into objects, compared by their source text (so unchanged objects cost a string
+comparison) and merged per object ID:
+
+* an object changed on one side only takes that side's version;
+* an object changed on both sides is merged key by key, recursing into
+  dictionaries; lists of object IDs (``REFERENCE_KEYS``: group ``children``,
+  phase ``files``, ...) are merged by element, so both sides' additions and
+  removals survive;
+* objects added or removed on one side are added or removed.
+
+Only real clashes are reported: the same key set to different values (any
+other list, such as ``OTHER_LDFLAGS``, is one value: order and repeats matter),
+an object deleted on one side and modified on the other, or a surviving object
+pointing at an object the other side deleted. The merged project keeps "ours"
+for the clashing parts.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .parser import parse_object, split_objects
+from .project import Project
+from .refs import REFERENCE_KEYS
+
+# ``(head, {id: source text}, foot)``, as returned by ``split_objects``.
+Snapshot = Tuple[str, Dict[str, str], str]
+
+_MISSING: Any = object()
+_ROOT_RE = re.compile(r"\brootObject = ([A-Za-z0-9_]+)")
+
+
+@dataclass
+class Conflict:
+    object_id: Optional[str]
+    key: str
+    message: str
+
+    def __str__(self) -> str:
+        where = self.object_id or "project"
+        if self.key:
+            where += f".{self.key}"
+        return f"{where}: {self.message}"
+
+
+@dataclass
+class MergeResult:
+    project: Project
+    conflicts: List[Conflict] = field(default_factory=list)
+
+    @property
+    def clean(self) -> bool:
+        return not self.conflicts
+
+
+def merge_lists(base: List[Any], ours: List[Any], theirs: List[Any]) -> List[Any]:
+    """Apply theirs' additions and removals (relative to ``base``) to ``ours``.
+
+    Only for lists of distinct object IDs, which are ordered sets. Ours' order
+    wins; an item theirs added goes after the nearest item that precedes it in
+    theirs and is still present, so additions keep their place. Runs in linear
+    time.
+    """
+    base_set = set(base)
+    theirs_set = set(theirs)
+    kept = [item for item in ours if item in theirs_set or item not in base_set]
+    kept_set = set(kept)
+    pending: Dict[Any, List[Any]] = {}
+    anchor: Any = _MISSING
+    for item in theirs:
+        if item in kept_set:
+            anchor = item
+        elif item not in base_set:
+            pending.setdefault(anchor, []).append(item)
+            kept_set.add(item)
+    if not pending:
+        return kept
+    result = list(pending.get(_MISSING, ()))
+    for item in kept:
+        result.append(item)
+        result.extend(pending.get(item, ()))
+    return result
+
+
+class _Merger:
+    def __init__(self) -> None:
+        self.conflicts: List[Conflict] = []
+
+    def conflict(self, object_id: Optional[str], key: str, message: str) -> None:
+        self.conflicts.append(Conflict(object_id, key, message))
+
+    def value(self, object_id: str, key: str, base: Any, ours: Any, theirs: Any) -> Any:
+        """Merged value, or ``_MISSING`` if the key ends up deleted."""
+        if ours == theirs:
+            return ours
+        if base == ours:
+            return theirs
+        if base == theirs:
+            return ours
+        if isinstance(ours, dict) and isinstance(theirs, dict):
+            return self.dict(object_id, key, base if isinstance(base, dict) else {}, ours, theirs)
+        if key in REFERENCE_KEYS and isinstance(ours, list) and isinstance(theirs, list):
+            return merge_lists(base if isinstance(base, list) else [], ours, theirs)
+        if ours is _MISSING or theirs is _MISSING:
+            self.conflict(object_id, key, "removed on one side, changed on the other")
+        else:
+            self.conflict(object_id, key, f"ours {_short(ours)}, theirs {_short(theirs)}")
+        return ours
+
+    def dict(
+        self, object_id: str, prefix: str, base: Dict[str, Any], ours: Dict[str, Any], theirs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        keys = list(ours)
+        keys.extend(k for k in theirs if k not in ours)
+        keys.extend(k for k in base if k not in ours and k not in theirs)
+        for key in keys:
+            path = f"{prefix}.{key}" if prefix else key
+            merged = self.value(
+                object_id,
+                path,
+                base.get(key, _MISSING),
+                ours.get(key, _MISSING),
+                theirs.get(key, _MISSING),
+            )
+            if merged is not _MISSING:
+                result[key] = merged
+        return result
+
+    def text(self, what: str, base: str, ours: str, theirs: str) -> str:
+        if ours == theirs or base == theirs:
+            return ours
+        if base == ours:
+            return theirs
+        self.conflict(None, what, "changed on both sides")
+        return ours
+
+
+def _short(value: Any) -> str:
+    text = repr(value)
+    return text if len(text) <= 60 else text[:57] + "..."
+
+
+def _strings(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def _snapshot(project: Project) -> Snapshot:
+    from .serializer import render_object
+
+    objects = {
+        object_id: obj.raw if obj.raw is not None else render_object(project, obj)
+        for object_id, obj in project.objects.items()
+    }
+    return project.head or "", objects, project.foot
+
+
+def merge(base: Project, ours: Project, theirs: Project) -> MergeResult:
+    """Merge ``theirs`` into ``ours`` (modified in place) relative to ``base``."""
+    return _merge(_snapshot(base), ours, _snapshot(theirs))
+
+
+def merge_text(base: str, ours: str, theirs: str) -> MergeResult:
+    """Merge three versions of project.pbxproj.
+
+    Only "ours" is loaded as a project; the other two are indexed as
+    ``{id: source text}``, which is all the comparison needs.
+    """
+    return _merge(split_objects(base), Project.parse(ours, lazy=True), split_objects(theirs))
+
+
+def _merge(base: Snapshot, ours: Project, theirs: Snapshot) -> MergeResult:
+    merger = _Merger()
+    b_head, b_objects, b_foot = base
+    t_head, t_objects, t_foot = theirs
+    ours.head = merger.text("head", b_head, ours.head or "", t_head)
+    foot = merger.text("foot", b_foot, ours.foot, t_foot)
+    if foot != ours.foot:
+        ours.foot = foot
+        root = _ROOT_RE.search(foot)
+        ours.root_id = root.group(1) if root else None
+
+    # Objects whose text differs from base; theirs are taken over with that
+    # text, so they are written back exactly as that branch wrote them.
+    o_objects = ours.objects
+    ours_changed = {i for i, obj in o_objects.items() if obj.raw is None or obj.raw != b_objects.get(i)}
+    ours_changed.update(i for i in b_objects if i not in o_objects)
+    removed = {i for i in ours_changed if i not in o_objects}
+    theirs_changed = [i for i, raw in t_objects.items() if raw != b_objects.get(i)]
+    theirs_changed.extend(i for i in b_objects if i not in t_objects)
+
+    changed: List[str] = []
+    for object_id in theirs_changed:
+        o = o_objects.get(object_id)
+        t_raw = t_objects.get(object_id)
+        if object_id not in ours_changed:
+            if t_raw is None:
+                if o is not None:
+                    ours.remove_object(object_id)
+                    removed.add(object_id)
+            elif o is None:
+                ours.add_object(parse_object(t_raw))
+                changed.append(object_id)
+            else:
+                ours.replace_object(parse_object(t_raw))
+                changed.append(object_id)
+            continue
+        if o is None or t_raw is None:
+            if o is not t_raw:
+                merger.conflict(object_id, "", "removed on one side, changed on the other")
+                if o is None:
+                    ours.add_object(parse_object(t_raw))  # type: ignore[arg-type]
+                    changed.append(object_id)
+            continue
+        if o.raw == t_raw:
+            continue
+        t = parse_object(t_raw)
+        if o.isa == t.isa and o.fields == t.fields:
+            continue
+        b_raw = b_objects.get(object_id)
+        b = parse_object(b_raw) if b_raw is not None else None
+        if b is None or o.isa != t.isa:
+            merger.conflict(object_id, "", "added on both sides with different contents")
+            continue
+        fields = merger.dict(object_id, "", b.fields if b.isa == o.isa else {}, o.fields, t.fields)
+        if fields != o.fields:
+            o.fields = fields
+            if b.comment == o.comment:
+                o.comment = t.comment
+        changed.append(object_id)
+
+    # A change that survived the merge must not point at an object either
+    # side removed.
+    if removed:
+        for object_id in ours_changed.union(changed):
+            obj = o_objects.get(object_id)
+            if obj is None:
+                continue
+            for ref in sorted(set(_strings(obj.fields)).intersection(removed)):
+                merger.conflict(object_id, "", f"refers to {ref}, which the other side removed")
+    return MergeResult(ours, merger.conflicts)
@@ -0,0 +1,359 @@
+"""Typed wrappers around the objects stored in a project.pbxproj file.
+
+Every object keeps its parsed fields in ``fields`` (an ordered dict of
+strings, lists and dicts) plus the exact text it was parsed from. As long as
+an object is not modified, the serializer writes that text back unchanged, so
+untouched objects round-trip byte-for-byte.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Container, Dict, List, Optional, Type
+
+_REGISTRY: Dict[str, Type["PBXObject"]] = {}
+
+
+def object_class(isa: str) -> Type["PBXObject"]:
+    """Return the wrapper class registered for ``isa`` (or ``PBXObject``)."""
+    return _REGISTRY.get(isa, PBXObject)
+
+
+class PBXObject:
+    """A single entry of the ``objects`` dictionary."""
+
+    ISA: Optional[str] = None
+
+    __slots__ = ("id", "_fields", "_isa", "comment", "lead", "raw")
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls.ISA:
+            _REGISTRY[cls.ISA] = cls
+
+    def __init__(
+        self,
+        object_id: str,
+        fields: Optional[Dict[str, Any]],
+        comment: Optional[str] = None,
+        lead: str = "\n\t\t",
+        raw: Optional[str] = None,
+        isa: Optional[str] = None,
+    ) -> None:
+        self.id = object_id
+        # ``fields`` may be None for objects read lazily; they are decoded
+        # from ``raw`` on first access.
+        self._fields = fields
+        self._isa = isa if isa is not None else fields["isa"]  # type: ignore[index]
+        self.comment = comment
+        # Whitespace/comments between the previous entry and this one.
+        self.lead = lead
+        # Original source text (``ID /* comment */ = {...};``), or None once
+        # the object has been modified and must be re-rendered.
+        self.raw = raw
+
+    def __repr__(self) -> str:
+        return f"<{self.isa} {self.id} {self.comment!r}>"
+
+    @property
+    def isa(self) -> str:
+        return self._isa
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        if self._fields is None:
+            from .parser import parse_object_fields
+
+            self._fields = parse_object_fields(self.raw or "")
+        return self._fields
+
+    @fields.setter
+    def fields(self, value: Dict[str, Any]) -> None:
+        self._fields = value
+        self.raw = None
+
+    @property
+    def dirty(self) -> bool:
+        return self.raw is None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.fields.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.fields[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.fields
+
+    # Mutations go through these helpers so the object is marked dirty.
+
+    def touch(self) -> None:
+        self.fields  # decode lazily-read objects before dropping their source
+        self.raw = None
+
+    def set(self, key: str, value: Any) -> None:
+        if self.fields.get(key) != value:
+            self.fields[key] = value
+            self.raw = None
+
+    def unset(self, key: str) -> None:
+        if key in self.fields:
+            del self.fields[key]
+            self.raw = None
+
+    def append(self, key: str, value: str, index: Optional[int] = None) -> None:
+        items = self.fields.setdefault(key, [])
+        if index is None:
+            items.append(value)
+        else:
+            items.insert(index, value)
+        self.raw = None
+
+    def discard(self, key: str, value: str) -> bool:
+        items = self.fields.get(key)
+        if not items or value not in items:
+            return False
+        items.remove(value)
+        self.raw = None
+        return True
+
+    def discard_all(self, key: str, values: "Container[str]") -> bool:
+        """Remove every item of list ``key`` that is in ``values``."""
+        items = self.fields.get(key)
+        if not items:
+            return False
+        kept = [item for item in items if item not in values]
+        if len(kept) == len(items):
+            return False
+        self.fields[key] = kept
+        self.raw = None
+        return True
+
+    @property
+    def display_name(self) -> str:
+        """Name Xcode uses in ``/* ... */`` comments for this object."""
+        return self.comment or self.isa
+
+
+class PBXBuildFile(PBXObject):
+    ISA = "PBXBuildFile"
+    __slots__ = ()
+
+    @property
+    def file_ref(self) -> Optional[str]:
+        return self.fields.get("fileRef") or self.fields.get("productRef")
+
+
+class PBXFileElement(PBXObject):
+    """Common base for file references and groups."""
+
+    __slots__ = ()
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.fields.get("name")
+
+    @property
+    def path(self) -> Optional[str]:
+        return self.fields.get("path")
+
+    @property
+    def source_tree(self) -> str:
+        return self.fields.get("sourceTree", "<group>")
+
+    @property
+    def display_name(self) -> str:
+        if self.name:
+            return self.name
+        if self.path:
+            return self.path.rsplit("/", 1)[-1]
+        return self.comment or self.isa
+
+
+class PBXFileReference(PBXFileElement):
+    ISA = "PBXFileReference"
+    __slots__ = ()
+
+    @property
+    def file_type(self) -> Optional[str]:
+        return self.fields.get("lastKnownFileType") or self.fields.get("explicitFileType")
+
+
+class PBXReferenceProxy(PBXFileElement):
+    ISA = "PBXReferenceProxy"
+    __slots__ = ()
+
+
+class PBXGroup(PBXFileElement):
+    ISA = "PBXGroup"
+    __slots__ = ()
+
+    @property
+    def children(self) -> List[str]:
+        return self.fields.get("children", [])
+
+
+class PBXVariantGroup(PBXGroup):
+    ISA = "PBXVariantGroup"
+    __slots__ = ()
+
+
+class XCVersionGroup(PBXGroup):
+    ISA = "XCVersionGroup"
+    __slots__ = ()
+
+
+class PBXBuildPhase(PBXObject):
+    DEFAULT_NAME = "Build Phase"
+    __slots__ = ()
+
+    @property
+    def files(self) -> List[str]:
+        return self.fields.get("files", [])
+
+    @property
+    def display_name(self) -> str:
+        return self.fields.get("name") or self.DEFAULT_NAME
+
+
+class PBXSourcesBuildPhase(PBXBuildPhase):
+    ISA = "PBXSourcesBuildPhase"
+    DEFAULT_NAME = "Sources"
+    __slots__ = ()
+
+
+class PBXResourcesBuildPhase(PBXBuildPhase):
+    ISA = "PBXResourcesBuildPhase"
+    DEFAULT_NAME = "Resources"
+    __slots__ = ()
+
+
+class PBXFrameworksBuildPhase(PBXBuildPhase):
+    ISA = "PBXFrameworksBuildPhase"
+    DEFAULT_NAME = "Frameworks"
+    __slots__ = ()
+
+
+class PBXHeadersBuildPhase(PBXBuildPhase):
+    ISA = "PBXHeadersBuildPhase"
+    DEFAULT_NAME = "Headers"
+    __slots__ = ()
+
+
+class PBXCopyFilesBuildPhase(PBXBuildPhase):
+    ISA = "PBXCopyFilesBuildPhase"
+    DEFAULT_NAME = "CopyFiles"
+    __slots__ = ()
+
+
+class PBXShellScriptBuildPhase(PBXBuildPhase):
+    ISA = "PBXShellScriptBuildPhase"
+    DEFAULT_NAME = "ShellScript"
+    __slots__ = ()
+
+
+class PBXTarget(PBXObject):
+    __slots__ = ()
+
+    @property
+    def name(self) -> str:
+        return self.fields.get("name", "")
+
+    @property
+    def build_phases(self) -> List[str]:
+        return self.fields.get("buildPhases", [])
+
+    @property
+    def build_configuration_list(self) -> Optional[str]:
+        return self.fields.get("buildConfigurationList")
+
+    @property
+    def display_name(self) -> str:
+        return self.name or self.comment or self.isa
+
+
+# ``productType`` suffixes of unit and UI test bundles.
+TEST_PRODUCT_TYPES = (".bundle.unit-test", ".bundle.ui-testing")
+
+
+class PBXNativeTarget(PBXTarget):
+    ISA = "PBXNativeTarget"
+    __slots__ = ()
+
+    @property
+    def product_type(self) -> Optional[str]:
+        return self.fields.get("productType")
+
+    @property
+    def is_test(self) -> bool:
+        return (self.product_type or "").endswith(TEST_PRODUCT_TYPES)
+
+
+class PBXAggregateTarget(PBXTarget):
+    ISA = "PBXAggregateTarget"
+    __slots__ = ()
+
+
+class PBXLegacyTarget(PBXTarget):
+    ISA = "PBXLegacyTarget"
+    __slots__ = ()
+
+
+class PBXProject(PBXObject):
+    ISA = "PBXProject"
+    __slots__ = ()
+
+    @property
+    def targets(self) -> List[str]:
+        return self.fields.get("targets", [])
+
+    @property
+    def main_group(self) -> str:
+        return self.fields["mainGroup"]
+
+    @property
+    def build_configuration_list(self) -> Optional[str]:
+        return self.fields.get("buildConfigurationList")
+
+    @property
+    def display_name(self) -> str:
+        return "Project object"
+
+
+class PBXContainerItemProxy(PBXObject):
+    ISA = "PBXContainerItemProxy"
+    __slots__ = ()
+
+
+class PBXTargetDependency(PBXObject):
+    ISA = "PBXTargetDependency"
+    __slots__ = ()
+
+
+class XCBuildConfiguration(PBXObject):
+    ISA = "XCBuildConfiguration"
+    __slots__ = ()
+
+    @property
+    def name(self) -> str:
+        return self.fields.get("name", "")
+
+    @property
+    def build_settings(self) -> Dict[str, Any]:
+        return self.fields.get("buildSettings", {})
+
+    @property
+    def display_name(self) -> str:
+        return self.name or self.isa
+
+
+class XCConfigurationList(PBXObject):
+    ISA = "XCConfigurationList"
+    __slots__ = ()
+
+    @property
+    def build_configurations(self) -> List[str]:
+        return self.fields.get("buildConfigurations", [])
+
+    @property
+    def default_configuration_name(self) -> Optional[str]:
+        return self.fields.get("defaultConfigurationName")
@@ -0,0 +1,136 @@
+"""On-disk cache of parsed projects, keyed by a hash of the file's bytes.
+
+Parsing a large project.pbxproj is the dominant cost of every helper run,
+and CI reads the same bytes dozens of times. After a parse, ``store`` writes
+the object graph's layout (sections, IDs, isas, comments and the length of
+each object's text) as a compact marshal blob named after the content hash.
+``lookup`` rebuilds the project from that blob plus the file text: object
+text is sliced back out of the file and fields are decoded lazily, so a hit
+skips tokenizing altogether.
+
+Any byte change produces a different hash, so stale entries are never
+used; they are pruned once more than ``KEEP`` pile up. Entries are written
+with an atomic rename and a reader treats anything unreadable as a miss, so
+concurrent readers (and writers of the same entry) are safe.
+"""
+
+from __future__ import annotations
+
+import marshal
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from .fileio import write_atomic
+from .objects import object_class
+from .paths import cache_dir
+from .project import Project, Section
+
+VERSION = 1
+KEEP = 8
+
+
+def cache_path(project_path: Path, digest: str) -> Optional[Path]:
+    """Cache entry for the bytes with ``content_digest`` ``digest`` at ``project_path``; None outside an .xcodeproj."""
+    if project_path.parent.suffix != ".xcodeproj":
+        return None
+    tag = sys.implementation.cache_tag or "python"
+    return cache_dir(project_path.parent.parent) / "parsed" / f"{digest}.{tag}.marshal"
+
+
+def lookup(path: Path, text: str) -> Optional[Project]:
+    """Project rebuilt from the cache entry at ``path``, or None on a miss."""
+    try:
+        with open(path, "rb") as f:
+            payload = marshal.loads(f.read())
+        version, head_len, foot_len, root_id, sections = payload
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != VERSION:
+        return None
+    try:
+        project = _rebuild(text, head_len, foot_len, root_id, sections)
+    except (KeyError, TypeError, ValueError):
+        return None
+    if project is not None:
+        try:
+            os.utime(path)  # keep entries in use ahead of pruning
+        except OSError:
+            pass
+    return project
+
+
+def _rebuild(text: str, head_len: int, foot_len: int, root_id: Optional[str], sections: list) -> Optional[Project]:
+    project = Project()
+    project.head = text[:head_len]
+    project.root_id = root_id
+    pos = head_len
+    for isa, lead, begin, tail, end, ids, isas, comments, lengths in sections:
+        section = Section(isa, lead, begin)
+        section.tail = tail
+        section.end = end
+        project.add_section(section)
+        pos += len(lead) + len(begin)
+        for object_id, object_isa, comment, lead_len, raw_len in zip(ids, isas, comments, lengths[::2], lengths[1::2]):
+            raw_start = pos + lead_len
+            pos = raw_start + raw_len
+            obj = object_class(object_isa)(
+                object_id, None, comment, text[raw_start - lead_len : raw_start], text[raw_start:pos], object_isa
+            )
+            project.add_object(obj, section)
+        pos += len(tail) + len(end)
+    if pos + foot_len != len(text):
+        return None
+    project.foot = text[pos:]
+    return project
+
+
+def store(path: Path, project: Project) -> None:
+    """Record ``project`` (freshly parsed, nothing modified) under ``path``."""
+    objects = project.objects
+    sections = []
+    for section in project.sections:
+        members = [objects[object_id] for object_id in section.ids]
+        lengths: List[int] = []
+        for obj in members:
+            if obj.raw is None:
+                return
+            lengths.append(len(obj.lead))
+            lengths.append(len(obj.raw))
+        sections.append(
+            (
+                section.isa,
+                section.lead,
+                section.begin,
+                section.tail,
+                section.end,
+                list(section.ids),
+                [obj.isa for obj in members],
+                [obj.comment for obj in members],
+                lengths,
+            )
+        )
+    payload = (VERSION, len(project.head or ""), len(project.foot), project.root_id, sections)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, marshal.dumps(payload))
+        _prune(path.parent)
+    except OSError:
+        pass  # read-only checkout or full disk: the cache is only an optimization
+
+
+def _prune(directory: Path) -> None:
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".marshal"):
+            try:
+                entries.append((entry.stat().st_mtime_ns, entry.path))
+            except OSError:
+                continue
+    entries.sort(reverse=True)
+    for _, stale in entries[KEEP:]:
+        try:
+            os.unlink(stale)
+        except OSError:
+            pass
@@ -0,0 +1,412 @@
+"""Single-pass parser for the OpenStep-style plist used by project.pbxproj.
+
+The parser walks the file once with a tokenizer regex. Everything outside the
+``objects`` dictionary is kept as opaque text (``Project.head``/``foot``); each
+object inside it is parsed into a typed ``PBXObject`` that remembers the exact
+source span it came from, together with the section markers around it.
+"""
+
+from __future__ import annotations
+
+import re
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .objects import PBXObject, object_class
+from .project import Project, Section
+
+# Groups: 1 = comment, 2 = quoted string, 3 = bare string, 4 = punctuation.
+_TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (/\*.*?\*/|//[^\n]*)
+      | "((?:[^"\\]|\\.)*)"
+      | ((?:[^\s{}();,="/]|/(?![/*]))+)
+      | ([{}();,=])
+    )""",
+    re.S | re.X,
+)
+# Xcode writes PBXBuildFile/PBXFileReference entries on one line with only
+# scalar fields; those make up most of a large project, so they skip the
+# tokenizer and are matched in one go.
+_FAST_OBJECT_RE = re.compile(
+    r"""(\s*)([A-Za-z0-9_]+)(?:\ /\*\ ([^\n]*?)\ \*/)?\ =\ \{
+    ((?:\w+\ =\ (?:"(?:[^"\\\n]|\\.)*"|(?:[^\s;"{}()/]|/(?![*/]))+)(?:\ /\*\ [^\n]*?\ \*/)?;\ )+)\};""",
+    re.X,
+)
+_FAST_FIELD_RE = re.compile(r'(\w+) = (?:"((?:[^"\\\n]|\\.)*)"|((?:[^\s;"{}()/]|/(?![*/]))+))(?: /\* [^\n]*? \*/)?; ')
+# Lazy mode only needs each object's extent: either one line ending in "};",
+# or a "{" line, body lines indented deeper than the object, and a "};" line
+# at the object's own indentation. Anything else falls back to the tokenizer.
+_SPAN_RE = re.compile(
+    r"""(?P<lead>(?>\s*\n)?(?P<indent>[\ \t]*+))
+    (?P<raw>(?P<id>[A-Za-z0-9_]+)(?:\ /\*\ (?P<comment>[^\n]*?)\ \*/)?\ =\ \{
+    (?:[^\n]*\};(?=[\ \t]*\n)|\n(?>(?P=indent)[\ \t][^\n]*+\n|[\ \t]*+\n)*+(?P=indent)\};))""",
+    re.X,
+)
+_OBJECT_HEAD_RE = re.compile(r'"?([A-Za-z0-9_]+)"?(?:\s*/\*\s*(.*?)\s*\*/)?\s*=', re.S)
+# A run of plain array items ("ID /* comment */," per line, as in group
+# children and build phase files) is matched in one go instead of token by
+# token. Written with possessive quantifiers so long runs stay linear.
+_BARE = r'[^\s{}();,="/]*+(?:/(?![/*])[^\s{}();,="/]*+)*+'
+_BLOCK_COMMENT = r"/\*[^*]*+\*++(?:[^/*][^*]*+\*++)*+/"
+_ARRAY_ITEM = rf'\s*+(?:(?=[^\s"])({_BARE})|"((?:[^"\\]|\\.)*+)")(?:\s*+{_BLOCK_COMMENT})?\s*+,'
+_ARRAY_RUN_RE = re.compile(f"(?:{_ARRAY_ITEM})++")
+_ARRAY_ITEM_RE = re.compile(_ARRAY_ITEM)
+_BLOCK_COMMENT_RE = re.compile(_BLOCK_COMMENT)
+_BLANK_RE = re.compile(r"\s*")
+_SECTION_RE = re.compile(r"/\* (Begin|End) (\w+) section \*/")
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\", "'": "'"}
+_ESCAPE_RE = re.compile(r"\\(.)", re.S)
+
+COMMENT, STRING, ATOM, PUNCT = 1, 2, 3, 4
+
+Token = Tuple[int, str, int, int]
+_match_token = _TOKEN_RE.match
+
+
+class ParseError(ValueError):
+    """Raised when project.pbxproj is not a well-formed plist."""
+
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    return _ESCAPE_RE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def _isa_of(raw: str) -> str:
+    """``isa`` of an object from its source text, or "" if it is not spelled plainly."""
+    start = raw.find("isa = ") + 6
+    if start < 6:
+        return ""
+    isa = raw[start : raw.find(";", start)]
+    return isa if isa.isidentifier() else ""
+
+
+def _array_items(run: str) -> List[str]:
+    if '"' in run:
+        return [_unescape(quoted) if quoted else bare for bare, quoted in _ARRAY_ITEM_RE.findall(run)]
+    # Bare items contain neither whitespace nor commas.
+    return _BLOCK_COMMENT_RE.sub("", run).replace(",", " ").split()
+
+
+class _Parser:
+    def __init__(self, text: str, lazy: bool = False) -> None:
+        self.text = text
+        self.pos = 0
+        self.lazy = lazy
+        self._peeked: Optional[Token] = None
+
+    # Token helpers -------------------------------------------------------
+
+    def next_any(self) -> Token:
+        """Next token, comments included."""
+        if self._peeked is not None:
+            tok, self._peeked = self._peeked, None
+            return tok
+        m = _match_token(self.text, self.pos)
+        if m is None:
+            if self.text[self.pos :].strip():
+                raise ParseError(f"unexpected character at offset {self.pos}")
+            raise ParseError("unexpected end of file")
+        kind = m.lastindex
+        value = m.group(kind)
+        self.pos = m.end()
+        if kind == STRING and "\\" in value:
+            value = _unescape(value)
+        return kind, value, m.start(kind), self.pos
+
+    def next(self) -> Token:
+        tok = self.next_any()
+        while tok[0] == COMMENT:
+            tok = self.next_any()
+        return tok
+
+    def peek(self) -> Token:
+        if self._peeked is None:
+            self._peeked = self.next()
+        return self._peeked
+
+    def expect(self, punct: str) -> Token:
+        tok = self.next()
+        if tok[0] != PUNCT or tok[1] != punct:
+            raise ParseError(f"expected {punct!r} at offset {tok[2]}, got {tok[1]!r}")
+        return tok
+
+    # Values --------------------------------------------------------------
+
+    def value(self) -> Any:
+        tok = self.next()
+        kind, val = tok[0], tok[1]
+        if kind == PUNCT:
+            if val == "{":
+                return self.dict_body()
+            if val == "(":
+                return self.array_body()
+            raise ParseError(f"unexpected {val!r} at offset {tok[2]}")
+        return val
+
+    def dict_body(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        while True:
+            tok = self.next()
+            if tok[0] == PUNCT:
+                if tok[1] == "}":
+                    return result
+                raise ParseError(f"unexpected {tok[1]!r} at offset {tok[2]}")
+            self.expect("=")
+            result[tok[1]] = self.value()
+            self.expect(";")
+
+    def array_body(self) -> List[Any]:
+        result: List[Any] = []
+        while True:
+            if self._peeked is None:
+                run = _ARRAY_RUN_RE.match(self.text, self.pos)
+                if run is not None:
+                    result.extend(_array_items(run.group()))
+                    self.pos = run.end()
+            tok = self.peek()
+            if tok[0] == PUNCT and tok[1] == ")":
+                self.next()
+                return result
+            result.append(self.value())
+            tok = self.next()
+            if tok[0] == PUNCT and tok[1] == ")":
+                return result
+            if tok[0] != PUNCT or tok[1] != ",":
+                raise ParseError(f"expected ',' at offset {tok[2]}")
+
+    def object_span(self, pos: int) -> Tuple[str, str, int]:
+        """``(id, source text, end offset)`` of the object entry starting at ``pos``."""
+        self.pos, self._peeked = pos, None
+        tok = self.next()
+        object_id, start = tok[1], tok[2]
+        tok = self.next()
+        if tok[0] != PUNCT or tok[1] != "=":
+            raise ParseError(f"expected '=' at offset {tok[2]}")
+        self.expect("{")
+        self.dict_body()
+        end = self.expect(";")[3]
+        return object_id, self.text[start:end], end
+
+    # Top level -----------------------------------------------------------
+
+    def project(self) -> Project:
+        text = self.text
+        self.expect("{")
+        project = Project()
+        while True:
+            tok = self.next()
+            if tok[0] == PUNCT and tok[1] == "}":
+                break
+            key = tok[1]
+            self.expect("=")
+            if key == "objects":
+                brace = self.expect("{")
+                project.head = text[: brace[3]]
+                foot_start = self.objects(project, brace[3])
+                project.foot = text[foot_start:]
+                self.expect(";")
+                continue
+            value = self.value()
+            self.expect(";")
+            if key == "rootObject":
+                project.root_id = value
+        if project.head is None:
+            raise ParseError("no objects dictionary found")
+        return project
+
+    def objects(self, project: Project, start: int) -> int:
+        """Parse the ``objects`` dict, recording sections and object spans.
+
+        Returns the offset where the text after the last object/section begins.
+        """
+        text = self.text
+        prev = start
+        section: Optional[Section] = None
+        fast = _FAST_OBJECT_RE.match
+        fast_fields = _FAST_FIELD_RE.findall
+        span = _SPAN_RE.match
+        while True:
+            if self.lazy and section is not None:
+                m = span(text, prev)
+                if m is not None:
+                    raw = m.group("raw")
+                    isa = _isa_of(raw)
+                    object_id = m.group("id")
+                    if isa and object_id not in project.objects:
+                        obj = object_class(isa)(object_id, None, m.group("comment"), m.group("lead"), raw, isa)
+                        project.add_object(obj, section)
+                        prev = self.pos = m.end()
+                        continue
+            m = fast(text, prev) if section is not None else None
+            if m is not None:
+                fields = {
+                    key: _unescape(quoted) if quoted else bare
+                    for key, quoted, bare in fast_fields(m.group(4))
+                }
+                if "isa" in fields:
+                    if m.group(2) in project.objects:
+                        raise ParseError(f"duplicate object id {m.group(2)}")
+                    obj_start = m.start(2)
+                    obj = object_class(fields["isa"])(
+                        m.group(2), fields, m.group(3), m.group(1), text[obj_start : m.end()]
+                    )
+                    project.add_object(obj, section)
+                    prev = self.pos = m.end()
+                    continue
+            tok = self.next_any()
+            kind, val, tok_start, tok_end = tok
+            if kind == COMMENT:
+                marker = _SECTION_RE.fullmatch(val)
+                if marker is None:
+                    continue
+                if marker.group(1) == "Begin":
+                    section = Section(marker.group(2), text[prev:tok_start], val)
+                    project.add_section(section)
+                else:
+                    if section is None:
+                        raise ParseError(f"unbalanced section marker at offset {tok_start}")
+                    section.tail = text[prev:tok_start]
+                    section.end = val
+                    section = None
+                prev = tok_end
+                continue
+            if kind == PUNCT:
+                if val == "}":
+                    return prev
+                raise ParseError(f"unexpected {val!r} at offset {tok_start}")
+            comment = None
+            tok = self.next_any()
+            if tok[0] == COMMENT:
+                comment = tok[1][2:-2].strip()
+                tok = self.next()
+            if tok[0] != PUNCT or tok[1] != "=":
+                raise ParseError(f"expected '=' at offset {tok[2]}")
+            self.expect("{")
+            fields = self.dict_body()
+            end = self.expect(";")[3]
+            if "isa" not in fields:
+                raise ParseError(f"object {val} has no isa")
+            if val in project.objects:
+                raise ParseError(f"duplicate object id {val}")
+            cls = object_class(fields["isa"])
+            obj: PBXObject = cls(val, fields, comment, text[prev:tok_start], text[tok_start:end])
+            if section is None:
+                section = project.loose_section(text[prev:tok_start])
+                obj.lead = ""
+                project.add_object(obj, section)
+                section = None
+            else:
+                project.add_object(obj, section)
+            prev = end
+
+
+def parse(text: str, lazy: bool = False) -> Project:
+    """Parse project.pbxproj contents into a ``Project``.
+
+    With ``lazy=True`` objects are only delimited up front; their fields are
+    decoded the first time they are accessed. Comparing or copying objects by
+    their source text then costs almost nothing.
+    """
+    return _Parser(text, lazy).project()
+
+
+def parse_object_fields(raw: str) -> Dict[str, Any]:
+    """Fields of a single ``ID /* comment */ = {...};`` entry."""
+    m = _FAST_OBJECT_RE.fullmatch(raw)
+    if m is not None:
+        return {key: _unescape(quoted) if quoted else bare for key, quoted, bare in _FAST_FIELD_RE.findall(m.group(4))}
+    parser = _Parser(raw)
+    parser.next()
+    tok = parser.next()
+    if tok[0] != PUNCT or tok[1] != "=":
+        raise ParseError(f"expected '=' at offset {tok[2]}")
+    parser.expect("{")
+    return parser.dict_body()
+
+
+def field_scanner(keys: Iterable[str]) -> Callable[[str], Dict[str, Union[str, List[str]]]]:
+    """Function pulling the ``keys`` fields out of an object's source text.
+
+    Only bare values and arrays are picked up (which is how Xcode writes
+    object IDs), wherever the key appears; quoted strings and comments are
+    skipped over, so a key spelled inside them is never matched. Much cheaper
+    than decoding the whole object when only a few keys matter.
+    """
+    alternatives = "|".join(sorted(map(re.escape, keys), key=len, reverse=True))
+    pattern = re.compile(
+        rf'''"(?:[^"\\]|\\.)*+"|{_BLOCK_COMMENT}
+        |(?<![\w"])(?P<key>{alternatives})\ =\ (?:\((?P<run>(?:{_ARRAY_ITEM})*+)\s*+\)|(?P<value>[A-Za-z0-9_]++))''',
+        re.X,
+    )
+
+    def scan(raw: str) -> Dict[str, Union[str, List[str]]]:
+        found: Dict[str, Union[str, List[str]]] = {}
+        for m in pattern.finditer(raw):
+            key = m.group("key")
+            if key is not None:
+                run = m.group("run")
+                found[key] = m.group("value") if run is None else _array_items(run)
+        return found
+
+    return scan
+
+
+def parse_object(raw: str, lead: str = "\n\t\t") -> PBXObject:
+    """Object for a single ``ID /* comment */ = {...};`` entry; fields decode lazily."""
+    head = _OBJECT_HEAD_RE.match(raw)
+    if head is None:
+        raise ParseError(f"not an object entry: {raw[:40]!r}")
+    isa = _isa_of(raw) or parse_object_fields(raw).get("isa")
+    if not isa:
+        raise ParseError(f"object {head.group(1)} has no isa")
+    return object_class(isa)(head.group(1), None, head.group(2), lead, raw, isa)
+
+
+def split_objects(text: str) -> Tuple[str, Dict[str, str], str]:
+    """``(head, {id: source text}, foot)`` without building objects.
+
+    A cheap index for comparing whole files object by object; ``head`` and
+    ``foot`` are the same strings ``parse`` stores on the project. Files not in
+    Xcode's layout go through the full parser instead.
+    """
+    objects: Dict[str, str] = {}
+    start = text.find("\tobjects = {")
+    markers = list(_SECTION_RE.finditer(text, start)) if start >= 0 else []
+    pos = start + len("\tobjects = {")
+    parser = _Parser(text)
+    for begin, end in zip(markers[::2], markers[1::2]):
+        if text[pos : begin.start()].strip() or begin.group(1, 2) != ("Begin", end.group(2)) or end.group(1) != "End":
+            break
+        pos = begin.end()
+        limit = end.start()
+        # Groups: lead, indent, raw, id, comment. The matches tile the section
+        # exactly when their lengths add up to the distance covered.
+        found = _SPAN_RE.findall(text, pos, limit)
+        covered = sum(map(len, map(itemgetter(0), found))) + sum(map(len, map(itemgetter(2), found)))
+        if _BLANK_RE.match(text, pos + covered, limit).end() == limit:  # type: ignore[union-attr]
+            count = len(objects)
+            objects.update(zip(map(itemgetter(3), found), map(itemgetter(2), found)))
+            if len(objects) != count + len(found):
+                raise ParseError(f"duplicate object id in {begin.group(2)} section")
+            pos = end.end()
+            continue
+        # Hand-edited entries; go object by object and let the tokenizer find
+        # where the odd ones end.
+        while _BLANK_RE.match(text, pos, limit).end() < limit:  # type: ignore[union-attr]
+            m = _SPAN_RE.match(text, pos, limit)
+            if m is not None:
+                object_id, raw, pos = m.group("id"), m.group("raw"), m.end()
+            else:
+                object_id, raw, pos = parser.object_span(pos)
+            if object_id in objects:
+                raise ParseError(f"duplicate object id {object_id}")
+            objects[object_id] = raw
+        pos = end.end()
+    else:
+        if len(markers) % 2 == 0 and text[pos:].lstrip().startswith("};"):
+            return text[: start + len("\tobjects = {")], objects, text[pos:]
+    project = parse(text, lazy=True)
+    return project.head or "", {i: obj.raw or "" for i, obj in project.objects.items()}, project.foot
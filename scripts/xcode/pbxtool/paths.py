@@ -0,0 +1,29 @@
+"""Locating the repo, the project file and tool caches."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+
+PROJECT_NAME = "FamilyTodo.xcodeproj"
+
+
+def find_repo_root(start: Optional[Path] = None) -> Path:
+    cur = (start or Path.cwd()).resolve()
+    while True:
+        if (cur / PROJECT_NAME).is_dir():
+            return cur
+        if cur.parent == cur:
+            raise FileNotFoundError(f"Could not locate repo root containing {PROJECT_NAME}")
+        cur = cur.parent
+
+
+def project_file(repo_root: Path) -> Path:
+    return repo_root / PROJECT_NAME / "project.pbxproj"
+
+
+def cache_dir(repo_root: Path) -> Path:
+    """Directory for pbxtool caches (``$PBXTOOL_CACHE_DIR`` or ``build/pbxtool``)."""
+    override = os.environ.get("PBXTOOL_CACHE_DIR")
+    return Path(override) if override else repo_root / "build" / "pbxtool"
@@ -0,0 +1,316 @@
+"""In-memory object graph for a project.pbxproj file."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Union
+
+from . import timings
+from .fileio import FileLock, content_digest, write_if_changed
+from .objects import PBXBuildPhase, PBXGroup, PBXNativeTarget, PBXObject, PBXProject, PBXTarget
+
+if TYPE_CHECKING:
+    from .groups import GroupTree
+    from .refs import ReferenceIndex
+    from .settings import BuildSettings
+    from .transaction import Transaction
+
+
+class Section:
+    """A ``/* Begin X section */ ... /* End X section */`` block.
+
+    ``ids`` is an ordered dict used as an ordered set, so membership tests,
+    appends and removals are O(1).
+    """
+
+    __slots__ = ("isa", "lead", "begin", "tail", "end", "ids")
+
+    def __init__(self, isa: Optional[str], lead: str = "\n\n", begin: Optional[str] = None) -> None:
+        self.isa = isa
+        self.lead = lead
+        self.begin = begin if begin is not None else f"/* Begin {isa} section */"
+        self.tail = "\n"
+        self.end = f"/* End {isa} section */" if isa else ""
+        self.ids: Dict[str, None] = {}
+
+    def __repr__(self) -> str:
+        return f"<Section {self.isa} ({len(self.ids)} objects)>"
+
+
+class Project:
+    """Parsed project.pbxproj.
+
+    ``objects`` is the UUID -> object index. ``sections`` keeps the on-disk
+    order of sections so ``serialize()`` can reproduce the original bytes.
+    """
+
+    def __init__(self) -> None:
+        self.path: Optional[Path] = None
+        # ``content_digest`` of the bytes at ``path`` this graph was loaded from
+        # (or last saved as); writes check it so they never overwrite someone else's.
+        self.digest: Optional[str] = None
+        self.head: Optional[str] = None
+        self.foot = "\n\t};\n}\n"
+        self.root_id: Optional[str] = None
+        self.objects: Dict[str, PBXObject] = {}
+        self.sections: List[Section] = []
+        self._sections_by_isa: Dict[str, Section] = {}
+        self._section_of: Dict[str, Section] = {}
+        self._references: Optional["ReferenceIndex"] = None
+
+    # Loading / saving ------------------------------------------------------
+
+    @classmethod
+    def parse(cls, text: str, lazy: bool = False) -> "Project":
+        from .parser import parse
+
+        return parse(text, lazy)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], lazy: bool = False, cache: bool = True) -> "Project":
+        """Read and parse ``path``.
+
+        With ``cache`` (the default) the parsed layout is kept under the build
+        directory keyed by the file's hash (see ``pbxtool.parsecache``), so
+        loading unchanged bytes again skips the parser.
+        """
+        from . import parsecache
+
+        path = Path(path)
+        with timings.phase("load"):
+            with timings.phase("read"):
+                data = path.read_bytes()
+                text = data.decode("utf-8")
+                timings.count("bytes_read", len(data))
+            digest = content_digest(data)
+            entry = parsecache.cache_path(path, digest) if cache else None
+            with timings.phase("cache"):
+                project = parsecache.lookup(entry, text) if entry is not None else None
+            if project is None:
+                with timings.phase("parse"):
+                    project = cls.parse(text, lazy)
+                if entry is not None:
+                    with timings.phase("cache"):
+                        parsecache.store(entry, project)
+            timings.count("objects", len(project.objects))
+        project.path = path
+        project.digest = digest
+        return project
+
+    def serialize(self) -> str:
+        from .serializer import render_object
+
+        objects = self.objects
+        parts: List[str] = [self.head or "// !$*UTF8*$!\n{\n\tarchiveVersion = 1;\n\tobjects = {"]
+        append = parts.append
+        with timings.phase("serialize"):
+            for section in self.sections:
+                append(section.lead)
+                append(section.begin)
+                for object_id in section.ids:
+                    obj = objects[object_id]
+                    append(obj.lead)
+                    append(obj.raw if obj.raw is not None else render_object(self, obj))
+                append(section.tail)
+                append(section.end)
+            append(self.foot)
+            return "".join(parts)
+
+    def save(self, path: Union[str, Path, None] = None) -> bool:
+        """Write the project; skipped if the bytes on disk are identical. Returns whether it wrote.
+
+        Raises ``WriteConflict`` rather than overwrite ``path`` if another
+        writer changed it since it was loaded (``Transaction.commit()``
+        rebases its edits instead).
+        """
+        target = Path(path) if path is not None else self.path
+        if target is None:
+            raise ValueError("project has no path to save to")
+        data = self.serialize().encode("utf-8")
+        with FileLock(target):
+            changed = write_if_changed(target, data, self.digest if target == self.path else None)
+        if target == self.path:
+            self.digest = content_digest(data)
+        return changed
+
+    def replace(self, other: "Project") -> None:
+        """Become ``other`` (a fresh load of the same file), so references to this project stay valid."""
+        state = vars(self)
+        state.clear()
+        state.update(vars(other))
+
+    def transaction(self, deterministic: bool = False) -> "Transaction":
+        """Start a batch of edits; see ``pbxtool.transaction.Transaction``."""
+        from .transaction import Transaction
+
+        return Transaction(self, deterministic)
+
+    # Index -----------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def __contains__(self, object_id: str) -> bool:
+        return object_id in self.objects
+
+    def __getitem__(self, object_id: str) -> PBXObject:
+        return self.objects[object_id]
+
+    def get(self, object_id: Optional[str]) -> Optional[PBXObject]:
+        if object_id is None:
+            return None
+        return self.objects.get(object_id)
+
+    def iter_isa(self, isa: str) -> Iterator[PBXObject]:
+        """Objects of one ``isa``, in file order."""
+        for section in self.sections:
+            if section.isa == isa or section.isa is None:
+                for object_id in section.ids:
+                    obj = self.objects[object_id]
+                    if obj.isa == isa:
+                        yield obj
+
+    @property
+    def root(self) -> PBXProject:
+        if self.root_id is None:
+            raise KeyError("project has no rootObject")
+        return self.objects[self.root_id]  # type: ignore[return-value]
+
+    def targets(self) -> List[PBXTarget]:
+        return [self.objects[t] for t in self.root.targets]  # type: ignore[misc]
+
+    def target(self, name: str) -> PBXNativeTarget:
+        for target in self.targets():
+            if target.name == name:
+                return target  # type: ignore[return-value]
+        raise KeyError(f"no target named {name!r}")
+
+    def build_phase(self, target: str, isa: str = "PBXSourcesBuildPhase") -> PBXBuildPhase:
+        """First build phase of type ``isa`` on the target called ``target``."""
+        for phase_id in self.target(target).build_phases:
+            phase = self.objects[phase_id]
+            if phase.isa == isa:
+                return phase  # type: ignore[return-value]
+        raise KeyError(f"target {target!r} has no {isa}")
+
+    @property
+    def main_group(self) -> PBXGroup:
+        return self.objects[self.root.main_group]  # type: ignore[return-value]
+
+    def references(self) -> "ReferenceIndex":
+        """Reverse reference index, built on first use and kept up to date by edits."""
+        if self._references is None:
+            from .refs import ReferenceIndex
+
+            with timings.phase("references"):
+                self._references = ReferenceIndex(self)
+        return self._references
+
+    @property
+    def has_references(self) -> bool:
+        """Whether ``references()`` has been built (and is being kept up to date)."""
+        return self._references is not None
+
+    def link(self, referrer: str, key: str, target: str) -> None:
+        """Record that ``referrer`` now lists ``target`` under ``key`` (for ``references()``)."""
+        if self._references is not None:
+            self._references.link(referrer, key, target)
+
+    def unlink(self, referrer: str, key: str, target: str) -> None:
+        """Record that ``referrer`` no longer lists ``target`` under ``key``."""
+        if self._references is not None:
+            self._references.unlink(referrer, key, target)
+
+    def build_settings(self) -> "BuildSettings":
+        """Build configurations by ``(target, configuration)``, in one pass (see ``pbxtool.settings``)."""
+        from .settings import BuildSettings
+
+        return BuildSettings(self)
+
+    def group_tree(self) -> "GroupTree":
+        """Trie of the groups under the main group, built in one pass (see ``pbxtool.groups``)."""
+        from .groups import GroupTree
+
+        return GroupTree(self)
+
+    def group_paths(self) -> Dict[str, str]:
+        """Group ID -> slash-joined display names from the main group ("FamilyTodo/Stores")."""
+        return {node.id: node.path for node in self.group_tree()}
+
+    def group_for_path(self, path: str) -> PBXGroup:
+        """Group reached by following ``path`` ("FamilyTodo/Stores") from the main group.
+
+        Each component matches a child group's display name or, failing that, its
+        ``path``. Builds a ``GroupTree`` per call; for many lookups keep one.
+        """
+        return self.objects[self.group_tree()[path].id]  # type: ignore[return-value]
+
+    # Structural edits --------------------------------------------------------
+
+    def add_section(self, section: Section) -> None:
+        self.sections.append(section)
+        if section.isa is not None:
+            self._sections_by_isa.setdefault(section.isa, section)
+
+    def loose_section(self, lead: str) -> Section:
+        """Section holder for an object that sits outside any section markers."""
+        section = Section(None, lead, "")
+        section.tail = ""
+        self.sections.append(section)
+        return section
+
+    def section_for(self, isa: str) -> Section:
+        """Section that new ``isa`` objects go into, created in sorted position."""
+        section = self._sections_by_isa.get(isa)
+        if section is not None:
+            return section
+        section = Section(isa)
+        index = len(self.sections)
+        for i, existing in enumerate(self.sections):
+            if existing.isa is not None and existing.isa > isa:
+                index = i
+                break
+        self.sections.insert(index, section)
+        self._sections_by_isa[isa] = section
+        return section
+
+    def section_of(self, object_id: str) -> Section:
+        """Section holding the object ``object_id``."""
+        return self._section_of[object_id]
+
+    def add_object(self, obj: PBXObject, section: Optional[Section] = None) -> PBXObject:
+        if obj.id in self.objects:
+            raise KeyError(f"duplicate object id {obj.id}")
+        if section is None:
+            section = self.section_for(obj.isa)
+        self.objects[obj.id] = obj
+        section.ids[obj.id] = None
+        self._section_of[obj.id] = section
+        if self._references is not None:
+            self._references.add_object(obj)
+        return obj
+
+    def replace_object(self, obj: PBXObject) -> PBXObject:
+        """Swap in ``obj`` for the object with the same ID, keeping its position."""
+        old = self.objects[obj.id]
+        obj.lead = old.lead
+        self.objects[obj.id] = obj
+        if self._references is not None:
+            self._references.remove_object(old)
+            self._references.add_object(obj)
+        return old
+
+    def remove_object(self, object_id: str) -> PBXObject:
+        obj = self.objects.pop(object_id)
+        if self._references is not None:
+            self._references.remove_object(obj)
+        section = self._section_of.pop(object_id)
+        del section.ids[object_id]
+        if not section.ids:
+            self._drop_section(section)
+        return obj
+
+    def _drop_section(self, section: Section) -> None:
+        self.sections.remove(section)
+        if section.isa is not None and self._sections_by_isa.get(section.isa) is section:
+            del self._sections_by_isa[section.isa]
@@ -0,0 +1,292 @@
+"""Read-only access to project.pbxproj without building the object graph.
+
+``ProjectReader`` memory-maps the file and makes one pass over the bytes of
+the ``objects`` dictionary to record where each object starts (a UUID ->
+byte offset index: one dict entry and one array slot per object, nothing
+decoded). An object is sliced out of the map and parsed the first time it is
+asked for, and kept for later lookups; everything else stays on disk.
+
+Questions about who refers to an object ("which phases build this file?")
+search the mapped bytes for the ID instead of keeping a reverse index, so a
+query costs a few passes over the file in C and memory in proportion to the
+objects it touches, not to the size of the project. Paths are resolved the way
+``sync.project_tree`` does, by walking from the main group down the groups
+whose folder leads to the path.
+
+The index relies on Xcode's layout: each object starts on a ``\\t\\tID = {``
+line and ends with ``};`` on that line or on a ``\\t\\t};`` line. Each object
+is checked against it when first read, and one that does not fit raises
+``ParseError``; callers can fall back to ``Project.load`` for hand-edited files.
+"""
+
+from __future__ import annotations
+
+import mmap
+import re
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Callable, Collection, Dict, Iterator, List, Optional, Set, Union
+
+from . import timings
+from .groups import resolve_dir
+from .objects import PBXBuildFile, PBXFileReference, PBXGroup, PBXObject, PBXProject, PBXTarget
+from .parser import ParseError, field_scanner, parse_object
+
+_OBJECT_RE = re.compile(rb"\n\t\t([A-Za-z0-9_]+) (?:/\* [^\n]*? \*/ )?= \{")
+# One line, or a "{" line, lines indented deeper and "\t\t};".
+_BODY_RE = re.compile(rb"[^\n]*\};|[^\n]*+\n(?>\t\t\t[^\n]*+\n|[ \t]*+\n)*+\t\t\};")
+_GAP_RE = re.compile(rb"\s*(?:/\* (?:Begin|End) \w+ section \*/\s*)*")
+_KEY_RE = re.compile(rb"(\w+)\Z")
+_ROOT_RE = re.compile(rb"\trootObject = ([A-Za-z0-9_]+)")
+_ID_BYTE = frozenset(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_")
+# Above this many files, target membership is read from the build phases
+# rather than by searching the file for each file reference.
+SCAN_LIMIT = 64
+
+
+class ProjectReader:
+    """Lazily parsed, read-only view of a project.pbxproj (see the module docstring)."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index: Dict[str, int] = {}
+        self._starts = array("q")
+        self._ends: Dict[int, int] = {}
+        self._objects: Dict[str, PBXObject] = {}
+        self._scanners: Dict[str, Callable[[str], Dict[str, Union[str, List[str]]]]] = {}
+        try:
+            self.root_id = self._build_index()
+        except BaseException:
+            self.close()
+            raise
+
+    @timings.timed("index")
+    def _build_index(self) -> str:
+        data = self._map
+        timings.count("bytes_read", len(data))
+        opening = data.find(b"\n\tobjects = {")
+        self._closing = data.rfind(b"\n\t};")
+        root = _ROOT_RE.search(data, max(self._closing, 0))
+        if opening < 0 or self._closing < opening or root is None:
+            raise ParseError(f"{self.path} is not in Xcode's layout")
+        index, starts = self._index, self._starts
+        for m in _OBJECT_RE.finditer(data, opening, self._closing):
+            object_id = m.group(1).decode("ascii")
+            if object_id in index:
+                raise ParseError(f"duplicate object id {object_id}")
+            index[object_id] = len(starts)
+            starts.append(m.start(1))
+        timings.count("objects", len(index))
+        return root.group(1).decode("ascii")
+
+    def _end(self, i: int) -> int:
+        """End offset of object ``i``, checked the first time it is needed."""
+        end = self._ends.get(i)
+        if end is None:
+            data = self._map
+            start = self._starts[i]
+            limit = self._starts[i + 1] - 3 if i + 1 < len(self._starts) else self._closing
+            # The object ends at the last "};" before the next one; only whitespace
+            # and section markers may follow it, and its body lines are indented.
+            end = data.rfind(b"};", start, limit) + 2
+            gap = _GAP_RE.match(data, end, limit)
+            if end < 2 or gap.end() != limit or not _BODY_RE.fullmatch(data, start, end):  # type: ignore[union-attr]
+                raise ParseError(f"object at offset {start} of {self.path} is not in Xcode's layout")
+            self._ends[i] = end
+        return end
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "ProjectReader":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # Objects ---------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, object_id: str) -> bool:
+        return object_id in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        """Object IDs, in file order."""
+        return iter(self._index)
+
+    def raw(self, object_id: str) -> str:
+        """Source text of an object (``ID /* comment */ = {...};``)."""
+        i = self._index[object_id]
+        return self._map[self._starts[i] : self._end(i)].decode("utf-8")
+
+    def __getitem__(self, object_id: str) -> PBXObject:
+        obj = self._objects.get(object_id)
+        if obj is None:
+            if object_id not in self._index:
+                self._missing(object_id)
+                raise KeyError(object_id)
+            obj = self._objects[object_id] = parse_object(self.raw(object_id))
+        return obj
+
+    def get(self, object_id: Optional[str]) -> Optional[PBXObject]:
+        if object_id is None:
+            return None
+        try:
+            return self[object_id]
+        except KeyError:
+            return None
+
+    def _missing(self, object_id: str) -> None:
+        """Raise ``ParseError`` if ``object_id`` is defined in a way the index did not pick up."""
+        entry = re.compile(rb"[{;]\s*" + re.escape(object_id.encode("utf-8")) + rb"\s*(?:/\*.*?\*/\s*)?=\s*\{")
+        m = entry.search(self._map)
+        if m is not None:
+            raise ParseError(f"object {object_id} at offset {m.start()} of {self.path} is not in Xcode's layout")
+
+    @property
+    def loaded(self) -> int:
+        """Number of objects parsed so far."""
+        return len(self._objects)
+
+    @property
+    def root(self) -> PBXProject:
+        return self[self.root_id]  # type: ignore[return-value]
+
+    @property
+    def main_group(self) -> PBXGroup:
+        return self[self.root.main_group]  # type: ignore[return-value]
+
+    def targets(self) -> List[PBXTarget]:
+        return [self[t] for t in self.root.targets]  # type: ignore[misc]
+
+    def target(self, name: str) -> PBXTarget:
+        for target in self.targets():
+            if target.name == name:
+                return target
+        raise KeyError(f"no target named {name!r}")
+
+    # References ------------------------------------------------------------
+
+    def _object_at(self, offset: int) -> Optional[int]:
+        """Position in the index of the object whose text contains byte ``offset`` (None between objects)."""
+        i = bisect_right(self._starts, offset) - 1
+        if i < 0 or offset >= self._end(i):
+            return None
+        return i
+
+    def _key_at(self, start: int, offset: int) -> Optional[str]:
+        """Key whose value holds byte ``offset`` of the object at ``start``, judged from the nearest ``key = ``."""
+        data = self._map
+        equals = data.rfind(b" = ", start, offset)
+        if equals < 0 or data.find(b";", equals, offset) >= 0:
+            return None
+        m = _KEY_RE.search(data, max(equals - 128, 0), equals)
+        return m.group(1).decode("ascii") if m is not None else None
+
+    def find_referrers(self, targets: Collection[str], key: Optional[str] = None) -> Dict[str, Set[str]]:
+        """Target ID -> IDs of the objects listing it (under ``key`` only, if given).
+
+        One search of the mapped file for all of ``targets``; only the objects
+        found are read, and those only from their text.
+        """
+        found: Dict[str, Set[str]] = {target: set() for target in targets}
+        if not found:
+            return found
+        data = self._map
+        scan = None
+        if key is not None:
+            scan = self._scanners.get(key)
+            if scan is None:
+                scan = self._scanners[key] = field_scanner({key})
+        needles = sorted(found, key=len, reverse=True)
+        pattern = re.compile(b"|".join(re.escape(target.encode("ascii")) for target in needles))
+        size = len(data)
+        for m in pattern.finditer(data):
+            start, end = m.span()
+            if (start and data[start - 1] in _ID_BYTE) or (end < size and data[end] in _ID_BYTE):
+                continue
+            i = self._object_at(start)
+            if i is None or self._starts[i] == start:
+                continue  # between objects, or the object's own entry
+            head = _OBJECT_RE.match(data, self._starts[i] - 3)
+            referrer = head.group(1).decode("ascii")  # type: ignore[union-attr]
+            target = m.group().decode("ascii")
+            if scan is not None and self._key_at(self._starts[i], start) != key:
+                # Not obviously under ``key`` (a comment or string may be in the
+                # way): read the object's field to be sure.
+                value = scan(self.raw(referrer)).get(key)  # type: ignore[arg-type]
+                if value != target and not (isinstance(value, list) and target in value):
+                    continue
+            found[target].add(referrer)
+        return found
+
+    def referrers(self, target: str, key: Optional[str] = None) -> List[str]:
+        """IDs of the objects referring to ``target`` (through ``key`` only, if given)."""
+        return sorted(self.find_referrers((target,), key)[target])
+
+    # Paths -----------------------------------------------------------------
+
+    def files(self, folder: str = "") -> Dict[str, str]:
+        """Source-root-relative path -> file reference ID, for files under ``folder``.
+
+        Only the groups on the way to ``folder`` (and their children) and the
+        groups below it are read. Same precedence as ``sync.project_tree``.
+        """
+        folder = folder.strip("/")
+        files: Dict[str, str] = {}
+        stack = [(self.main_group, "")]
+        seen: Set[str] = set()
+        while stack:
+            group, group_dir = stack.pop()
+            inside = _under(group_dir, folder)
+            children = []
+            for child_id in group.children:
+                child = self.get(child_id)
+                if isinstance(child, PBXGroup):
+                    child_dir = resolve_dir(child.source_tree, child.path, group_dir)
+                    leads = child_dir is not None and (_under(child_dir, folder) or _under(folder, child_dir))
+                    if leads and child_id not in seen:
+                        seen.add(child_id)
+                        children.append((child, child_dir))
+                elif isinstance(child, PBXFileReference) and inside:
+                    path = resolve_dir(child.source_tree, child.path, group_dir)
+                    if path is not None:
+                        files.setdefault(path, child.id)
+            stack.extend(reversed(children))
+        return files
+
+    def file_ref(self, path: str) -> Optional[PBXFileReference]:
+        """File reference for the source-root-relative ``path``, or None."""
+        ref = self.files(path.rsplit("/", 1)[0] if "/" in path else "").get(path)
+        return self[ref] if ref is not None else None  # type: ignore[return-value]
+
+    def membership(self, refs: Collection[str]) -> Dict[str, List[str]]:
+        """File reference ID -> names of the targets that build it, in target order."""
+        targets = self.targets()
+        wanted = set(refs)
+        built: Dict[str, Set[str]] = {ref: set() for ref in wanted}
+        if len(wanted) > SCAN_LIMIT:
+            # Most of the project anyway: read each phase's build files once.
+            for target in targets:
+                for phase_id in target.build_phases:
+                    for build_file_id in self[phase_id].get("files", ()):
+                        build_file = self.get(build_file_id)
+                        if isinstance(build_file, PBXBuildFile) and build_file.file_ref in wanted:
+                            built[build_file.file_ref].add(target.name)  # type: ignore[index]
+        else:
+            build_files = self.find_referrers(wanted, "fileRef")
+            phases = self.find_referrers({bf for found in build_files.values() for bf in found}, "files")
+            target_of = {phase: target.name for target in targets for phase in target.build_phases}
+            for ref, found in build_files.items():
+                built[ref] = {target_of[phase] for bf in found for phase in phases[bf] if phase in target_of}
+        order = {target.name: i for i, target in enumerate(targets)}
+        return {ref: sorted(names, key=order.__getitem__) for ref, names in built.items()}
+
+
+def _under(path: str, folder: str) -> bool:
+    return not folder or path == folder or path.startswith(folder + "/")
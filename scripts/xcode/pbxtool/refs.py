@@ -0,0 +1,144 @@
+"""Reverse reference index: object ID -> the objects (and keys) that refer to it.
+
+Built in one pass over the project on first use (``Project.references()``),
+reading only the keys that hold object IDs (``REFERENCE_KEYS``). Unmodified
+objects are scanned from their source text instead of being decoded, so a
+lazily loaded project stays undecoded. ``Project.add_object()`` /
+``remove_object()`` and the transaction operations keep it in step afterwards,
+which lets removing or moving a file touch only the groups, build files and
+phases that actually list it.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from .parser import field_scanner
+
+if TYPE_CHECKING:
+    from .objects import PBXObject
+    from .project import Project
+
+# Keys whose value is an object ID or a list of them.
+REFERENCE_KEYS = frozenset(
+    {
+        "baseConfigurationReference",
+        "buildConfigurationList",
+        "buildConfigurations",
+        "buildPhases",
+        "buildRules",
+        "children",
+        "containerPortal",
+        "dependencies",
+        "exceptions",
+        "fileRef",
+        "files",
+        "fileSystemSynchronizedGroups",
+        "mainGroup",
+        "packageProductDependencies",
+        "packageReferences",
+        "productRef",
+        "productRefGroup",
+        "productReference",
+        "remoteGlobalIDString",
+        "target",
+        "targetProxy",
+        "targets",
+    }
+)
+FILE_REF_RE = re.compile(r"fileRef = ([A-Za-z0-9_]+)")
+
+Scanner = Callable[[str], Dict[str, Union[str, List[str]]]]
+
+
+def reference_fields(obj: "PBXObject", scan: Optional[Scanner] = None) -> Dict[str, Union[str, List[str]]]:
+    """The ``REFERENCE_KEYS`` fields of ``obj``, read from its text when it is unmodified."""
+    raw = obj.raw
+    if raw is None:
+        return {key: value for key, value in obj.fields.items() if key in REFERENCE_KEYS}
+    if obj.isa == "PBXFileReference":
+        return {}  # refers to nothing; these and build files are most of a project
+    if obj.isa == "PBXBuildFile" and '"' not in raw and "productRef" not in raw:
+        m = FILE_REF_RE.search(raw)
+        return {"fileRef": m.group(1)} if m else {}
+    return (scan or field_scanner(REFERENCE_KEYS))(raw)
+
+
+Entry = Tuple[str, str]
+
+
+class ReferenceIndex:
+    """Object ID -> ``(referring object ID, key)`` pairs.
+
+    Nearly every object has exactly one referrer, so that case is stored as the
+    bare pair and only IDs with more referrers get a set; this keeps the index
+    small next to the project itself.
+    """
+
+    def __init__(self, project: "Project") -> None:
+        self._referrers: Dict[str, Union[Entry, Set[Entry]]] = {}
+        self._scan = field_scanner(REFERENCE_KEYS)
+        referrers = self._referrers
+        # Same as add_object() for every object, with link() inlined: this loop
+        # runs once per reference in the project.
+        for obj in project.objects.values():
+            for key, value in reference_fields(obj, self._scan).items():
+                for target in value if isinstance(value, list) else (value,):
+                    if isinstance(target, str):
+                        found = referrers.get(target)
+                        if found is None:
+                            referrers[target] = (obj.id, key)
+                        elif isinstance(found, set):
+                            found.add((obj.id, key))
+                        elif found != (obj.id, key):
+                            referrers[target] = {found, (obj.id, key)}
+
+    def _outgoing(self, obj: "PBXObject") -> Iterator[Tuple[str, str]]:
+        for key, value in reference_fields(obj, self._scan).items():
+            for target in value if isinstance(value, list) else (value,):
+                if isinstance(target, str):
+                    yield key, target
+
+    def add_object(self, obj: "PBXObject") -> None:
+        for key, target in self._outgoing(obj):
+            self.link(obj.id, key, target)
+
+    def remove_object(self, obj: "PBXObject") -> None:
+        """Forget the references ``obj`` makes (references to it stay until their owners drop them)."""
+        for key, target in self._outgoing(obj):
+            self.unlink(obj.id, key, target)
+
+    def link(self, referrer: str, key: str, target: str) -> None:
+        entry = (referrer, key)
+        found = self._referrers.get(target)
+        if found is None:
+            self._referrers[target] = entry
+        elif isinstance(found, set):
+            found.add(entry)
+        elif found != entry:
+            self._referrers[target] = {found, entry}
+
+    def unlink(self, referrer: str, key: str, target: str) -> None:
+        entry = (referrer, key)
+        found = self._referrers.get(target)
+        if found == entry:
+            del self._referrers[target]
+        elif isinstance(found, set):
+            found.discard(entry)
+            if len(found) == 1:
+                self._referrers[target] = found.pop()
+
+    def references(self, target: str) -> Set[Entry]:
+        """``(object ID, key)`` pairs referring to ``target``."""
+        found = self._referrers.get(target)
+        if found is None:
+            return set()
+        return set(found) if isinstance(found, set) else {found}
+
+    def referrers(self, target: str, key: Optional[str] = None) -> List[str]:
+        """IDs of the objects referring to ``target`` (through ``key`` only, if given)."""
+        return sorted({referrer for referrer, k in self.references(target) if key is None or k == key})
+
+    def __contains__(self, target: str) -> bool:
+        return target in self._referrers
@@ -0,0 +1,382 @@
+"""Shared schemes (``xcshareddata/xcschemes/*.xcscheme``) kept in step with the targets.
+
+``Scheme.read()`` streams the XML through expat (the event parser under
+``ElementTree.iterparse``) and keeps only what the edits need: the byte span
+and attributes of every ``BuildableReference``, the span of each
+``TestableReference`` and where ``</Testables>`` sits. No tree is built, and
+edits are spliced into the original bytes, so everything they do not touch
+(Xcode's attribute layout and indentation) is written back unchanged.
+
+``scheme_targets()`` indexes the project's targets by ID (from a ``Project``
+or a ``ProjectReader``); ``check_schemes()`` cross-checks every reference to
+this project against it:
+
+* a ``BlueprintIdentifier`` that is not a target (the target was recreated
+  with a new ID, as ``add-uitest-target.sh`` does): Xcode silently drops it,
+  so its tests stop running;
+* a ``BlueprintName`` or ``BuildableName`` that no longer matches the target.
+
+``Scheme.retarget()`` repairs both (matching lost IDs by name), and
+``add_testable()`` / ``remove_testables()`` edit the test action; a bulk
+edit over every scheme is one read and at most one write per file.
+"""
+
+from __future__ import annotations
+
+import re
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import TYPE_CHECKING, Collection, Dict, List, NamedTuple, Optional, Tuple, Union
+from xml.parsers import expat
+from xml.sax.saxutils import escape
+
+from . import timings
+from .fileio import write_if_changed
+from .objects import TEST_PRODUCT_TYPES
+
+if TYPE_CHECKING:
+    from .check import Problem
+    from .project import Project
+    from .reader import ProjectReader
+
+# One start or empty-element tag; attribute values may hold ">".
+_TAG_RE = re.compile(rb"""<[^>"']*(?:(?:"[^"]*"|'[^']*')[^>"']*)*>""")
+
+
+class SchemeTarget(NamedTuple):
+    id: str
+    name: str
+    product: str
+    testing: bool
+
+
+def scheme_targets(source: Union["Project", "ProjectReader"]) -> Dict[str, SchemeTarget]:
+    """Target ID -> ``SchemeTarget`` (name, product file name, whether it is a test bundle)."""
+    targets: Dict[str, SchemeTarget] = {}
+    for target in source.targets():
+        product = source.get(target.get("productReference"))
+        product_name = (product.get("path") or product.get("name") or "") if product is not None else ""
+        testing = (target.get("productType") or "").endswith(TEST_PRODUCT_TYPES)
+        targets[target.id] = SchemeTarget(target.id, target.name, product_name, testing)
+    return targets
+
+
+class BuildableReference:
+    """A ``<BuildableReference>`` start tag: its byte span, attributes and enclosing action."""
+
+    __slots__ = ("start", "end", "attrs", "action")
+
+    def __init__(self, start: int, end: int, attrs: Dict[str, str], action: str) -> None:
+        self.start = start
+        self.end = end
+        self.attrs = attrs
+        self.action = action
+
+    @property
+    def blueprint(self) -> str:
+        return self.attrs.get("BlueprintIdentifier", "")
+
+    @property
+    def name(self) -> str:
+        return self.attrs.get("BlueprintName", "")
+
+
+class TestableReference:
+    """A ``<TestableReference>`` element, as whole lines (``start`` to just past its last newline)."""
+
+    __slots__ = ("start", "end", "head", "buildable")
+
+    def __init__(self, start: int, head: int) -> None:
+        self.start = start
+        self.end = start
+        self.head = head  # end of the start tag
+        self.buildable: Optional[BuildableReference] = None
+
+
+def _line_start(data: bytes, at: int) -> int:
+    i = at
+    while i > 0 and data[i - 1] in b" \t":
+        i -= 1
+    return i if i == 0 or data[i - 1] == 0x0A else at
+
+
+def _line_end(data: bytes, at: int) -> int:
+    i = at
+    while i < len(data) and data[i] in b" \t\r":
+        i += 1
+    return i + 1 if i < len(data) and data[i] == 0x0A else at
+
+
+def _indent(data: bytes, at: int) -> bytes:
+    return data[_line_start(data, at) : at]
+
+
+def _set_attr(tag: bytes, name: str, value: str) -> bytes:
+    """``tag`` with attribute ``name`` set to ``value`` (appended if missing)."""
+    quoted = escape(value, {'"': "&quot;"}).encode("utf-8")
+    pattern = re.compile(rb"(\s" + name.encode("ascii") + rb'\s*=\s*")[^"]*(")')
+    if pattern.search(tag):
+        return pattern.sub(lambda m: m.group(1) + quoted + m.group(2), tag, count=1)
+    close = len(tag) - (2 if tag.endswith(b"/>") else 1)
+    return tag[:close].rstrip() + b" " + name.encode("ascii") + b'="' + quoted + b'"' + tag[close:]
+
+
+class Scheme:
+    """One .xcscheme file, scanned once; edits are queued as byte splices (see the module docstring)."""
+
+    def __init__(self, path: Path, data: bytes) -> None:
+        self.path = path
+        self.data = data
+        self.buildables: List[BuildableReference] = []
+        self.testables: List[TestableReference] = []
+        # The <Testables> start tag's span, whether it is empty (<Testables/>),
+        # and the start of the </Testables> line.
+        self._testables: Optional[Tuple[int, int, bool]] = None
+        self._testables_close: Optional[int] = None
+        self._test_action: Optional[int] = None
+        self._edits: List[Tuple[int, int, bytes]] = []
+        self._adding: Dict[str, Tuple[SchemeTarget, str]] = {}
+        self._scan()
+
+    @classmethod
+    def read(cls, path: Union[str, Path]) -> "Scheme":
+        path = Path(path)
+        return cls(path, path.read_bytes())
+
+    @property
+    def name(self) -> str:
+        return self.path.stem
+
+    def _scan(self) -> None:
+        data = self.data
+        parser = expat.ParserCreate()
+        stack: List[str] = []
+        open_testables: List[TestableReference] = []
+
+        def start(name: str, attrs: Dict[str, str]) -> None:
+            at = parser.CurrentByteIndex
+            end = _TAG_RE.match(data, at).end()  # type: ignore[union-attr]
+            stack.append(name)
+            if name == "BuildableReference":
+                ref = BuildableReference(at, end, attrs, stack[1] if len(stack) > 1 else "")
+                self.buildables.append(ref)
+                if open_testables and len(stack) >= 2 and stack[-2] == "TestableReference":
+                    open_testables[-1].buildable = ref
+            elif name == "TestableReference" and stack[-2:-1] == ["Testables"]:
+                testable = TestableReference(_line_start(data, at), end)
+                open_testables.append(testable)
+                self.testables.append(testable)
+            elif name == "Testables" and stack[-2:-1] == ["TestAction"]:
+                self._testables = (at, end, data[end - 2 : end] == b"/>")
+            elif name == "TestAction":
+                self._test_action = at
+
+        def close(name: str) -> None:
+            at = parser.CurrentByteIndex
+            stack.pop()
+            # For an empty-element tag expat reports the end of that tag; otherwise the start of "</name>".
+            end = data.index(b">", at) + 1 if data.startswith(b"</", at) else at
+            if name == "TestableReference" and open_testables:
+                testable = open_testables.pop()
+                testable.end = _line_end(data, end)
+            elif name == "Testables" and self._testables is not None and self._testables_close is None:
+                if not self._testables[2]:
+                    self._testables_close = _line_start(data, at)
+
+        parser.StartElementHandler = start
+        parser.EndElementHandler = close
+        try:
+            parser.Parse(data, True)
+        except expat.ExpatError as error:
+            raise ValueError(f"{self.path}: {error}") from None
+
+    # Checks ----------------------------------------------------------------
+
+    def references(self, container: str) -> List[BuildableReference]:
+        """References to targets of the project ``container`` (``container:FamilyTodo.xcodeproj``)."""
+        return [ref for ref in self.buildables if ref.attrs.get("ReferencedContainer") == container]
+
+    def tested(self) -> List[str]:
+        """Blueprint IDs of the testables (including ones queued for adding)."""
+        return [t.buildable.blueprint for t in self.testables if t.buildable is not None] + list(self._adding)
+
+    # Edits -----------------------------------------------------------------
+
+    def retarget(self, ref: BuildableReference, target: SchemeTarget) -> bool:
+        """Point ``ref`` at ``target`` (ID, name and product); returns whether that changes it."""
+        tag = self.data[ref.start : ref.end]
+        new = tag
+        for name, value in (
+            ("BlueprintIdentifier", target.id),
+            ("BuildableName", target.product),
+            ("BlueprintName", target.name),
+        ):
+            if ref.attrs.get(name) != value:
+                new = _set_attr(new, name, value)
+        if new == tag:
+            return False
+        self._edits.append((ref.start, ref.end, new))
+        return True
+
+    def add_testable(self, target: SchemeTarget, container: str) -> bool:
+        """Queue a ``TestableReference`` to ``target``; False if the scheme already tests it."""
+        if target.id in self.tested():
+            return False
+        if self._testables is None:
+            from .cli import CommandError
+
+            raise CommandError(f"scheme {self.name} has no Testables in its TestAction")
+        self._adding[target.id] = (target, container)
+        return True
+
+    def remove_testables(self, ids: Collection[str]) -> List[str]:
+        """Queue removal of the testables for the target IDs ``ids``; returns the names removed."""
+        removed = []
+        for testable in self.testables:
+            ref = testable.buildable
+            if ref is not None and ref.blueprint in ids:
+                self._edits.append((testable.start, testable.end, b""))
+                removed.append(ref.name)
+        for target_id in [i for i in self._adding if i in ids]:
+            removed.append(self._adding.pop(target_id)[0].name)
+        return removed
+
+    def _testable_text(self, target: SchemeTarget, container: str) -> bytes:
+        """A new ``TestableReference``, laid out like the scheme's own entries."""
+        data = self.data
+        assert self._testables is not None
+        testables_indent = _indent(data, self._testables[0])
+        action_indent = _indent(data, self._test_action) if self._test_action is not None else b""
+        unit = testables_indent[len(action_indent) :] or b"   "
+        if self.testables:
+            last = self.testables[-1]
+            tag_at = data.index(b"<", last.start)
+            indent = data[last.start : tag_at]
+            head = _set_attr(data[tag_at : last.head], "skipped", "NO")
+        # Copy the layout of a testable's reference if there is one, else of any reference.
+        candidates = [t.buildable for t in self.testables if t.buildable is not None][-1:] + self.buildables[:1]
+        template = candidates[0] if candidates else None
+        if not self.testables:
+            indent = testables_indent + unit
+            if template is not None and b"\n" in data[template.start : template.end]:
+                head = b"<TestableReference\n" + indent + unit + b'skipped = "NO">'  # Xcode's own layout
+            else:
+                head = b'<TestableReference skipped="NO">'
+        inner = indent + unit
+        if template is not None:
+            tag = data[template.start : template.end].replace(b"\n" + _indent(data, template.start), b"\n" + inner)
+        else:
+            tag = b"<BuildableReference/>"
+        for name, value in (
+            ("BuildableIdentifier", "primary"),
+            ("BlueprintIdentifier", target.id),
+            ("BuildableName", target.product),
+            ("BlueprintName", target.name),
+            ("ReferencedContainer", container),
+        ):
+            tag = _set_attr(tag, name, value)
+        if not tag.endswith(b"/>"):
+            tag += b"\n" + inner + b"</BuildableReference>"
+        return indent + head + b"\n" + inner + tag + b"\n" + indent + b"</TestableReference>\n"
+
+    @property
+    def modified(self) -> bool:
+        return bool(self._edits or self._adding)
+
+    def render(self) -> bytes:
+        """The scheme's bytes with the queued edits applied."""
+        edits = list(self._edits)
+        if self._adding:
+            added = b"".join(self._testable_text(target, container) for target, container in self._adding.values())
+            start, end, empty = self._testables  # type: ignore[misc]
+            if empty:
+                indent = _indent(self.data, start)
+                tag = self.data[start:end]
+                opened = tag[:-2].rstrip() + b">"
+                edits.append((start, end, opened + b"\n" + added + indent + b"</Testables>"))
+            else:
+                at = self._testables_close if self._testables_close is not None else end
+                edits.append((at, at, added))
+        out: List[bytes] = []
+        pos = 0
+        for start, end, text in sorted(edits, key=lambda edit: (edit[0], -edit[1])):
+            if start < pos:
+                continue  # inside a span already replaced (a retargeted ref in a removed testable)
+            out.append(self.data[pos:start])
+            out.append(text)
+            pos = end
+        out.append(self.data[pos:])
+        return b"".join(out)
+
+    def save(self) -> bool:
+        """Write the edited scheme (skipped when nothing changed); returns whether it wrote."""
+        if not self.modified:
+            return False
+        return write_if_changed(self.path, self.render().decode("utf-8"))
+
+
+def scheme_dir(xcodeproj: Path) -> Path:
+    return xcodeproj / "xcshareddata" / "xcschemes"
+
+
+def container_for(xcodeproj: Path) -> str:
+    """``ReferencedContainer`` value for targets of ``xcodeproj``."""
+    return f"container:{xcodeproj.name}"
+
+
+@timings.timed("schemes")
+def load_schemes(xcodeproj: Path, pattern: str = "*") -> List[Scheme]:
+    """The shared schemes of ``xcodeproj`` whose names match ``pattern``, sorted by name."""
+    return [
+        Scheme.read(path)
+        for path in sorted(scheme_dir(xcodeproj).glob("*.xcscheme"))
+        if fnmatchcase(path.stem, pattern)
+    ]
+
+
+def _by_name(targets: Dict[str, SchemeTarget], ref: BuildableReference) -> Optional[SchemeTarget]:
+    for target in targets.values():
+        if target.name == ref.name:
+            return target
+    buildable = ref.attrs.get("BuildableName")
+    matches = [target for target in targets.values() if buildable and target.product == buildable]
+    return matches[0] if len(matches) == 1 else None
+
+
+def check_schemes(schemes: List[Scheme], targets: Dict[str, SchemeTarget], container: str) -> List["Problem"]:
+    """References in ``schemes`` to targets that do not exist or whose names are out of date."""
+    from .check import Problem
+
+    problems = []
+    for scheme in schemes:
+        for ref in scheme.references(container):
+            target = targets.get(ref.blueprint)
+            where = f"scheme {scheme.name} ({ref.action})"
+            if target is None:
+                match = _by_name(targets, ref)
+                hint = f"; {match.name} is now {match.id}" if match is not None else ""
+                problems.append(Problem("scheme", ref.blueprint, f"{where} refers to no target ({ref.name}){hint}"))
+            elif ref.name != target.name or ref.attrs.get("BuildableName", target.product) != target.product:
+                named = f"{ref.name} / {ref.attrs.get('BuildableName')}, not {target.name} / {target.product}"
+                problems.append(Problem("scheme", ref.blueprint, f"{where} names {named}"))
+    return problems
+
+
+def fix_schemes(schemes: List[Scheme], targets: Dict[str, SchemeTarget], container: str) -> List[str]:
+    """Queue repairs for what ``check_schemes`` reports; returns a line per repair and per reference left broken."""
+    report = []
+    for scheme in schemes:
+        for ref in scheme.references(container):
+            target = targets.get(ref.blueprint) or _by_name(targets, ref)
+            if target is None:
+                report.append(f"{scheme.name}: no target for {ref.blueprint} ({ref.name}) in {ref.action}")
+            elif scheme.retarget(ref, target):
+                old = f"{ref.blueprint} ({ref.name})"
+                report.append(f"{scheme.name}: {ref.action} {old} -> {target.id} ({target.name})")
+    return report
+
+
+def untested(schemes: List[Scheme], targets: Dict[str, SchemeTarget]) -> List[SchemeTarget]:
+    """Test bundle targets that no scheme runs."""
+    tested = {blueprint for scheme in schemes for blueprint in scheme.tested()}
+    return [target for target in targets.values() if target.testing and target.id not in tested]
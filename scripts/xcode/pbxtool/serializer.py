@@ -0,0 +1,103 @@
+"""Render modified objects back into Xcode's project.pbxproj formatting.
+
+Only objects that were changed (or created) go through here; untouched
+objects are written back from their original text by ``Project.serialize``.
+The layout mirrors what Xcode itself writes: ``PBXBuildFile`` and
+``PBXFileReference`` on a single line, everything else one key per line.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from .objects import PBXObject
+    from .project import Project
+
+INLINE_ISAS = frozenset({"PBXBuildFile", "PBXFileReference"})
+# Keys whose object-ID values Xcode writes without a ``/* name */`` comment.
+_UNCOMMENTED_KEYS = frozenset({"mainGroup", "remoteGlobalIDString", "TestTargetID"})
+_BARE_RE = re.compile(r"[A-Za-z0-9_$./]+")
+
+
+def quote(value: str) -> str:
+    """Quote a plist string the way Xcode does."""
+    if _BARE_RE.fullmatch(value) and "___" not in value and "//" not in value:
+        return value
+    escaped = (
+        value.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\t", "\\t")
+    )
+    return f'"{escaped}"'
+
+
+def _comment_for(project: "Project", value: str) -> str:
+    obj = project.objects.get(value)
+    if obj is None or not obj.comment:
+        return ""
+    return f" /* {obj.comment} */"
+
+
+def _scalar(project: "Project", key: str, value: str) -> str:
+    text = quote(value)
+    if key not in _UNCOMMENTED_KEYS:
+        text += _comment_for(project, value)
+    return text
+
+
+def _render_inline(project: "Project", key: str, value: Any) -> str:
+    if isinstance(value, dict):
+        body = "".join(
+            f"{quote(k)} = {_render_inline(project, k, v)}; " for k, v in value.items()
+        )
+        return "{" + body + "}"
+    if isinstance(value, list):
+        return "(" + "".join(f"{_render_inline(project, key, v)}, " for v in value) + ")"
+    return _scalar(project, key, value)
+
+
+def _render_block(project: "Project", key: str, value: Any, depth: int) -> str:
+    if isinstance(value, dict):
+        return _render_dict(project, value, depth)
+    if isinstance(value, list):
+        indent = "\t" * (depth + 1)
+        lines: List[str] = ["("]
+        for item in value:
+            lines.append(f"{indent}{_render_block(project, key, item, depth + 1)},")
+        lines.append("\t" * depth + ")")
+        return "\n".join(lines)
+    return _scalar(project, key, value)
+
+
+def _render_dict(project: "Project", fields: Dict[str, Any], depth: int) -> str:
+    indent = "\t" * (depth + 1)
+    lines: List[str] = ["{"]
+    for key, value in _ordered(fields):
+        lines.append(f"{indent}{quote(key)} = {_render_block(project, key, value, depth + 1)};")
+    lines.append("\t" * depth + "}")
+    return "\n".join(lines)
+
+
+def _ordered(fields: Dict[str, Any]):
+    if "isa" in fields:
+        yield "isa", fields["isa"]
+    for key, value in fields.items():
+        if key != "isa":
+            yield key, value
+
+
+def render_object(project: "Project", obj: "PBXObject") -> str:
+    """Render ``ID /* comment */ = {...};`` for one object, without leading indent."""
+    head = quote(obj.id)
+    if obj.comment:
+        head += f" /* {obj.comment} */"
+    if obj.isa in INLINE_ISAS:
+        body = "{" + "".join(
+            f"{quote(k)} = {_render_inline(project, k, v)}; " for k, v in _ordered(obj.fields)
+        ) + "}"
+    else:
+        body = _render_dict(project, obj.fields, 2)
+    return f"{head} = {body};"
@@ -0,0 +1,172 @@
+"""Build settings by target, configuration and key.
+
+``BuildSettings(project)`` walks the project's and every target's
+configuration list once and indexes their ``XCBuildConfiguration`` objects
+by ``(target, configuration)``; the project itself is the target named
+``PROJECT``. Entries point at the objects, so a ``(target, configuration,
+key)`` lookup is two dict hits and sees edits applied since the index was
+built.
+
+Selectors are ``fnmatch`` globs on target names, configuration names and
+keys (``"*"``, ``"FamilyTodo*"``, ``"INFOPLIST_KEY_*"``); ``"*"`` matches
+the project too. ``effective()`` resolves a target's value through the
+project's configuration of the same name, expanding ``$(inherited)``.
+``baseConfigurationReference`` (.xcconfig) files are not read.
+
+Edits go through the transaction (``tx.set_build_settings()``,
+``tx.unset_build_settings()``): one operation per configuration, applied
+with the rest of the batch and written once.
+"""
+
+from __future__ import annotations
+
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .objects import XCBuildConfiguration
+
+if TYPE_CHECKING:
+    from .project import Project
+
+# Target name under which the project-level configurations are indexed.
+PROJECT = "<project>"
+INHERITED = "$(inherited)"
+
+Value = Union[str, List[str]]
+Row = Tuple[str, str, str, Value]
+
+
+def is_glob(pattern: str) -> bool:
+    return any(c in pattern for c in "*?[")
+
+
+def _matching(names: Iterable[str], pattern: str) -> List[str]:
+    if not is_glob(pattern):
+        return [name for name in names if name == pattern]
+    return [name for name in names if fnmatchcase(name, pattern)]
+
+
+class BuildSettings:
+    """``(target, configuration)`` -> ``XCBuildConfiguration`` index (see the module docstring)."""
+
+    def __init__(self, project: "Project") -> None:
+        self.project = project
+        self._configs: Dict[Tuple[str, str], str] = {}
+        # Owners (PROJECT, then targets) and configuration names, in project order.
+        self.targets: List[str] = []
+        self.configurations: List[str] = []
+        owners = [(PROJECT, project.root.build_configuration_list)]
+        owners += [(target.name, target.build_configuration_list) for target in project.targets()]
+        for owner, list_id in owners:
+            config_list = project.get(list_id)
+            if config_list is None:
+                continue
+            self.targets.append(owner)
+            for config_id in config_list.get("buildConfigurations", ()):
+                config = project.get(config_id)
+                if isinstance(config, XCBuildConfiguration):
+                    self._configs.setdefault((owner, config.name), config_id)
+                    if config.name not in self.configurations:
+                        self.configurations.append(config.name)
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+    def config(self, target: str, configuration: str) -> XCBuildConfiguration:
+        config_id = self._configs.get((target, configuration))
+        if config_id is None:
+            raise KeyError(f"no {configuration!r} configuration for {target!r}")
+        return self.project[config_id]  # type: ignore[return-value]
+
+    def config_id(self, target: str, configuration: str) -> str:
+        return self.config(target, configuration).id
+
+    def select(self, target: str = "*", configuration: str = "*") -> List[Tuple[str, str]]:
+        """``(target, configuration)`` pairs matching the globs, in project order."""
+        configurations = set(_matching(self.configurations, configuration))
+        return [
+            (owner, name)
+            for owner in _matching(self.targets, target)
+            for name in self.configurations
+            if name in configurations and (owner, name) in self._configs
+        ]
+
+    def settings(self, target: str, configuration: str) -> Dict[str, Value]:
+        """The ``buildSettings`` dict of one configuration (live; edit it through a transaction)."""
+        return self.config(target, configuration).build_settings
+
+    def get(self, target: str, configuration: str, key: str, default: Any = None) -> Any:
+        """Value set on this configuration itself, or ``default``."""
+        return self.settings(target, configuration).get(key, default)
+
+    def effective(self, target: str, configuration: str, key: str) -> Optional[Value]:
+        """Value Xcode would use: the target's, inheriting the project's where unset or ``$(inherited)``."""
+        value = self.get(target, configuration, key)
+        if target == PROJECT or (value is not None and INHERITED not in value):
+            return value
+        parent = self.get(PROJECT, configuration, key) if (PROJECT, configuration) in self._configs else None
+        if value is None:
+            return parent
+        return _inherit(value, parent)
+
+    def query(self, key: str = "*", target: str = "*", configuration: str = "*", effective: bool = False) -> List[Row]:
+        """``(target, configuration, key, value)`` for every matching key that has a value.
+
+        With ``effective``, target rows show the resolved value and include keys
+        only set on the project.
+        """
+        rows: List[Row] = []
+        for owner, name in self.select(target, configuration):
+            keys = self.settings(owner, name).keys()
+            if effective and owner != PROJECT and (PROJECT, name) in self._configs:
+                keys = dict.fromkeys([*self.settings(PROJECT, name), *keys]).keys()
+            for setting in _matching(keys, key) if is_glob(key) else [key]:
+                value = self.effective(owner, name, setting) if effective else self.get(owner, name, setting)
+                if value is not None:
+                    rows.append((owner, name, setting, value))
+        return rows
+
+
+def _inherit(value: Value, parent: Optional[Value]) -> Value:
+    """Expand ``$(inherited)`` in ``value`` with ``parent`` (a string or a list)."""
+    if isinstance(value, list):
+        inherited = parent if isinstance(parent, list) else parent.split() if parent else []
+        expanded: List[str] = []
+        for item in value:
+            expanded.extend(inherited if item == INHERITED else [item])
+        return expanded
+    text = " ".join(parent) if isinstance(parent, list) else parent or ""
+    return " ".join(value.replace(INHERITED, text).split())
+
+
+def matching_keys(settings: Dict[str, Value], patterns: Iterable[str]) -> Set[str]:
+    """Keys of ``settings`` named by ``patterns`` (exact keys or globs)."""
+    keys = {key for pattern in patterns for key in (_matching(settings, pattern) if is_glob(pattern) else [pattern])}
+    return keys & settings.keys()
+
+
+def update_settings(
+    settings: Dict[str, Value], values: Dict[str, Value], unset: Iterable[str] = ()
+) -> Dict[str, Value]:
+    """``settings`` without the keys matching ``unset`` and with ``values`` set.
+
+    New keys go before the first existing key that sorts after them, so a
+    sorted dict (as Xcode writes it) stays sorted. Returns ``settings`` itself
+    when nothing changes.
+    """
+    drop = matching_keys(settings, unset)
+    new = {key: value for key, value in values.items() if key not in settings or key in drop}
+    if not drop and not new and all(settings[key] == value for key, value in values.items()):
+        return settings
+    updated: Dict[str, Value] = {}
+    pending = sorted(new)
+    for key, value in settings.items():
+        while pending and pending[0] < key:
+            added = pending.pop(0)
+            updated[added] = values[added]
+        if key in drop:
+            continue
+        updated[key] = values.get(key, value)
+    for added in pending:
+        updated[added] = values[added]
+    return updated
@@ -0,0 +1,65 @@
+"""Persisted (path, mtime, size) snapshots for cheap "did anything change?" checks."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .fileio import write_atomic
+
+Stat = List[int]
+
+
+def stat_entry(path: str) -> Optional[Stat]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class StatCache:
+    """A JSON file mapping paths to ``[mtime_ns, size]``, or ``None`` for a path that did not exist.
+
+    ``key`` describes whatever produced the snapshot (options, tool version);
+    a snapshot stored under a different key is never considered fresh.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path, key: str) -> None:
+        self.path = path
+        self.key = key
+
+    def load(self) -> Dict[str, Optional[Stat]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != self.VERSION or data.get("key") != self.key:
+            return {}
+        return data.get("entries", {})
+
+    def fresh(self) -> bool:
+        """True if every recorded path still has the recorded mtime and size (or is still absent)."""
+        entries = self.load()
+        if not entries:
+            return False
+        for path, recorded in entries.items():
+            if stat_entry(path) != recorded:
+                return False
+        return True
+
+    def store(self, entries: Dict[str, Optional[Stat]]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": self.VERSION, "key": self.key, "entries": entries}
+        write_atomic(self.path, json.dumps(payload, separators=(",", ":")))
+
+    def clear(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
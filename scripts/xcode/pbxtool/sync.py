@@ -0,0 +1,247 @@
+"""Keep project.pbxproj in step with the source folders on disk.
+
+``sync()`` walks the source roots (``FamilyTodo/``, ``FamilyTodoTests/``,
+``FamilyTodoUITests/``), diffs them against the file references reachable from
+the main group and adds what is missing (creating groups for new folders) in
+one transaction. New files are built by their folder's target unless their
+imports say they are test code (``pbxtool.imports``). References whose files are gone are reported, or removed with
+``prune=True``.
+
+A stat cache records the project file and every scanned directory. Adding,
+removing or renaming a file changes its directory's mtime, so when none of
+those stats changed a run returns without listing directories or parsing the
+project.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import posixpath
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from . import timings
+from .groups import resolve_dir
+from .objects import TEST_PRODUCT_TYPES, PBXFileElement, PBXFileReference, PBXGroup
+from .paths import PROJECT_NAME, cache_dir, find_repo_root, project_file
+from .statcache import Stat, StatCache, stat_entry
+
+if TYPE_CHECKING:
+    from .preview import Preview
+    from .project import Project
+    from .transaction import Transaction
+
+# Source root folder -> target that builds new files found under it.
+DEFAULT_ROOTS: Dict[str, str] = {
+    "FamilyTodo": "HousePulse",
+    "FamilyTodoTests": "FamilyTodoTests",
+    "FamilyTodoUITests": "FamilyTodoUITests",
+}
+SOURCE_EXTENSIONS = frozenset({".swift"})
+# Directories Xcode treats as a single file; never descend into them.
+BUNDLE_SUFFIXES = (".xcassets", ".xcdatamodeld", ".bundle", ".framework", ".xcframework", ".lproj")
+
+
+class SyncResult:
+    """What a sync found. A plain class: the cached no-op path should not pay for dataclasses."""
+
+    __slots__ = ("added", "stale", "removed", "cached", "preview")
+
+    def __init__(self, cached: bool = False) -> None:
+        self.added: List[str] = []
+        self.stale: List[str] = []
+        self.removed: List[str] = []
+        self.cached = cached
+        self.preview: Optional["Preview"] = None
+
+    def __repr__(self) -> str:
+        return f"SyncResult(added={self.added}, stale={self.stale}, removed={self.removed}, cached={self.cached})"
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+def roots_for(project_path: Path) -> Dict[str, str]:
+    """Source root folder -> target for the project at ``project_path``.
+
+    ``DEFAULT_ROOTS`` for this repo's project. For any other, the folders next
+    to the .xcodeproj named after a target, plus a folder named after the
+    project for its first target that is not a test bundle (Xcode's template
+    layout); the targets are read with ``ProjectReader``.
+    """
+    if project_path.parent.name == PROJECT_NAME:
+        return DEFAULT_ROOTS
+    from .parser import ParseError
+    from .reader import ProjectReader
+
+    try:
+        with ProjectReader(project_path) as reader:
+            targets = [(target.name, target.get("productType") or "") for target in reader.targets()]
+    except ParseError:
+        from .project import Project
+
+        targets = [(target.name, target.get("productType") or "") for target in Project.load(project_path).targets()]
+    source_root = project_path.parent.parent
+    roots = {name: name for name, _ in targets if (source_root / name).is_dir()}
+    stem = project_path.parent.stem
+    app = next((name for name, kind in targets if not kind.endswith(TEST_PRODUCT_TYPES)), None)
+    if app is not None and stem not in roots and (source_root / stem).is_dir():
+        roots[stem] = app
+    return roots
+
+
+@timings.timed("scan")
+def scan_tree(
+    source_root: Path, roots: Iterable[str], extensions: Set[str] = SOURCE_EXTENSIONS
+) -> Tuple[Set[str], Dict[str, Stat]]:
+    """Files under ``roots`` with a matching extension, plus the stats of every directory.
+
+    Paths are POSIX, relative to ``source_root``. Each directory is stat'ed before it
+    is listed, so a change during the scan invalidates the recorded stat.
+    """
+    files: Set[str] = set()
+    dirs: Dict[str, Stat] = {}
+    base = str(source_root)
+    stack = list(roots)
+    while stack:
+        rel = stack.pop()
+        path = os.path.join(base, rel)
+        entry = stat_entry(path)
+        if entry is None:
+            continue
+        dirs[path] = entry
+        with os.scandir(path) as it:
+            for item in it:
+                name = item.name
+                if name.startswith("."):
+                    continue
+                child = f"{rel}/{name}"
+                if item.is_dir(follow_symlinks=False) and not name.endswith(BUNDLE_SUFFIXES):
+                    stack.append(child)
+                elif os.path.splitext(name)[1] in extensions:
+                    files.add(child)
+    timings.count("files", len(files))
+    timings.count("dirs", len(dirs))
+    return files, dirs
+
+
+def _element_dir(element: PBXFileElement, parent_dir: Optional[str]) -> Optional[str]:
+    """Source-root-relative location of a group or file reference, if it has one."""
+    return resolve_dir(element.source_tree, element.path, parent_dir)
+
+
+@timings.timed("tree")
+def project_tree(project: "Project") -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Map source-root-relative paths to file reference IDs and directory paths to group IDs.
+
+    Groups are visited in children order, so when two groups resolve to the same folder
+    the first one listed wins.
+    """
+    files: Dict[str, str] = {}
+    groups: Dict[str, str] = {}
+    stack: List[Tuple[PBXGroup, Optional[str]]] = [(project.main_group, "")]
+    objects = project.objects
+    while stack:
+        group, group_dir = stack.pop()
+        if group_dir is not None:
+            groups.setdefault(group_dir, group.id)
+        children = []
+        for child_id in group.children:
+            child = objects.get(child_id)
+            if isinstance(child, PBXGroup):
+                children.append((child, _element_dir(child, group_dir)))
+            elif isinstance(child, PBXFileReference):
+                path = _element_dir(child, group_dir)
+                if path is not None:
+                    files.setdefault(path, child.id)
+        stack.extend(reversed(children))
+    return files, groups
+
+
+def _cache_for(project_path: Path, roots: Mapping[str, str], extensions: Set[str]) -> StatCache:
+    digest = hashlib.sha1(str(project_path.resolve()).encode()).hexdigest()[:12]
+    key = f"roots={sorted(roots.items())};ext={sorted(extensions)}"
+    return StatCache(cache_dir(project_path.parent.parent) / f"sync-{digest}.json", key)
+
+
+def sync(
+    project_path: Optional[Path] = None,
+    roots: Mapping[str, str] = DEFAULT_ROOTS,
+    extensions: Set[str] = SOURCE_EXTENSIONS,
+    prune: bool = False,
+    write: bool = True,
+    use_cache: bool = True,
+    preview: bool = False,
+) -> SyncResult:
+    """Add files present on disk but missing from the project (and prune stale ones).
+
+    With ``write=False`` nothing is written; the result still lists what would change.
+    ``preview=True`` also skips the write (and the stat cache) and sets
+    ``result.preview`` to the diff and plan of what would have been written.
+    """
+    if project_path is None:
+        project_path = project_file(find_repo_root())
+    source_root = project_path.parent.parent
+    cache = _cache_for(project_path, roots, extensions)
+    if use_cache and not preview:
+        with timings.phase("stat_cache"):
+            fresh = cache.fresh()
+        if fresh:
+            return SyncResult(cached=True)
+
+    from .project import Project
+
+    on_disk, dirs = scan_tree(source_root, roots, extensions)
+    project = Project.load(project_path)
+    listed, groups = project_tree(project)
+    in_roots = {
+        path: ref
+        for path, ref in listed.items()
+        if path.split("/", 1)[0] in roots and os.path.splitext(path)[1] in extensions
+    }
+
+    result = SyncResult()
+    result.added = sorted(on_disk.difference(in_roots))
+    result.stale = sorted(set(in_roots).difference(on_disk))
+
+    tx = project.transaction(deterministic=True)
+    if result.added:
+        from .imports import ImportScanner, assign_targets
+
+        targets = assign_targets(project, source_root, result.added, roots, ImportScanner(source_root, use_cache))
+    for path in result.added:
+        folder, name = posixpath.split(path)
+        group = ensure_group(tx, groups, folder)
+        tx.add_files([(name, group)], [targets[path]])
+    if prune and result.stale:
+        tx.remove_file_refs(in_roots[path] for path in result.stale)
+        result.removed = result.stale
+        result.stale = []
+
+    if preview:
+        result.preview = tx.preview()
+    elif write:
+        if result.changed:
+            tx.commit()
+        if not result.stale:
+            entries: Dict[str, Optional[Stat]] = dict(dirs)
+            # Roots that do not exist yet are recorded as absent: creating one invalidates the snapshot.
+            for root in roots:
+                entries.setdefault(os.path.join(str(source_root), root), None)
+            entries[str(project_path)] = stat_entry(str(project_path)) or [0, 0]
+            cache.store(entries)
+    return result
+
+
+def ensure_group(tx: "Transaction", groups: Dict[str, str], folder: str) -> str:
+    """Group for ``folder``, queueing creation of any missing intermediate groups."""
+    group = groups.get(folder)
+    if group is not None:
+        return group
+    parent_dir, name = posixpath.split(folder)
+    parent = ensure_group(tx, groups, parent_dir)
+    group = tx.create_group(name, parent=parent)
+    groups[folder] = group
+    return group
@@ -0,0 +1,281 @@
+"""Synthetic project.pbxproj files for benchmarks.
+
+``generate(10_000)`` writes the text of a project with that many file
+references spread over a group tree ``depth`` levels deep, several targets
+(each with Sources, Frameworks and Resources phases and Debug/Release
+configurations), some files built by more than one target and a share of
+resources. The text is produced directly from templates in Xcode's own
+formatting, not through ``Project``, so the code being measured does not also
+produce its input. The same ``seed`` always gives the same bytes.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+SOURCE_NAMES = ("View", "Store", "Model", "Service", "Manager", "Cell", "Row", "Client", "Cache", "Router")
+FOLDER_NAMES = ("Features", "Core", "Shared", "Screens", "Components", "Data", "Domain", "Support")
+FILES_PER_GROUP = 20
+
+
+@dataclass
+class SynthProject:
+    text: str
+    # Root folder -> target building it, in the shape ``sync()`` takes.
+    roots: Dict[str, str]
+    # Source-root-relative path of every file reference.
+    files: List[str] = field(default_factory=list)
+    groups: List[str] = field(default_factory=list)
+
+
+class _Ids:
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+        self.seen: set = set()
+
+    def __call__(self) -> str:
+        while True:
+            object_id = "%024X" % self.rng.getrandbits(96)
+            if object_id not in self.seen:
+                self.seen.add(object_id)
+                return object_id
+
+
+def _group(object_id: str, name: str, children: Iterable[Tuple[str, str]], path: bool = True) -> str:
+    lines = [f"\t\t{object_id} /* {name} */ = {{", "\t\t\tisa = PBXGroup;", "\t\t\tchildren = ("]
+    lines.extend(f"\t\t\t\t{child} /* {comment} */," for child, comment in children)
+    lines.append("\t\t\t);")
+    lines.append(f"\t\t\t{'path' if path else 'name'} = {name};")
+    lines.append('\t\t\tsourceTree = "<group>";')
+    lines.append("\t\t};")
+    return "\n".join(lines)
+
+
+def _phase(object_id: str, isa: str, name: str, files: Iterable[Tuple[str, str]]) -> str:
+    lines = [
+        f"\t\t{object_id} /* {name} */ = {{",
+        f"\t\t\tisa = {isa};",
+        "\t\t\tbuildActionMask = 2147483647;",
+        "\t\t\tfiles = (",
+    ]
+    lines.extend(f"\t\t\t\t{build_file} /* {comment} in {name} */," for build_file, comment in files)
+    lines.append("\t\t\t);")
+    lines.append("\t\t\trunOnlyForDeploymentPostprocessing = 0;")
+    lines.append("\t\t};")
+    return "\n".join(lines)
+
+
+def _configuration(object_id: str, name: str, settings: Dict[str, str]) -> str:
+    lines = [f"\t\t{object_id} /* {name} */ = {{", "\t\t\tisa = XCBuildConfiguration;", "\t\t\tbuildSettings = {"]
+    lines.extend(f"\t\t\t\t{key} = {value};" for key, value in sorted(settings.items()))
+    lines.append("\t\t\t};")
+    lines.append(f"\t\t\tname = {name};")
+    lines.append("\t\t};")
+    return "\n".join(lines)
+
+
+def _configuration_list(object_id: str, owner: str, configs: List[str]) -> str:
+    return "\n".join(
+        [
+            f"\t\t{object_id} /* Build configuration list for {owner} */ = {{",
+            "\t\t\tisa = XCConfigurationList;",
+            "\t\t\tbuildConfigurations = (",
+            f"\t\t\t\t{configs[0]} /* Debug */,",
+            f"\t\t\t\t{configs[1]} /* Release */,",
+            "\t\t\t);",
+            "\t\t\tdefaultConfigurationIsVisible = 0;",
+            "\t\t\tdefaultConfigurationName = Release;",
+            "\t\t};",
+        ]
+    )
+
+
+def _folders(count: int, depth: int, root: str, rng: random.Random) -> List[Tuple[int, str]]:
+    """``count`` folders under ``root`` as ``(parent index, path)``, nested up to ``depth`` levels.
+
+    Index 0 is ``root`` itself (parent -1). The fanout is chosen so the tree
+    actually reaches ``depth`` levels.
+    """
+    fanout = max(2, round(count ** (1 / max(depth, 1)) + 0.5))
+    folders = [(-1, root)]
+    for index in range(1, count):
+        parent = (index - 1) // fanout
+        name = f"{rng.choice(FOLDER_NAMES)}{index}"
+        folders.append((parent, f"{folders[parent][1]}/{name}"))
+    return folders
+
+
+def generate(files: int, targets: int = 3, depth: int = 6, seed: int = 0) -> SynthProject:
+    """Project text with ``files`` file references; see the module docstring."""
+    rng = random.Random(seed)
+    new_id = _Ids(rng)
+    names = ["App", "AppTests"] + [f"Extension{i}" for i in range(1, max(targets, 1) - 1)]
+    names = names[: max(targets, 1)]
+    # The app holds most files; tests and extensions share the rest.
+    shares = [0.7] + [0.3 / (len(names) - 1)] * (len(names) - 1) if len(names) > 1 else [1.0]
+
+    build_files: List[str] = []
+    file_refs: List[str] = []
+    groups: List[str] = []
+    # Target -> phase name -> (build file ID, file name).
+    phases: Dict[str, Dict[str, List[Tuple[str, str]]]] = {
+        name: {"Sources": [], "Resources": [], "Frameworks": []} for name in names
+    }
+    target_ids = {name: new_id() for name in names}
+    result = SynthProject("", {name: name for name in names})
+    root_groups: List[Tuple[str, str]] = []
+
+    counter = 0
+    for index, target in enumerate(names):
+        count = max(1, int(files * shares[index])) if index else files - sum(int(files * s) for s in shares[1:])
+        folders = _folders(max(1, count // FILES_PER_GROUP), depth, target, rng)
+        folder_ids = [new_id() for _ in folders]
+        children: List[List[Tuple[str, str]]] = [[] for _ in folders]
+        for folder, (parent, path) in enumerate(folders):
+            if parent >= 0:
+                children[parent].append((folder_ids[folder], path.rsplit("/", 1)[1]))
+        for n in range(count):
+            folder = n % len(folders)
+            counter += 1
+            resource = n % 20 == 19
+            name = f"{rng.choice(SOURCE_NAMES)}{counter}." + ("json" if resource else "swift")
+            file_type = "text.json" if resource else "sourcecode.swift"
+            ref = new_id()
+            file_refs.append(
+                f"\t\t{ref} /* {name} */ = {{isa = PBXFileReference; lastKnownFileType = {file_type}; "
+                f'path = {name}; sourceTree = "<group>"; }};'
+            )
+            children[folder].append((ref, name))
+            result.files.append(f"{folders[folder][1]}/{name}")
+            # Every tenth app source is also built by the last extension.
+            members = [target]
+            if index == 0 and not resource and n % 10 == 0 and len(names) > 2:
+                members.append(names[-1])
+            for member in members:
+                phase = "Resources" if resource else "Sources"
+                build_file = new_id()
+                build_files.append(
+                    f"\t\t{build_file} /* {name} in {phase} */ = "
+                    f"{{isa = PBXBuildFile; fileRef = {ref} /* {name} */; }};"
+                )
+                phases[member][phase].append((build_file, name))
+        for folder, (parent, path) in enumerate(folders):
+            groups.append(_group(folder_ids[folder], path.rsplit("/", 1)[-1], children[folder]))
+            result.groups.append(path)
+        root_groups.append((folder_ids[0], target))
+
+    products_id, main_id, project_id, project_list = new_id(), new_id(), new_id(), new_id()
+    product_refs: List[Tuple[str, str]] = []
+    native_targets: List[str] = []
+    phase_objects: Dict[str, List[str]] = {"Sources": [], "Resources": [], "Frameworks": []}
+    isas = {
+        "Sources": "PBXSourcesBuildPhase",
+        "Resources": "PBXResourcesBuildPhase",
+        "Frameworks": "PBXFrameworksBuildPhase",
+    }
+    configurations: List[str] = []
+    configuration_lists: List[str] = []
+    settings = {"PRODUCT_NAME": '"$(TARGET_NAME)"', "SWIFT_VERSION": "5.9", "IPHONEOS_DEPLOYMENT_TARGET": "17.0"}
+
+    for target in names:
+        if target == "App":
+            product = f"{target}.app"
+        else:
+            product = f"{target}.xctest" if target.endswith("Tests") else f"{target}.appex"
+        product_ref = new_id()
+        product_refs.append((product_ref, product))
+        file_refs.append(
+            f"\t\t{product_ref} /* {product} */ = {{isa = PBXFileReference; explicitFileType = wrapper.application; "
+            f"includeInIndex = 0; path = {product}; sourceTree = BUILT_PRODUCTS_DIR; }};"
+        )
+        phase_ids = []
+        for phase in ("Sources", "Frameworks", "Resources"):
+            phase_id = new_id()
+            phase_ids.append((phase_id, phase))
+            phase_objects[phase].append(_phase(phase_id, isas[phase], phase, phases[target][phase]))
+        configs = [new_id(), new_id()]
+        configurations.extend(_configuration(c, n, dict(settings)) for c, n in zip(configs, ("Debug", "Release")))
+        list_id = new_id()
+        configuration_lists.append(_configuration_list(list_id, f'PBXNativeTarget "{target}"', configs))
+        native_targets.append(
+            "\n".join(
+                [
+                    f"\t\t{target_ids[target]} /* {target} */ = {{",
+                    "\t\t\tisa = PBXNativeTarget;",
+                    f"\t\t\tbuildConfigurationList = {list_id} "
+                    f'/* Build configuration list for PBXNativeTarget "{target}" */;',
+                    "\t\t\tbuildPhases = (",
+                    *(f"\t\t\t\t{phase_id} /* {phase} */," for phase_id, phase in phase_ids),
+                    "\t\t\t);",
+                    "\t\t\tbuildRules = (",
+                    "\t\t\t);",
+                    "\t\t\tdependencies = (",
+                    "\t\t\t);",
+                    f"\t\t\tname = {target};",
+                    f"\t\t\tproductName = {target};",
+                    f"\t\t\tproductReference = {product_ref} /* {product} */;",
+                    '\t\t\tproductType = "com.apple.product-type.application";',
+                    "\t\t};",
+                ]
+            )
+        )
+
+    project_configs = [new_id(), new_id()]
+    for config, name in zip(project_configs, ("Debug", "Release")):
+        configurations.append(_configuration(config, name, {"SWIFT_VERSION": "5.9"}))
+    configuration_lists.insert(0, _configuration_list(project_list, 'PBXProject "Synth"', project_configs))
+    groups.append(_group(products_id, "Products", product_refs, path=False))
+    groups.append(_group(main_id, '""', root_groups + [(products_id, "Products")], path=False))
+    project = "\n".join(
+        [
+            f"\t\t{project_id} /* Project object */ = {{",
+            "\t\t\tisa = PBXProject;",
+            f'\t\t\tbuildConfigurationList = {project_list} /* Build configuration list for PBXProject "Synth" */;',
+            '\t\t\tcompatibilityVersion = "Xcode 15.0";',
+            f"\t\t\tmainGroup = {main_id};",
+            f"\t\t\tproductRefGroup = {products_id} /* Products */;",
+            '\t\t\tprojectDirPath = "";',
+            '\t\t\tprojectRoot = "";',
+            "\t\t\ttargets = (",
+            *(f"\t\t\t\t{target_ids[target]} /* {target} */," for target in names),
+            "\t\t\t);",
+            "\t\t};",
+        ]
+    )
+
+    sections = [
+        ("PBXBuildFile", build_files),
+        ("PBXFileReference", file_refs),
+        ("PBXFrameworksBuildPhase", phase_objects["Frameworks"]),
+        ("PBXGroup", groups),
+        ("PBXNativeTarget", native_targets),
+        ("PBXProject", [project]),
+        ("PBXResourcesBuildPhase", phase_objects["Resources"]),
+        ("PBXSourcesBuildPhase", phase_objects["Sources"]),
+        ("XCBuildConfiguration", configurations),
+        ("XCConfigurationList", configuration_lists),
+    ]
+    parts = ["// !$*UTF8*$!\n{\n\tarchiveVersion = 1;\n\tclasses = {\n\t};\n\tobjectVersion = 56;\n\tobjects = {\n"]
+    for isa, objects in sections:
+        parts.append(f"\n/* Begin {isa} section */\n")
+        parts.append("\n".join(objects))
+        parts.append(f"\n/* End {isa} section */\n")
+    parts.append(f"\t}};\n\trootObject = {project_id} /* Project object */;\n}}\n")
+    result.text = "".join(parts)
+    return result
+
+
+def write_tree(source_root: Path, paths: Iterable[str]) -> None:
+    """Create an empty file for each source-root-relative path (and its folders)."""
+    made = set()
+    for path in paths:
+        folder = os.path.dirname(path)
+        if folder not in made:
+            os.makedirs(os.path.join(source_root, folder), exist_ok=True)
+            made.add(folder)
+        with open(os.path.join(source_root, path), "w"):
+            pass
@@ -0,0 +1,234 @@
+"""Per-phase timings for pbxtool runs.
+
+The expensive steps (reading and parsing the project, building indexes,
+scanning folders, applying a transaction, serializing, diffing, writing)
+run inside ``phase("name")`` or are decorated with ``timed("name")``.
+Nothing is recorded unless a ``Recorder`` is active: then each phase adds
+up its wall and CPU time, the calls made and whatever the code under it
+passed to ``count()`` (bytes read and written, objects, files), and with
+``memory=True`` the ``tracemalloc`` peak while it ran. Phases nest; a phase's numbers include
+those of the phases inside it, and its name is the path to it
+(``"load/parse"``).
+
+While no recorder is active ``phase()`` returns a shared no-op context
+manager, ``timed`` functions call straight through and ``count()`` returns
+at once: one global lookup per call, and the calls sit around whole steps,
+never inside per-object loops.
+
+``session()`` runs a block under a recorder and writes the report as one
+JSON document: to stderr, or appended as a line to a file so CI can keep a
+history. The command line turns it on with ``--timings`` or
+``$PBXTOOL_TIMINGS`` (see ``pbxtool.cli``). Tracing allocations slows
+Python down several times, so memory is only traced on request and times
+from such a run are not comparable with the others. ``session(profile=)``
+also dumps ``cProfile`` stats for ``pstats`` or snakeviz.
+"""
+
+from __future__ import annotations
+
+import functools
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_NULL = nullcontext()
+_active: Optional["Recorder"] = None
+
+
+class Phase:
+    """Totals for one phase path over all of its calls."""
+
+    __slots__ = ("name", "calls", "wall", "cpu", "peak", "counts")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak: Optional[int] = None
+        self.counts: Dict[str, int] = {}
+
+    def as_dict(self) -> Dict[str, Any]:
+        entry: Dict[str, Any] = {
+            "name": self.name,
+            "calls": self.calls,
+            "wall": round(self.wall, 6),
+            "cpu": round(self.cpu, 6),
+        }
+        if self.peak is not None:
+            entry["peak"] = self.peak
+        entry.update(self.counts)
+        return entry
+
+
+class _Span:
+    """One running phase."""
+
+    __slots__ = ("recorder", "phase", "wall", "cpu", "peak")
+
+    def __init__(self, recorder: "Recorder", phase: Phase) -> None:
+        self.recorder = recorder
+        self.phase = phase
+        self.peak = 0
+
+    def __enter__(self) -> "_Span":
+        recorder = self.recorder
+        if recorder.memory:
+            # Peaks nest: fold the peak so far into the enclosing span, then
+            # measure this one from the current size.
+            import tracemalloc
+
+            recorder.stack[-1].peak = max(recorder.stack[-1].peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        recorder.stack.append(self)
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        phase = self.phase
+        phase.wall += time.perf_counter() - self.wall
+        phase.cpu += time.process_time() - self.cpu
+        phase.calls += 1
+        recorder = self.recorder
+        recorder.stack.pop()
+        if recorder.memory:
+            import tracemalloc
+
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            phase.peak = max(phase.peak or 0, self.peak)
+            recorder.stack[-1].peak = max(recorder.stack[-1].peak, self.peak)
+
+
+class Recorder:
+    """Collects phases while active (see the module docstring)."""
+
+    def __init__(self, memory: bool = False) -> None:
+        self.memory = memory
+        self.phases: Dict[str, Phase] = {}
+        self.total = Phase("total")
+        self.stack: List[_Span] = [_Span(self, self.total)]
+
+    def phase(self, name: str) -> _Span:
+        parent = self.stack[-1].phase
+        path = name if parent is self.total else f"{parent.name}/{name}"
+        phase = self.phases.get(path)
+        if phase is None:
+            phase = self.phases[path] = Phase(path)
+        return _Span(self, phase)
+
+    def count(self, key: str, n: int) -> None:
+        for span in self.stack:
+            counts = span.phase.counts
+            counts[key] = counts.get(key, 0) + n
+
+    def start(self) -> None:
+        global _active
+        if self.memory:
+            import tracemalloc
+
+            tracemalloc.start()
+        root = self.stack[0]
+        root.wall = time.perf_counter()
+        root.cpu = time.process_time()
+        _active = self
+
+    def stop(self) -> None:
+        global _active
+        _active = None
+        root = self.stack[0]
+        self.total.wall += time.perf_counter() - root.wall
+        self.total.cpu += time.process_time() - root.cpu
+        self.total.calls += 1
+        if self.memory:
+            import tracemalloc
+
+            self.total.peak = max(root.peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    def report(self, **extra: Any) -> Dict[str, Any]:
+        """JSON-ready totals: ``extra`` fields, the whole run, then each phase in the order first entered."""
+        total = self.total.as_dict()
+        del total["name"], total["calls"]
+        return {**extra, **total, "phases": [phase.as_dict() for phase in self.phases.values()]}
+
+
+def phase(name: str) -> ContextManager[Any]:
+    """Time the block as phase ``name`` when a recorder is active; otherwise a no-op."""
+    recorder = _active
+    if recorder is None:
+        return _NULL
+    return recorder.phase(name)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator: each call of the function is phase ``name``."""
+
+    def decorate(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            recorder = _active
+            if recorder is None:
+                return func(*args, **kwargs)
+            with recorder.phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def count(key: str, n: int = 1) -> None:
+    """Add ``n`` to counter ``key`` of the running phases (and the total), if recording."""
+    if _active is not None:
+        _active.count(key, n)
+
+
+def active() -> bool:
+    return _active is not None
+
+
+@contextmanager
+def session(
+    output: Optional[str] = "-", memory: bool = False, profile: Optional[str] = None, **extra: Any
+) -> Iterator[Dict[str, Any]]:
+    """Record the block and write the report to ``output`` (``"-"``: stderr; a path: one appended line).
+
+    With ``output=None`` only the ``cProfile`` dump (``profile``) is made.
+    The yielded dict is added to the report, e.g. for an exit status. Inside
+    another session nothing new is recorded; the outer one covers the block.
+    """
+    recorder = Recorder(memory) if output is not None and _active is None else None
+    profiler = None
+    if profile is not None:
+        import cProfile
+
+        profiler = cProfile.Profile()
+    fields: Dict[str, Any] = dict(extra)
+    if recorder is not None:
+        recorder.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield fields
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile)
+        if recorder is not None:
+            recorder.stop()
+            write_report(recorder.report(time=time.time(), **fields), output)  # type: ignore[arg-type]
+
+
+def write_report(report: Dict[str, Any], output: str) -> None:
+    import json  # only runs that record pay for it
+
+    line = json.dumps(report, separators=(",", ":"))
+    if output == "-":
+        print(line, file=sys.stderr)
+        return
+    with open(output, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
@@ -0,0 +1,730 @@
+"""Batched edits to a parsed project.
+
+A ``Transaction`` only records operations. ``commit()`` applies all of them to
+the in-memory graph (each one is an O(1) index/list update), serializes the
+project once and replaces the file with a single atomic write, so adding 500
+files costs one read and one write regardless of how many operations queue up.
+
+New objects, group children and Sources/Resources files go where
+``pbxtool.canonical`` puts them when the rest of their section or list is in
+canonical order, so edits to a formatted project leave it formatted.
+
+Adds are idempotent: before queueing, the transaction checks (through
+membership indexes built on first use) whether the group already has that
+file or subgroup and whether the phase already builds that file, and reuses
+what is there. If the serialized bytes end up identical to the file on disk,
+``commit()`` does not write at all, so Xcode sees no change. ``preview()``
+applies the operations without writing and returns a ``pbxtool.preview.Preview``
+(unified diff and change plan).
+
+Concurrent writers to one project are optimistic. ``commit()`` serializes
+without holding anything, then takes the project's ``FileLock`` just to
+compare the file's hash with the one it was loaded from and rename the new
+text into place. If another writer got there first, the lock is dropped, the
+file is parsed again and the operations are replayed on that graph through
+the same idempotent methods (IDs of objects they created are remapped), and
+the write is retried; after ``REBASE_ATTEMPTS`` the lock is kept through the
+final replay so a writer cannot keep losing. Operations on objects the other
+writer removed raise ``WriteConflict`` and nothing is written.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from . import timings
+from .fileio import FileLock, WriteConflict, content_digest, write_if_changed
+from .filetypes import build_phase_for, file_type_for
+from .groups import GroupTree
+from .ids import IdAllocator
+from .objects import PBXBuildFile, PBXBuildPhase, PBXFileElement, PBXFileReference, PBXGroup, PBXObject
+from .project import Project
+
+if TYPE_CHECKING:
+    from .preview import Preview
+    from .settings import BuildSettings, Value
+
+ObjectRef = Union[str, PBXObject]
+
+# Exit status for scripts that modified the project; 0 means it was already
+# up to date (1 and 2 are taken by uncaught errors and usage errors).
+EXIT_CHANGED = 3
+
+# Replays done without holding the lock before ``commit()`` holds it through one.
+REBASE_ATTEMPTS = 3
+
+
+def _id(ref: ObjectRef) -> str:
+    return ref.id if isinstance(ref, PBXObject) else ref
+
+
+class Operation:
+    """A queued edit; ``apply`` performs it on a project graph."""
+
+    def apply(self, project: Project) -> None:
+        raise NotImplementedError
+
+
+@dataclass
+class AddFileRef(Operation):
+    id: str
+    path: str
+    name: Optional[str] = None
+    file_type: Optional[str] = None
+    source_tree: str = "<group>"
+
+    def apply(self, project: Project) -> None:
+        fields: Dict[str, object] = {
+            "isa": "PBXFileReference",
+            "lastKnownFileType": self.file_type or file_type_for(self.path),
+        }
+        if self.name:
+            fields["name"] = self.name
+        fields["path"] = self.path
+        fields["sourceTree"] = self.source_tree
+        ref = PBXFileReference(self.id, fields)
+        ref.comment = ref.display_name
+        project.add_object(ref)
+
+
+@dataclass
+class AddBuildFile(Operation):
+    id: str
+    file_ref: str
+    phase: Optional[str] = None
+    settings: Optional[Dict[str, object]] = None
+
+    def apply(self, project: Project) -> None:
+        fields: Dict[str, object] = {"isa": "PBXBuildFile", "fileRef": self.file_ref}
+        if self.settings:
+            fields["settings"] = self.settings
+        comment = project[self.file_ref].display_name
+        if self.phase is not None:
+            comment = f"{comment} in {project[self.phase].display_name}"
+        project.add_object(PBXBuildFile(self.id, fields, comment))
+
+
+@dataclass
+class AddToGroup(Operation):
+    group: str
+    child: str
+
+    def apply(self, project: Project) -> None:
+        project[self.group].append("children", self.child)
+        project.link(self.group, "children", self.child)
+
+
+@dataclass
+class AddToBuildPhase(Operation):
+    phase: str
+    build_file: str
+
+    def apply(self, project: Project) -> None:
+        project[self.phase].append("files", self.build_file)
+        project.link(self.phase, "files", self.build_file)
+
+
+@dataclass
+class CreateGroup(Operation):
+    id: str
+    name: Optional[str] = None
+    path: Optional[str] = None
+    source_tree: str = "<group>"
+
+    def apply(self, project: Project) -> None:
+        fields: Dict[str, object] = {"isa": "PBXGroup", "children": []}
+        if self.name and self.name != self.path:
+            fields["name"] = self.name
+        if self.path:
+            fields["path"] = self.path
+        fields["sourceTree"] = self.source_tree
+        group = PBXGroup(self.id, fields)
+        group.comment = group.display_name
+        project.add_object(group)
+
+
+@dataclass
+class RemoveFileRefs(Operation):
+    """Remove file references along with their build files and memberships.
+
+    With the project's reference index built (by a move earlier in the
+    transaction, or a long-lived graph), only the groups and phases that list
+    them are visited. Otherwise one pass over the objects handles the whole
+    set, which is cheaper than building the index for this alone.
+    """
+
+    ids: Set[str]
+
+    def apply(self, project: Project) -> None:
+        doomed = {i for i in self.ids if i in project.objects}
+        if not project.has_references:
+            build_files = {obj.id for obj in project.iter_isa("PBXBuildFile") if obj.get("fileRef") in doomed}
+            for obj in project.objects.values():
+                if isinstance(obj, PBXGroup):
+                    obj.discard_all("children", doomed)
+                elif isinstance(obj, PBXBuildPhase) and build_files:
+                    obj.discard_all("files", build_files)
+            for object_id in doomed | build_files:
+                project.remove_object(object_id)
+            return
+        refs = project.references()
+        build_files = {build_file for ref in doomed for build_file in refs.referrers(ref, "fileRef")}
+        gone = doomed | build_files
+        # (container, list key) -> the IDs to take out of that list.
+        lists: Dict[Tuple[str, str], Set[str]] = {}
+        for object_id in gone:
+            for referrer, key in refs.references(object_id):
+                if referrer not in gone:
+                    lists.setdefault((referrer, key), set()).add(object_id)
+        for (referrer, key), ids in lists.items():
+            container = project.get(referrer)
+            if container is not None and isinstance(container.get(key), list):
+                container.discard_all(key, ids)
+                for object_id in ids:
+                    project.unlink(referrer, key, object_id)
+        for object_id in gone:
+            project.remove_object(object_id)
+
+
+@dataclass
+class MoveFileRef(Operation):
+    """Re-home a file reference under ``group`` with a new ``path``/``name``.
+
+    Build file comments ("Old.swift in Sources") follow the new name, and the
+    phases listing them are re-rendered so their comments do too. Only objects
+    that refer to the file reference are visited.
+    """
+
+    id: str
+    group: str
+    path: str
+    name: Optional[str] = None
+
+    def apply(self, project: Project) -> None:
+        refs = project.references()
+        ref = project[self.id]
+        old_name = ref.display_name
+        for group_id in refs.referrers(self.id, "children"):
+            if group_id != self.group:
+                project[group_id].discard("children", self.id)
+                project.unlink(group_id, "children", self.id)
+        ref.set("path", self.path)
+        if self.name:
+            ref.set("name", self.name)
+        else:
+            ref.unset("name")
+        ref.comment = ref.display_name
+        group = project[self.group]
+        if self.id not in group.get("children", ()):
+            group.append("children", self.id)
+            project.link(self.group, "children", self.id)
+        if ref.display_name == old_name:
+            return
+        for build_file_id in refs.referrers(self.id, "fileRef"):
+            build_file = project[build_file_id]
+            if build_file.comment:
+                build_file.comment = ref.display_name + build_file.comment[len(old_name) :]
+                build_file.touch()
+                for phase_id in refs.referrers(build_file_id, "files"):
+                    project[phase_id].touch()
+
+
+@dataclass
+class SetBuildSettings(Operation):
+    """Unset the keys matching ``unset`` (globs) and set ``values`` in one configuration's ``buildSettings``."""
+
+    config: str
+    values: Dict[str, "Value"] = field(default_factory=dict)
+    unset: List[str] = field(default_factory=list)
+
+    def apply(self, project: Project) -> None:
+        from .settings import update_settings
+
+        config = project[self.config]
+        settings = config.get("buildSettings", {})
+        updated = update_settings(settings, self.values, self.unset)
+        if updated is not settings:
+            config.set("buildSettings", updated)
+
+
+@dataclass
+class Transaction:
+    """Queue of operations applied to ``project`` in one pass on ``commit()``.
+
+    Methods that create objects return the new object ID straight away, so
+    later operations in the same transaction can refer to it.
+
+    With ``deterministic=True`` new IDs are derived from what is being added
+    (group path and file name for file references and groups, target and file
+    reference for build files) instead of being random.
+    """
+
+    project: Project
+    deterministic: bool = False
+    operations: List[Operation] = field(default_factory=list)
+    ids: IdAllocator = field(init=False, repr=False)
+    # Set by ``commit()``: whether the file on disk was rewritten, and how
+    # many times the operations were replayed onto another writer's version.
+    changed: bool = field(default=False, init=False)
+    rebases: int = field(default=0, init=False)
+    # Operations applied but not yet written, to replay if the file changed.
+    _applied: List[Operation] = field(default_factory=list, init=False, repr=False)
+    _groups: Optional[GroupTree] = field(default=None, init=False, repr=False)
+    _settings: Optional["BuildSettings"] = field(default=None, init=False, repr=False)
+    # Membership indexes, covering queued operations as well as the project:
+    # group -> (path -> file reference, path -> subgroup), container -> member
+    # IDs, and build phase -> file reference -> build file.
+    _group_index: Dict[str, Tuple[Dict[str, str], Dict[str, str]]] = field(default_factory=dict, init=False, repr=False)
+    _members: Dict[str, Set[str]] = field(default_factory=dict, init=False, repr=False)
+    _phase_index: Dict[str, Dict[str, str]] = field(default_factory=dict, init=False, repr=False)
+    _removed: Set[str] = field(default_factory=set, init=False, repr=False)
+    _target_phases: Dict[Tuple[str, str], str] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.ids = IdAllocator(self.project.objects)
+
+    def __enter__(self) -> "Transaction":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+
+    def new_id(self, *key: str) -> str:
+        """Random ID, or one derived from ``key`` in deterministic mode."""
+        if self.deterministic and key:
+            return self.ids.derive(*key)
+        return self.ids.allocate()
+
+    @property
+    def groups(self) -> GroupTree:
+        """The project's group trie, including groups this transaction creates."""
+        if self._groups is None:
+            self._groups = self.project.group_tree()
+        return self._groups
+
+    @property
+    def build_settings(self) -> "BuildSettings":
+        """The project's build configurations by ``(target, configuration)``, built on first use."""
+        if self._settings is None:
+            self._settings = self.project.build_settings()
+        return self._settings
+
+    def group_path(self, group: Optional[ObjectRef]) -> str:
+        """Display-name path of ``group``; only needed (and computed) for deterministic IDs."""
+        if group is None or not self.deterministic:
+            return ""
+        path = self.groups.path_of(_id(group))
+        return _id(group) if path is None else path
+
+    def _container(self, object_id: str, key: str) -> List[str]:
+        obj = self.project.get(object_id)
+        return [i for i in obj.get(key, ()) if i not in self._removed] if obj is not None else []
+
+    def _group_entries(self, group: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """``(path -> file reference, path -> subgroup)`` for the children of ``group``."""
+        index = self._group_index.get(group)
+        if index is None:
+            files: Dict[str, str] = {}
+            groups: Dict[str, str] = {}
+            for child_id in self._container(group, "children"):
+                child = self.project.get(child_id)
+                if isinstance(child, PBXFileElement):
+                    key = child.path or child.name
+                    if key:
+                        (groups if isinstance(child, PBXGroup) else files).setdefault(key, child_id)
+            index = self._group_index[group] = (files, groups)
+        return index
+
+    def _member_set(self, container: str, key: str) -> Set[str]:
+        members = self._members.get(container)
+        if members is None:
+            members = self._members[container] = set(self._container(container, key))
+        return members
+
+    def _phase_entries(self, phase: str) -> Dict[str, str]:
+        """File reference -> build file for the build files of ``phase``."""
+        index = self._phase_index.get(phase)
+        if index is None:
+            index = {}
+            for build_file_id in self._container(phase, "files"):
+                build_file = self.project.get(build_file_id)
+                if isinstance(build_file, PBXBuildFile) and build_file.file_ref:
+                    index.setdefault(build_file.file_ref, build_file_id)
+            self._phase_index[phase] = index
+        return index
+
+    def _target_name(self, phase: str) -> str:
+        for target in self.project.targets():
+            if phase in target.build_phases:
+                return target.name
+        return phase
+
+    # Primitive operations -------------------------------------------------
+
+    def add_file_ref(
+        self,
+        path: str,
+        name: Optional[str] = None,
+        file_type: Optional[str] = None,
+        source_tree: str = "<group>",
+        group: Optional[ObjectRef] = None,
+    ) -> str:
+        """Create a PBXFileReference; with ``group``, also add it to that group.
+
+        If ``group`` already has a file at ``path``, that reference is returned
+        and nothing is queued.
+        """
+        if group is not None:
+            existing = self._group_entries(_id(group))[0].get(path)
+            if existing is not None:
+                return existing
+        key = ("PBXFileReference", self.group_path(group), path)
+        op = AddFileRef(self.new_id(*key), path, name, file_type, source_tree)
+        self.operations.append(op)
+        if group is not None:
+            self._group_entries(_id(group))[0][path] = op.id
+            self.add_to_group(group, op.id)
+        return op.id
+
+    def add_build_file(
+        self,
+        file_ref: ObjectRef,
+        phase: Optional[ObjectRef] = None,
+        settings: Optional[Dict[str, object]] = None,
+    ) -> str:
+        """Create a PBXBuildFile; with ``phase``, also add it to that build phase.
+
+        If ``phase`` already builds ``file_ref``, that build file is returned
+        and nothing is queued.
+        """
+        phase_id = _id(phase) if phase is not None else None
+        if phase_id is not None:
+            existing = self._phase_entries(phase_id).get(_id(file_ref))
+            if existing is not None:
+                return existing
+        target = self._target_name(phase_id) if self.deterministic and phase_id else ""
+        object_id = self.new_id("PBXBuildFile", target, _id(file_ref))
+        op = AddBuildFile(object_id, _id(file_ref), phase_id, settings)
+        self.operations.append(op)
+        if phase_id is not None:
+            self._phase_entries(phase_id)[op.file_ref] = op.id
+            self.add_to_build_phase(phase_id, op.id)
+        return op.id
+
+    def add_to_group(self, group: ObjectRef, child: ObjectRef) -> None:
+        """Append ``child`` to the group's children unless it is already there."""
+        members = self._member_set(_id(group), "children")
+        if _id(child) not in members:
+            members.add(_id(child))
+            self.operations.append(AddToGroup(_id(group), _id(child)))
+
+    def add_to_build_phase(self, phase: ObjectRef, build_file: ObjectRef) -> None:
+        """Append ``build_file`` to the phase's files unless it is already there."""
+        members = self._member_set(_id(phase), "files")
+        if _id(build_file) not in members:
+            members.add(_id(build_file))
+            self.operations.append(AddToBuildPhase(_id(phase), _id(build_file)))
+
+    def create_group(
+        self,
+        name: str,
+        parent: Optional[ObjectRef] = None,
+        path: Optional[str] = None,
+        source_tree: str = "<group>",
+    ) -> str:
+        """Create a PBXGroup (``path`` defaults to ``name``) under ``parent``.
+
+        If ``parent`` already has that subgroup, its ID is returned instead.
+        """
+        if parent is not None:
+            existing = self._group_entries(_id(parent))[1].get(name if path is None else path)
+            if existing is not None:
+                return existing
+        parent_path = self.group_path(parent)
+        group_path = f"{parent_path}/{name}" if parent_path else name
+        op = CreateGroup(self.new_id("PBXGroup", group_path), name, name if path is None else path, source_tree)
+        self.operations.append(op)
+        groups = self.groups
+        groups.add(groups.nodes.get(_id(parent)) if parent is not None else None, op.id, name, op.path, source_tree)
+        if parent is not None:
+            self._group_entries(_id(parent))[1][op.path or name] = op.id
+            self.add_to_group(parent, op.id)
+        return op.id
+
+    def ensure_group_path(self, path: str) -> str:
+        """Group at display path ``path`` ("FamilyTodo/Stores/Sync"), creating any missing groups on the way."""
+        node = self.groups.root
+        for component in filter(None, path.split("/")):
+            child = node.children.get(component)
+            node = child if child is not None else self.groups.nodes[self.create_group(component, parent=node.id)]
+        return node.id
+
+    def remove_file_refs(self, refs: Iterable[ObjectRef]) -> None:
+        """Remove file references, their build files and group/phase memberships."""
+        op = RemoveFileRefs({_id(ref) for ref in refs})
+        self.operations.append(op)
+        # Keep the membership indexes in step with the queued removal.
+        self._removed.update(op.ids)
+        for files, _ in self._group_index.values():
+            for key in [k for k, v in files.items() if v in op.ids]:
+                del files[key]
+        for index in self._phase_index.values():
+            for ref in op.ids.intersection(index):
+                self._removed.add(index.pop(ref))
+        for members in self._members.values():
+            members.difference_update(self._removed)
+
+    def move_file_ref(self, ref: ObjectRef, group: ObjectRef, path: str, name: Optional[str] = None) -> None:
+        """Move a file reference to ``group``, now at ``path`` relative to it."""
+        op = MoveFileRef(_id(ref), _id(group), path, name)
+        self.operations.append(op)
+        for files, _ in self._group_index.values():
+            for key in [k for k, v in files.items() if v == op.id]:
+                del files[key]
+        for members in self._members.values():
+            members.discard(op.id)
+        self._group_entries(op.group)[0][path] = op.id
+        self._member_set(op.group, "children").add(op.id)
+
+    def rename_file_ref(self, ref: ObjectRef, path: str, name: Optional[str] = None) -> None:
+        """Give a file reference a new ``path`` relative to the group it is in."""
+        groups = self.project.references().referrers(_id(ref), "children")
+        if not groups:
+            raise KeyError(f"file reference {_id(ref)} is in no group")
+        self.move_file_ref(ref, groups[0], path, name)
+
+    # Convenience ------------------------------------------------------------
+
+    def add_file(
+        self,
+        path: str,
+        group: ObjectRef,
+        phase: Optional[ObjectRef] = None,
+        file_type: Optional[str] = None,
+    ) -> str:
+        """Add ``path`` (relative to ``group``) to the group and, optionally, a build phase.
+
+        Returns the new file reference ID.
+        """
+        name = PurePosixPath(path).name
+        ref = self.add_file_ref(path, name if name != path else None, file_type, group=group)
+        if phase is not None:
+            self.add_build_file(ref, phase)
+        return ref
+
+    def target_phase(self, target: str, isa: str) -> str:
+        """ID of the ``isa`` build phase of the target called ``target`` (looked up once per transaction)."""
+        key = (target, isa)
+        phase = self._target_phases.get(key)
+        if phase is None:
+            phase = self._target_phases[key] = self.project.build_phase(target, isa).id
+        return phase
+
+    def add_files(self, files: Iterable[Tuple[str, ObjectRef]], targets: Iterable[str] = ()) -> List[str]:
+        """Add ``(path, group)`` pairs and build each file in every one of ``targets``.
+
+        The phase follows the file type (``build_phase_for``): sources go into each
+        target's Sources phase, resources into its Resources phase, and files no phase
+        builds are only added to their group. Returns the file reference IDs.
+        """
+        targets = list(targets)
+        refs = []
+        for path, group in files:
+            ref = self.add_file(path, group)
+            refs.append(ref)
+            isa = build_phase_for(path)
+            if isa is not None:
+                for target in targets:
+                    self.add_build_file(ref, self.target_phase(target, isa))
+        return refs
+
+    # Build settings -----------------------------------------------------------
+
+    def set_build_settings(
+        self, values: Dict[str, "Value"], target: str = "*", configuration: str = "*"
+    ) -> List[Tuple[str, str]]:
+        """Set ``values`` in every configuration matching the ``target`` and ``configuration`` globs.
+
+        Returns the ``(target, configuration)`` pairs matched; see ``pbxtool.settings``.
+        """
+        return self._edit_build_settings(self._select(target, configuration), values, [])
+
+    def unset_build_settings(
+        self, keys: Iterable[str], target: str = "*", configuration: str = "*"
+    ) -> List[Tuple[str, str]]:
+        """Remove the keys matching ``keys`` (globs) from every matching configuration that has one.
+
+        Returns the ``(target, configuration)`` pairs that had a key to remove;
+        ``KeyError`` if none had.
+        """
+        from .settings import matching_keys
+
+        keys = list(keys)
+        settings = self.build_settings
+        matched = [
+            pair for pair in self._select(target, configuration) if matching_keys(settings.settings(*pair), keys)
+        ]
+        if not matched:
+            names = ", ".join(keys)
+            raise KeyError(f"no configuration matching target {target!r}, configuration {configuration!r} sets {names}")
+        return self._edit_build_settings(matched, {}, keys)
+
+    def _select(self, target: str, configuration: str) -> List[Tuple[str, str]]:
+        matched = self.build_settings.select(target, configuration)
+        if not matched:
+            raise KeyError(f"no build configuration matches target {target!r}, configuration {configuration!r}")
+        return matched
+
+    def _edit_build_settings(
+        self, matched: List[Tuple[str, str]], values: Dict[str, "Value"], unset: List[str]
+    ) -> List[Tuple[str, str]]:
+        for owner, name in matched:
+            self.operations.append(SetBuildSettings(self.build_settings.config_id(owner, name), dict(values), unset))
+        return matched
+
+    # Commit ---------------------------------------------------------------------
+
+    @timings.timed("apply")
+    def apply(self) -> None:
+        """Apply queued operations to the in-memory project without writing."""
+        from .canonical import place
+
+        timings.count("operations", len(self.operations))
+        project = self.project
+        added: List[str] = []
+        lists: Dict[str, Set[str]] = {}
+        for op in self.operations:
+            op.apply(project)
+            if isinstance(op, (AddFileRef, AddBuildFile, CreateGroup)):
+                added.append(op.id)
+            elif isinstance(op, AddToGroup):
+                lists.setdefault(op.group, set()).add(op.child)
+            elif isinstance(op, AddToBuildPhase):
+                lists.setdefault(op.phase, set()).add(op.build_file)
+            elif isinstance(op, MoveFileRef):
+                # A new name moves the file in its group and its build files in their phases.
+                lists.setdefault(op.group, set()).add(op.id)
+                refs = project.references()
+                for build_file in refs.referrers(op.id, "fileRef"):
+                    for phase in refs.referrers(build_file, "files"):
+                        lists.setdefault(phase, set()).add(build_file)
+        if added or lists:
+            place(project, added, lists)
+        self._applied += self.operations
+        self.operations = []
+
+    def preview(self, path: Union[str, Path, None] = None) -> "Preview":
+        """Apply queued operations and describe what ``commit()`` would write, without writing.
+
+        The project is serialized once; ``Preview.write()`` writes that text if wanted.
+        """
+        from .preview import Snapshot
+
+        snapshot = Snapshot(self.project)
+        self.apply()
+        return snapshot.preview(Path(path) if path is not None else None)
+
+    def commit(self, path: Union[str, Path, None] = None) -> bool:
+        """Apply queued operations and write the project with one atomic write.
+
+        The write is skipped (leaving the file and its mtime alone) when the
+        result is byte-identical to what is on disk. Returns whether the file
+        changed. If another writer changed the file since it was loaded, the
+        operations are rebased onto its version (see the module docstring);
+        ``project`` then holds that graph, and IDs returned earlier for objects
+        the other writer had already added refer to the ones it added.
+        """
+        target = Path(path) if path is not None else self.project.path
+        if target is None:
+            raise ValueError("project has no path to save to")
+        lock = FileLock(target)
+        try:
+            while True:
+                self.apply()
+                data = self.project.serialize().encode("utf-8")
+                base = self.project.digest if target == self.project.path else None
+                lock.acquire()
+                try:
+                    self.changed = write_if_changed(target, data, base)
+                except WriteConflict as conflict:
+                    self.rebases += 1
+                    timings.count("rebases")
+                    if self.rebases <= REBASE_ATTEMPTS:
+                        lock.release()
+                    self._rebase(conflict.data)
+                    continue
+                if base is not None:
+                    self.project.digest = content_digest(data)
+                self._applied = []
+                return self.changed
+        finally:
+            lock.release()
+
+    @timings.timed("rebase")
+    def _rebase(self, data: bytes) -> None:
+        """Reload the project from ``data`` (another writer's version) and queue the applied operations again."""
+        operations = self._applied
+        fresh = Project.parse(data.decode("utf-8"))
+        fresh.path = self.project.path
+        fresh.digest = content_digest(data)
+        self.project.replace(fresh)
+        self.operations = []
+        self._applied = []
+        self.ids = IdAllocator(self.project.objects)
+        self._groups = None
+        self._settings = None
+        self._group_index = {}
+        self._members = {}
+        self._phase_index = {}
+        self._removed = set()
+        self._target_phases = {}
+        self._replay(operations, data)
+
+    def _replay(self, operations: List[Operation], data: bytes) -> None:
+        parents = {op.child: op.group for op in operations if isinstance(op, AddToGroup)}
+        remapped: Dict[str, str] = {}
+        created: Set[str] = set()
+
+        def live(object_id: str) -> str:
+            object_id = remapped.get(object_id, object_id)
+            if object_id not in self.project.objects and object_id not in created:
+                removed = f"changed on disk: another writer removed {object_id}"
+                raise WriteConflict(self.project.path or "project", data, removed)
+            return object_id
+
+        def parent_of(object_id: str) -> Optional[str]:
+            parent = parents.get(object_id)
+            return live(parent) if parent is not None else None
+
+        def add(old: str, new: str) -> None:
+            remapped[old] = new
+            if new not in self.project.objects:
+                created.add(new)
+
+        for op in operations:
+            if isinstance(op, AddFileRef):
+                add(op.id, self.add_file_ref(op.path, op.name, op.file_type, op.source_tree, parent_of(op.id)))
+            elif isinstance(op, CreateGroup):
+                add(op.id, self.create_group(op.name or op.path or "", parent_of(op.id), op.path, op.source_tree))
+            elif isinstance(op, AddBuildFile):
+                phase = live(op.phase) if op.phase is not None else None
+                add(op.id, self.add_build_file(live(op.file_ref), phase, op.settings))
+            elif isinstance(op, AddToGroup):
+                self.add_to_group(live(op.group), live(op.child))
+            elif isinstance(op, AddToBuildPhase):
+                self.add_to_build_phase(live(op.phase), live(op.build_file))
+            elif isinstance(op, RemoveFileRefs):
+                # Files the other writer removed as well are simply gone.
+                ids = {remapped.get(i, i) for i in op.ids}
+                ids = {i for i in ids if i in self.project.objects or i in created}
+                if ids:
+                    self.remove_file_refs(ids)
+            elif isinstance(op, MoveFileRef):
+                self.move_file_ref(live(op.id), live(op.group), op.path, op.name)
+            elif isinstance(op, SetBuildSettings):
+                self.operations.append(SetBuildSettings(live(op.config), op.values, op.unset))
+            else:
+                self.operations.append(op)
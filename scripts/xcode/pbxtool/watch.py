@@ -0,0 +1,395 @@
+"""``pbxtool watch``: keep the project in step with the source folders as they change.
+
+The project is parsed once and kept in memory. File system events under the
+source roots (inotify on Linux, directory polling elsewhere) are collected
+into a ``Changes`` batch until nothing new has arrived for ``debounce``
+seconds (or ``max_wait`` has passed since the first event), then applied in
+one transaction: a code generator dropping 1,000 files costs one project
+write. Creating and deleting a file inside one window cancels out, and a
+rename seen as a move event keeps the file reference (and its target
+membership) instead of removing and re-adding it.
+
+If something else rewrote project.pbxproj in the meantime (git checkout,
+Xcode), it is reloaded before the batch is applied. A batch that fails (a
+conflicting edit, a malformed project, a file gone before it was read) is
+logged and dropped, the project is reloaded, and watching goes on.
+"""
+
+from __future__ import annotations
+
+import os
+import posixpath
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Set, Tuple
+
+from .imports import assign_targets
+from .project import Project
+from .statcache import Stat, stat_entry
+from .sync import BUNDLE_SUFFIXES, DEFAULT_ROOTS, SOURCE_EXTENSIONS, ensure_group, project_tree, scan_tree
+
+
+class Changes:
+    """Source-root-relative paths seen changing since the last batch."""
+
+    __slots__ = ("created", "deleted", "moved", "rescan", "_cookies")
+
+    def __init__(self) -> None:
+        self.created: Set[str] = set()
+        self.deleted: Set[str] = set()
+        # Old path -> new path, for renames reported as one move.
+        self.moved: Dict[str, str] = {}
+        # Directories whose whole subtree must be compared again.
+        self.rescan: Set[str] = set()
+        self._cookies: Dict[int, str] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.created or self.deleted or self.moved or self.rescan or self._cookies)
+
+    def __len__(self) -> int:
+        return len(self.created) + len(self.deleted) + len(self.moved) + len(self.rescan) + len(self._cookies)
+
+    def move_from(self, cookie: int, path: str) -> None:
+        self._cookies[cookie] = path
+
+    def move_to(self, cookie: int, path: str) -> None:
+        old = self._cookies.pop(cookie, None)
+        if old is None:
+            self.created.add(path)
+        else:
+            self.moved[old] = path
+
+    def close(self) -> None:
+        """Moves whose other half never arrived left the watched tree: deletions."""
+        self.deleted.update(self._cookies.values())
+        self._cookies.clear()
+
+
+class WatchResult:
+    __slots__ = ("added", "removed", "moved", "written")
+
+    def __init__(self) -> None:
+        self.added: List[str] = []
+        self.removed: List[str] = []
+        self.moved: List[Tuple[str, str]] = []
+        self.written = False
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.moved)
+
+
+def _wanted(name: str, extensions: Set[str]) -> bool:
+    return not name.startswith(".") and os.path.splitext(name)[1] in extensions
+
+
+# Watchers ------------------------------------------------------------------
+
+
+class PollingWatcher:
+    """Stats every watched directory each ``interval``; a changed mtime means
+    its entries changed, and only that directory is listed again."""
+
+    def __init__(self, source_root: Path, roots: List[str], extensions: Set[str], interval: float = 1.0) -> None:
+        self.source_root = str(source_root)
+        self.roots = roots
+        self.extensions = extensions
+        self.interval = interval
+        self.stats: Dict[str, Stat] = {}
+        self.listings: Dict[str, Set[str]] = {}
+        for root in roots:
+            self._add(root)
+
+    def _list(self, rel: str) -> Optional[Set[str]]:
+        try:
+            with os.scandir(os.path.join(self.source_root, rel)) as it:
+                return {entry.name + ("/" if entry.is_dir(follow_symlinks=False) else "") for entry in it}
+        except OSError:
+            return None
+
+    def _add(self, rel: str) -> None:
+        entry = stat_entry(os.path.join(self.source_root, rel))
+        listing = self._list(rel) if entry is not None else None
+        if listing is None:
+            return
+        self.stats[rel] = entry  # type: ignore[assignment]
+        self.listings[rel] = listing
+        for name in listing:
+            if name.endswith("/") and not name.startswith(".") and not name[:-1].endswith(BUNDLE_SUFFIXES):
+                self._add(f"{rel}/{name[:-1]}")
+
+    def _drop(self, rel: str) -> None:
+        for path in [p for p in self.stats if p == rel or p.startswith(rel + "/")]:
+            del self.stats[path]
+            del self.listings[path]
+
+    def read(self, timeout: Optional[float], changes: Changes) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            found = self._poll(changes)
+            if found:
+                return True
+            remaining = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if remaining <= 0:
+                return False
+            time.sleep(remaining)
+
+    def _poll(self, changes: Changes) -> bool:
+        found = False
+        for rel in list(self.stats):
+            if rel not in self.stats:
+                continue  # dropped with its parent during this pass
+            entry = stat_entry(os.path.join(self.source_root, rel))
+            if entry == self.stats[rel]:
+                continue
+            found = True
+            old = self.listings[rel]
+            if entry is None:
+                self._drop(rel)
+                changes.rescan.add(rel)
+                continue
+            new = self._list(rel) or set()
+            self.stats[rel], self.listings[rel] = entry, new
+            for name in new - old:
+                if name.endswith("/"):
+                    self._add(f"{rel}/{name[:-1]}")
+                    changes.rescan.add(f"{rel}/{name[:-1]}")
+                elif _wanted(name, self.extensions):
+                    changes.created.add(f"{rel}/{name}")
+            for name in old - new:
+                if name.endswith("/"):
+                    self._drop(f"{rel}/{name[:-1]}")
+                    changes.rescan.add(f"{rel}/{name[:-1]}")
+                elif _wanted(name, self.extensions):
+                    changes.deleted.add(f"{rel}/{name}")
+        return found
+
+    def close(self) -> None:
+        pass
+
+
+# <sys/inotify.h>
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """One inotify watch per directory, through libc via ctypes (Linux only)."""
+
+    def __init__(self, source_root: Path, roots: List[str], extensions: Set[str]) -> None:
+        import ctypes
+        import ctypes.util
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.source_root = str(source_root)
+        self.roots = roots
+        self.extensions = extensions
+        self.paths: Dict[int, str] = {}
+        for root in roots:
+            self._add_tree(root)
+
+    def _add_tree(self, rel: str) -> None:
+        stack = [rel]
+        while stack:
+            rel = stack.pop()
+            path = os.path.join(self.source_root, rel)
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+            if wd < 0:
+                continue  # gone already, or not a directory
+            self.paths[wd] = rel
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        name = entry.name
+                        if entry.is_dir(follow_symlinks=False) and not name.startswith("."):
+                            if not name.endswith(BUNDLE_SUFFIXES):
+                                stack.append(f"{rel}/{name}")
+            except OSError:
+                continue
+
+    def _reset(self) -> None:
+        for wd in list(self.paths):
+            self.libc.inotify_rm_watch(self.fd, wd)
+        self.paths.clear()
+        for root in self.roots:
+            self._add_tree(root)
+
+    def read(self, timeout: Optional[float], changes: Changes) -> bool:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return False
+        reset = False
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                changes.rescan.update(self.roots)
+                reset = True
+                continue
+            if mask & IN_IGNORED:
+                self.paths.pop(wd, None)
+                continue
+            parent = self.paths.get(wd)
+            if parent is None or mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                continue
+            rel = f"{parent}/{name}"
+            if mask & IN_ISDIR:
+                if name.startswith(".") or name.endswith(BUNDLE_SUFFIXES):
+                    continue
+                changes.rescan.add(rel)
+                if mask & IN_CREATE:
+                    self._add_tree(rel)
+                elif mask & (IN_MOVED_FROM | IN_MOVED_TO):
+                    reset = True  # watches below a moved directory still carry its old path
+                continue
+            if not _wanted(name, self.extensions):
+                continue
+            if mask & IN_CREATE:
+                changes.created.add(rel)
+            elif mask & IN_DELETE:
+                changes.deleted.add(rel)
+            elif mask & IN_MOVED_FROM:
+                changes.move_from(cookie, rel)
+            elif mask & IN_MOVED_TO:
+                changes.move_to(cookie, rel)
+        if reset:
+            self._reset()
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def make_watcher(source_root: Path, roots: List[str], extensions: Set[str], poll: bool = False, interval: float = 1.0):
+    """inotify where available, polling otherwise (or with ``poll=True``)."""
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(source_root, roots, extensions)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(source_root, roots, extensions, interval)
+
+
+# Applying a batch ------------------------------------------------------------
+
+
+def apply_changes(
+    project: Project, changes: Changes, source_root: Path, roots: Mapping[str, str], extensions: Set[str]
+) -> WatchResult:
+    """Bring ``project`` in line with ``changes`` in one transaction.
+
+    Every path is checked against the disk when the batch is applied, so
+    short-lived files and repeated events for one file are harmless.
+    """
+    result = WatchResult()
+    base = str(source_root)
+    files, groups = project_tree(project)
+    on_disk = {path for path in changes.created if os.path.isfile(os.path.join(base, path))}
+    gone = {path for path in changes.deleted if not os.path.lexists(os.path.join(base, path))}
+    moves: List[Tuple[str, str]] = []
+    for old, new in changes.moved.items():
+        if old in files and new not in files and os.path.isfile(os.path.join(base, new)):
+            moves.append((old, new))
+        else:
+            gone.add(old)
+            on_disk.add(new)
+    for rel in changes.rescan:
+        found, _ = scan_tree(source_root, [rel], extensions)
+        on_disk.update(found)
+        prefix = rel + "/"
+        gone.update(path for path in files if path.startswith(prefix) and path not in found)
+
+    def in_roots(path: str) -> bool:
+        return path.split("/", 1)[0] in roots and os.path.splitext(path)[1] in extensions
+
+    tx = project.transaction(deterministic=True)
+    for old, new in sorted(moves):
+        folder, name = posixpath.split(new)
+        tx.move_file_ref(files[old], ensure_group(tx, groups, folder), name)
+        result.moved.append((old, new))
+    result.removed = sorted(path for path in gone if path in files and in_roots(path))
+    if result.removed:
+        tx.remove_file_refs(files[path] for path in result.removed)
+    result.added = sorted(path for path in on_disk if path not in files and in_roots(path))
+    targets = assign_targets(project, source_root, result.added, roots) if result.added else {}
+    for path in result.added:
+        folder, name = posixpath.split(path)
+        tx.add_files([(name, ensure_group(tx, groups, folder))], [targets[path]])
+    if result:
+        result.written = tx.commit()
+    return result
+
+
+def watch(
+    project_path: Path,
+    roots: Mapping[str, str] = DEFAULT_ROOTS,
+    extensions: Set[str] = SOURCE_EXTENSIONS,
+    debounce: float = 0.3,
+    max_wait: float = 5.0,
+    poll: bool = False,
+    interval: float = 1.0,
+    on_batch: Optional[Callable[[WatchResult], None]] = None,
+    batches: Optional[int] = None,
+) -> None:
+    """Apply source folder changes to ``project_path`` until interrupted (or ``batches`` batches)."""
+    source_root = project_path.parent.parent
+    watcher = make_watcher(source_root, list(roots), extensions, poll, interval)
+    project = Project.load(project_path)
+    loaded = stat_entry(str(project_path))
+    changes = Changes()
+    try:
+        while batches is None or batches > 0:
+            if not watcher.read(1.0, changes) and not changes:
+                continue
+            first = time.monotonic()
+            while time.monotonic() - first < max_wait and watcher.read(debounce, changes):
+                pass
+            changes.close()
+            try:
+                if stat_entry(str(project_path)) != loaded:
+                    project = Project.load(project_path)  # rewritten by someone else
+                    loaded = stat_entry(str(project_path))
+            except (OSError, ValueError) as error:
+                # Mid-checkout or mid-merge: keep the batch for the next round.
+                print(f"⚠️  cannot load {project_path}: {error}", file=sys.stderr)
+                continue
+            try:
+                result: Optional[WatchResult] = apply_changes(project, changes, source_root, roots, extensions)
+                loaded = stat_entry(str(project_path))
+            except Exception as error:  # one bad batch must not end the daemon
+                print(
+                    f"⚠️  {len(changes)} change(s) not applied: {type(error).__name__}: {error} "
+                    "(`pbxtool sync` catches up)",
+                    file=sys.stderr,
+                )
+                result = None
+                loaded = None  # the graph may be half-edited: reload it before the next batch
+            changes = Changes()
+            if batches is not None:
+                batches -= 1
+            if on_batch is not None and result is not None:
+                on_batch(result)
+    finally:
+        watcher.close()
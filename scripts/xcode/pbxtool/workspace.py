@@ -0,0 +1,125 @@
+"""Run pbxtool commands over every project under a directory.
+
+``discover()`` walks a tree once with ``os.scandir`` and returns each
+``*.xcodeproj/project.pbxproj`` it finds, without descending into project
+bundles, hidden directories or build output. ``run()`` then executes one
+pbxtool command per project (``cli.main([... "--project", path])``, exactly
+what ``scripts/pbxtool --project path ...`` would do) on a process pool and
+collects each project's exit status and output.
+
+Projects share nothing, so the work scales with the number of cores until the
+disk becomes the limit. The largest files are submitted first, which keeps a
+big project from starting last and holding up the whole run. Workers are
+forked once and import pbxtool once, not per project.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Directory names never searched for projects: VCS metadata, build output and
+# dependency checkouts (which carry their own projects).
+SKIP_DIRS = frozenset({"build", "Build", "DerivedData", "Pods", "Carthage", "node_modules", "vendor"})
+
+
+def discover(root: Path) -> List[Path]:
+    """``project.pbxproj`` files under ``root``, sorted by path."""
+    found: List[Path] = []
+    stack = [str(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                name = entry.name
+                if name.startswith(".") or name in SKIP_DIRS or not entry.is_dir(follow_symlinks=False):
+                    continue
+                if name.endswith(".xcodeproj"):
+                    pbxproj = os.path.join(entry.path, "project.pbxproj")
+                    if os.path.isfile(pbxproj):
+                        found.append(Path(pbxproj))
+                elif not name.endswith((".xcworkspace", ".xcassets", ".bundle", ".framework", ".xcframework")):
+                    stack.append(entry.path)
+    return sorted(found)
+
+
+class ProjectResult:
+    """Outcome of one command on one project."""
+
+    __slots__ = ("project", "status", "output", "seconds")
+
+    def __init__(self, project: Path, status: int, output: str, seconds: float) -> None:
+        self.project = project
+        self.status = status
+        self.output = output
+        self.seconds = seconds
+
+    def __repr__(self) -> str:
+        return f"ProjectResult({self.project}, status={self.status}, {self.seconds:.2f}s)"
+
+    def as_dict(self) -> Dict[str, object]:
+        return {"project": str(self.project), "status": self.status, "output": self.output, "seconds": self.seconds}
+
+
+def run_one(job: Tuple[str, Sequence[str]]) -> ProjectResult:
+    """Run ``pbxtool --project PATH ARGS...`` in this process, capturing its output."""
+    from .cli import main
+
+    path, argv = job
+    out = io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(out), redirect_stderr(out):
+        try:
+            status = main(["--project", path, *argv])
+        except Exception as error:  # keep going: one broken project must not sink the run
+            print(f"pbxtool: {type(error).__name__}: {error}")
+            status = 1
+        except SystemExit as stop:  # argparse usage errors
+            status = stop.code if isinstance(stop.code, int) else 1
+    return ProjectResult(Path(path), status, out.getvalue(), time.perf_counter() - start)
+
+
+def run(projects: Iterable[Path], argv: Sequence[str], jobs: Optional[int] = None) -> List[ProjectResult]:
+    """Run the pbxtool command ``argv`` on every project; results in the order of ``projects``.
+
+    ``jobs`` worker processes (default: one per CPU); a single project or
+    ``jobs=1`` runs in this process.
+    """
+    paths = [str(path) for path in projects]
+    workers = min(jobs or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        return [run_one((path, argv)) for path in paths]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    def size(path: str) -> int:
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return 0
+
+    # Biggest first, so the longest job does not start last.
+    order = sorted(range(len(paths)), key=lambda i: size(paths[i]), reverse=True)
+    results: List[Optional[ProjectResult]] = [None] * len(paths)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_one, (paths[i], tuple(argv))): i for i in order}
+        for future, i in futures.items():
+            results[i] = future.result()
+    return results  # type: ignore[return-value]
+
+
+def overall_status(results: Iterable[ProjectResult]) -> int:
+    """1 if any project failed, else ``EXIT_CHANGED`` if any changed, else 0."""
+    from .transaction import EXIT_CHANGED
+
+    statuses = {result.status for result in results}
+    if statuses - {0, EXIT_CHANGED}:
+        return 1
+    return EXIT_CHANGED if EXIT_CHANGED in statuses else 0
@@ -0,0 +1,308 @@
+"""Tests for pbxtool against a scratch copy of FamilyTodo.xcodeproj.
+
+    python3 -m pytest scripts/xcode
+"""
+
+import json
+import shutil
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from pbxtool import Project, WriteConflict
+from pbxtool.canonical import canonicalize
+from pbxtool.check import check
+from pbxtool.cli import main
+from pbxtool.export import export_sqlite
+from pbxtool.merge import merge_text
+from pbxtool.sync import DEFAULT_ROOTS, project_tree, sync
+from pbxtool.transaction import EXIT_CHANGED
+
+REPO = Path(__file__).resolve().parents[2]
+PROJECT = REPO / "FamilyTodo.xcodeproj" / "project.pbxproj"
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """A copy of the project and its source folders; returns the copied project.pbxproj."""
+    monkeypatch.setenv("PBXTOOL_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.chdir(tmp_path)  # relative CLI paths resolve against the cwd before the source root
+    for name in ("FamilyTodo.xcodeproj", *DEFAULT_ROOTS):
+        if (REPO / name).exists():
+            shutil.copytree(REPO / name, tmp_path / name)
+    return tmp_path / "FamilyTodo.xcodeproj" / "project.pbxproj"
+
+
+def pbxtool(project_path, *argv):
+    return main(["--project", str(project_path), *argv])
+
+
+def edited(project_path, base, edit):
+    """``base`` with ``edit(transaction, project)`` applied, as text; leaves ``project_path`` holding ``base``."""
+    project_path.write_text(base, encoding="utf-8")
+    project = Project.load(project_path)
+    tx = project.transaction()
+    edit(tx, project)
+    tx.commit()
+    text = project_path.read_text(encoding="utf-8")
+    project_path.write_text(base, encoding="utf-8")
+    return text
+
+
+def add_view(name):
+    def edit(tx, project):
+        tx.add_file(name, tx.ensure_group_path("FamilyTodo/Views"), project.build_phase("HousePulse"))
+
+    return edit
+
+
+def set_ldflags(*flags):
+    def edit(tx, project):
+        tx.set_build_settings({"OTHER_LDFLAGS": list(flags)}, "HousePulse", "Debug")
+
+    return edit
+
+
+def new_file(project_path, rel, text="import Foundation\n"):
+    path = project_path.parent.parent / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return rel
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_round_trip_is_byte_exact(lazy):
+    project = Project.load(PROJECT, lazy=lazy, cache=False)
+    assert project.serialize().encode("utf-8") == PROJECT.read_bytes()
+
+
+def test_sync_cache_notices_a_new_root(repo):
+    source_root = repo.parent.parent
+    shutil.rmtree(source_root / "FamilyTodoUITests", ignore_errors=True)
+    sync(repo, prune=True)
+    assert sync(repo).cached
+    new_file(repo, "FamilyTodoUITests/LaterUITests.swift", "import XCTest\nlet app = XCUIApplication()\n")
+    result = sync(repo)
+    assert not result.cached
+    assert result.added == ["FamilyTodoUITests/LaterUITests.swift"]
+
+
+def test_merge_keeps_both_sides_additions_to_one_group_and_phase(repo):
+    base = repo.read_text(encoding="utf-8")
+    ours = edited(repo, base, add_view("Ours.swift"))
+    theirs = edited(repo, base, add_view("Theirs.swift"))
+    result = merge_text(base, ours, theirs)
+    assert result.clean
+    merged = result.project
+    names = [merged[i].get("path") for i in merged.group_for_path("FamilyTodo/Views").children]
+    assert "Ours.swift" in names and "Theirs.swift" in names
+    files = [merged[merged[i].get("fileRef")].get("path") for i in merged.build_phase("HousePulse").files]
+    assert "Ours.swift" in files and "Theirs.swift" in files
+    assert not check(merged)
+
+
+@pytest.mark.parametrize(
+    "base_flags, ours_flags, theirs_flags",
+    [
+        (["-framework", "Foo"], ["-framework", "Foo", "-framework", "Baz"], ["-framework", "Foo", "-framework", "Bar"]),
+        (["-ObjC", "-lz"], ["-ObjC"], ["-ObjC", "-lz", "-lz"]),
+    ],
+)
+def test_merge_reports_flag_lists_changed_on_both_sides(repo, base_flags, ours_flags, theirs_flags):
+    base = edited(repo, repo.read_text(encoding="utf-8"), set_ldflags(*base_flags))
+    ours = edited(repo, base, set_ldflags(*ours_flags))
+    theirs = edited(repo, base, set_ldflags(*theirs_flags))
+    result = merge_text(base, ours, theirs)
+    assert [conflict.key for conflict in result.conflicts] == ["buildSettings.OTHER_LDFLAGS"]
+
+
+def test_merge_driver_leaves_conflict_markers(repo, tmp_path):
+    base = edited(repo, repo.read_text(encoding="utf-8"), set_ldflags("-ObjC"))
+    versions = {
+        "base": base,
+        "ours": edited(repo, base, set_ldflags("-ObjC", "-lz")),
+        "theirs": edited(repo, base, set_ldflags("-lc++")),
+    }
+    for name, text in versions.items():
+        (tmp_path / name).write_text(text, encoding="utf-8")
+    driver = Path(__file__).with_name("merge_pbxproj.py")
+    args = [sys.executable, str(driver), *(str(tmp_path / name) for name in ("base", "ours", "theirs"))]
+    assert subprocess.run(args, capture_output=True).returncode == 1
+    assert "<<<<<<< ours" in (tmp_path / "ours").read_text(encoding="utf-8")
+
+
+def test_round_trip_from_parse_cache(repo):
+    first = Project.load(repo)
+    cached = Project.load(repo)  # rebuilt from the cache entry the first load stored
+    assert cached.serialize() == first.serialize() == repo.read_text(encoding="utf-8")
+    assert cached.digest == first.digest
+
+
+def test_add_is_idempotent_and_remove_restores_the_file(repo):
+    original = repo.read_bytes()
+    project = Project.load(repo)
+    tx = project.transaction()
+    views = tx.ensure_group_path("FamilyTodo/Views")
+    ref = tx.add_file("Added.swift", views, project.build_phase("HousePulse"))
+    assert tx.commit()
+
+    again = Project.load(repo).transaction()
+    assert again.add_file("Added.swift", again.ensure_group_path("FamilyTodo/Views")) == ref
+    assert not again.operations
+    assert not again.commit()
+
+    removal = Project.load(repo).transaction()
+    removal.remove_file_refs([ref])
+    assert removal.commit()
+    assert repo.read_bytes() == original
+
+
+def test_unknown_names_are_user_errors(repo, capsys):
+    original = repo.read_bytes()
+    new_file(repo, "FamilyTodo/Views/Orphan.swift")
+    assert pbxtool(repo, "add", "FamilyTodo/Views/Orphan.swift", "--target", "NoSuchTarget") == 1
+    assert pbxtool(repo, "settings", "set", "SWIFT_VERSION=6.0", "--target", "NoSuchTarget") == 1
+    assert "no target named 'NoSuchTarget'" in capsys.readouterr().err
+    assert repo.read_bytes() == original
+
+
+def test_sync_then_check_agree_on_test_code_under_the_app(repo):
+    new_file(repo, "FamilyTodo/Views/HelperTests.swift", "import XCTest\n@testable import HousePulse\n")
+    sync(repo)
+    problems = check(Project.load(repo), repo.parent.parent, DEFAULT_ROOTS)
+    assert not [problem for problem in problems if problem.kind == "misplaced"]
+
+
+def test_move_moves_the_file_on_disk(repo):
+    source_root = repo.parent.parent
+    assert pbxtool(repo, "move", "FamilyTodo/Views/SignInView.swift", "FamilyTodo/Stores/") == EXIT_CHANGED
+    assert not (source_root / "FamilyTodo/Views/SignInView.swift").exists()
+    assert (source_root / "FamilyTodo/Stores/SignInView.swift").exists()
+    files, _ = project_tree(Project.load(repo))
+    assert "FamilyTodo/Stores/SignInView.swift" in files
+    assert not [problem for problem in check(Project.load(repo), source_root) if problem.kind == "missing"]
+
+
+def test_removed_files_stay_out_after_sync(repo):
+    source_root = repo.parent.parent
+    assert pbxtool(repo, "remove", "FamilyTodo/Views/SignInView.swift") == EXIT_CHANGED
+    assert not (source_root / "FamilyTodo/Views/SignInView.swift").exists()
+    sync(repo)
+    assert "FamilyTodo/Views/SignInView.swift" not in project_tree(Project.load(repo))[0]
+
+    assert pbxtool(repo, "remove", "--no-disk", "FamilyTodo/Stores/AreaStore.swift") == EXIT_CHANGED
+    assert (source_root / "FamilyTodo/Stores/AreaStore.swift").exists()
+
+
+def test_format_check_passes_after_add_move_and_sync(repo):
+    assert pbxtool(repo, "format") in (0, EXIT_CHANGED)
+    new_file(repo, "FamilyTodo/Views/Aaa.swift")
+    new_file(repo, "FamilyTodo/Views/New/Zed.swift")
+    assert pbxtool(repo, "add", "FamilyTodo/Views/Aaa.swift", "FamilyTodo/Views/New/Zed.swift") == EXIT_CHANGED
+    assert pbxtool(repo, "format", "--check") == 0
+    assert pbxtool(repo, "move", "FamilyTodo/Views/Aaa.swift", "FamilyTodo/Views/Zzz.swift") == EXIT_CHANGED
+    assert pbxtool(repo, "format", "--check") == 0
+    new_file(repo, "FamilyTodo/Stores/Mmm.swift")
+    assert pbxtool(repo, "sync") == EXIT_CHANGED
+    assert pbxtool(repo, "format", "--check") == 0
+    assert not canonicalize(Project.load(repo), write=False)
+
+
+def test_dry_run_and_plan_write_nothing(repo, capsys):
+    original = repo.read_bytes()
+    new_file(repo, "FamilyTodo/Views/Planned.swift")
+    assert pbxtool(repo, "add", "FamilyTodo/Views/Planned.swift", "--dry-run") == EXIT_CHANGED
+    diff = capsys.readouterr().out
+    assert diff.startswith("--- a/FamilyTodo.xcodeproj/project.pbxproj\n")
+    assert "+\t\t\t\t" in diff and "Planned.swift" in diff
+    assert pbxtool(repo, "add", "FamilyTodo/Views/Planned.swift", "--plan", "json") == EXIT_CHANGED
+    plan = json.loads(capsys.readouterr().out)
+    assert sorted(obj["isa"] for obj in plan["added"]) == ["PBXBuildFile", "PBXFileReference"]
+    assert {obj["isa"] for obj in plan["modified"]} == {"PBXGroup", "PBXSourcesBuildPhase"}
+    assert repo.read_bytes() == original
+
+
+def test_settings_unset_of_an_unknown_key_fails(repo):
+    original = repo.read_bytes()
+    assert pbxtool(repo, "settings", "unset", "NO_SUCH_SETTING") == 1
+    assert repo.read_bytes() == original
+
+
+def test_schemes_fix_retargets_a_recreated_target(repo):
+    scheme = repo.parent / "xcshareddata" / "xcschemes" / "HousePulse.xcscheme"
+    original = scheme.read_bytes()
+    tests_id = Project.load(repo).target("FamilyTodoTests").id
+    scheme.write_bytes(original.replace(tests_id.encode(), b"0123456789ABCDEF01234567"))  # as if recreated
+    assert pbxtool(repo, "schemes", "check") == 1
+    assert pbxtool(repo, "schemes", "fix") == EXIT_CHANGED
+    assert scheme.read_bytes() == original
+    assert pbxtool(repo, "schemes", "add-tests", "FamilyTodoUITests") == EXIT_CHANGED
+    assert pbxtool(repo, "schemes", "add-tests", "FamilyTodoUITests") == 0
+    assert pbxtool(repo, "schemes", "check") == 0
+    assert b'BlueprintName="FamilyTodoUITests"' in scheme.read_bytes()
+
+
+def dump(db_path):
+    db = sqlite3.connect(str(db_path))
+    try:
+        tables = [row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+        return {table: sorted(map(repr, db.execute(f"SELECT * FROM {table}"))) for table in tables}
+    finally:
+        db.close()
+
+
+def test_incremental_export_matches_a_full_rebuild(repo, tmp_path):
+    incremental = tmp_path / "incremental.sqlite"
+    export_sqlite(repo, incremental)
+    assert export_sqlite(repo, incremental).unchanged
+    new_file(repo, "FamilyTodo/Views/Exported.swift")
+    assert pbxtool(repo, "add", "FamilyTodo/Views/Exported.swift") == EXIT_CHANGED
+    assert pbxtool(repo, "move", "FamilyTodo/Views/SignInView.swift", "FamilyTodo/Auth/") == EXIT_CHANGED
+    assert pbxtool(repo, "settings", "set", "SWIFT_VERSION=6.0", "--target", "HousePulse") == EXIT_CHANGED
+    result = export_sqlite(repo, incremental)
+    assert 0 < result.written < result.total
+    full = tmp_path / "full.sqlite"
+    export_sqlite(repo, full, full=True)
+    assert dump(incremental) == dump(full)
+
+
+def test_concurrent_commits_rebase_instead_of_losing_edits(repo):
+    pending = []
+    for name in ("First.swift", "Second.swift"):
+        project = Project.load(repo)  # both load the same bytes
+        tx = project.transaction()
+        tx.add_file(name, tx.ensure_group_path("FamilyTodo/Shared"), project.build_phase("HousePulse"))
+        pending.append(tx)
+    first, second = pending
+    assert first.commit()
+    assert second.commit()
+    assert second.rebases == 1
+    text = repo.read_text(encoding="utf-8")
+    assert "First.swift in Sources" in text and "Second.swift in Sources" in text
+    assert text.count("/* Shared */ = {") == 1
+    assert not check(Project.load(repo))
+
+
+def test_rebase_onto_a_removed_object_writes_nothing(repo):
+    ref = project_tree(Project.load(repo))[0]["FamilyTodo/Views/SignInView.swift"]
+    rename = Project.load(repo).transaction()
+    rename.rename_file_ref(ref, "SignIn.swift")
+    removal = Project.load(repo).transaction()
+    removal.remove_file_refs([ref])
+    assert removal.commit()
+    removed = repo.read_bytes()
+    with pytest.raises(WriteConflict):
+        rename.commit()
+    assert repo.read_bytes() == removed
+
+
+def test_save_refuses_to_overwrite_a_changed_file(repo):
+    stale = Project.load(repo)
+    tx = Project.load(repo).transaction()
+    tx.ensure_group_path("FamilyTodo/Elsewhere")
+    tx.commit()
+    with pytest.raises(WriteConflict):
+        stale.save()